@@ -0,0 +1,6 @@
+"""Парсер ЕРВК (ervk.gov.ru): обход объектов контроля и выгрузка данных.
+
+Пакет не импортирует тяжелые зависимости при импорте: selenium нужен
+только модулю crawler, pandas/openpyxl - модулям excel и export, pyarrow -
+parquet. Командная строка - `python -m ervk_parser --help` (cli.py).
+"""
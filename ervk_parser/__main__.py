@@ -0,0 +1,9 @@
+"""python -m ervk_parser <команда> - см. cli.py."""
+import sys
+
+from .cli import main
+
+# Защита нужна для ProcessPoolExecutor при выгрузке частей: на Windows
+# (spawn) дочерний процесс заново импортирует главный модуль
+if __name__ == '__main__':
+    sys.exit(main())
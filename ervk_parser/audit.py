@@ -0,0 +1,185 @@
+"""Проверка полноты сбора и точечная перезагрузка пропущенных страниц.
+
+Ожидаемое число объектов читается из интерфейса ("Найдено: N") или из
+JSON ответа (total/totalElements), размер страницы - из полных страниц.
+Собранные cosId сравниваются постранично и в целом: короткие страницы
+и пропущенные диапазоны ставятся в очередь работ на перезагрузку вместо
+повторного полного обхода.
+"""
+import json
+import math
+import re
+from collections import Counter
+
+from .log import log
+from .metrics import metrics as default_metrics
+
+# Ищем в тексте страницы общее число найденных объектов. Разряды отделяются
+# пробелом или неразрывным пробелом, но не переводом строки: на следующих
+# строках идут номера кнопок пагинатора
+TOTAL_PATTERNS = (
+    r'Найдено\s*(?:объектов)?\s*[:：]?\s*([\d \u00a0]+)',
+    r'Всего\s*(?:объектов|записей)?\s*[:：]?\s*([\d \u00a0]+)',
+    r'из\s+([\d \u00a0]+)\s*(?:объект|запис)',
+)
+
+# Расхождение "Найдено" между двумя чтениями одной выдачи, доля: за время
+# обхода объекты добавляются, а потерянные фильтры меняют число в разы
+TOTAL_DRIFT = 0.005
+
+# Номера кнопок пагинатора - последний номер страницы
+PAGINATOR_JS = """
+var numbers = [];
+var buttons = document.querySelectorAll("button[class*='PaginationItem-page']");
+for (var i = 0; i < buttons.length; i++) {
+    var n = parseInt((buttons[i].innerText || '').trim(), 10);
+    if (!isNaN(n)) numbers.push(n);
+}
+return {text: document.body.innerText.slice(0, 20000), pages: numbers};
+"""
+
+
+def parse_total(text):
+    """Число найденных объектов из текста страницы или None."""
+    for pattern in TOTAL_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            digits = re.sub(r'\D', '', match.group(1))
+            if digits:
+                return int(digits)
+    return None
+
+
+def same_total(expected, total):
+    """Та же выдача по числу найденных объектов (с поправкой TOTAL_DRIFT)."""
+    if expected is None or total is None:
+        return expected == total
+    return abs(total - expected) <= max(1, expected * TOTAL_DRIFT)
+
+
+def read_expected(driver):
+    """(ожидаемое число объектов, последняя страница в пагинаторе) из интерфейса."""
+    try:
+        info = driver.execute_script(PAGINATOR_JS)
+    except Exception as e:
+        log.warning("   ⚠ Не удалось прочитать общее число объектов: %s", e, extra={'event': 'expected_total'})
+        return None, None
+    last_page = max(info['pages']) if info['pages'] else None
+    return parse_total(info['text']), last_page
+
+
+def to_ranges(pages):
+    """[1, 2, 3, 7, 9, 10] -> [(1, 3), (7, 7), (9, 10)]."""
+    ranges = []
+    for page in sorted(set(pages)):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+class CompletenessAuditor:
+    """Сравнивает собранные cosId с ожидаемым числом объектов."""
+
+    def __init__(self, expected_total=None, page_size=None, last_page=None, metrics=None, first_page=1):
+        self.expected_total = expected_total
+        self.page_size = page_size
+        self.last_page = last_page
+        # Запуск с продолжения (first_page) или остановленный по бюджету
+        # (stopped_at) проверяет только свою часть страниц
+        self.first_page = first_page
+        self.stopped_at = None
+        self.metrics = metrics or default_metrics
+        self.pages = {}
+
+    def record_page(self, page_num, cos_ids):
+        """Запоминает cosId страницы (повторная загрузка страницы заменяет старые)."""
+        self.pages[page_num] = [cos_id for cos_id in cos_ids if cos_id]
+
+    def expected_pages(self):
+        if self.expected_total is not None and self.effective_page_size():
+            return max(1, math.ceil(self.expected_total / self.effective_page_size()))
+        return self.last_page
+
+    def effective_page_size(self):
+        if self.page_size:
+            return self.page_size
+        return max((len(ids) for ids in self.pages.values()), default=None)
+
+    def report(self):
+        """Итог проверки: ожидалось/собрано, короткие и пропущенные страницы, дубли."""
+        page_size = self.effective_page_size()
+        expected_pages = self.expected_pages()
+        counts = Counter(cos_id for ids in self.pages.values() for cos_id in ids)
+        collected = len(counts)
+        duplicates = sorted(cos_id for cos_id, n in counts.items() if n > 1)
+
+        short_pages = []
+        if page_size:
+            for page, ids in sorted(self.pages.items()):
+                # Последняя страница может быть неполной
+                is_last = expected_pages is not None and page >= expected_pages
+                if is_last and self.expected_total is not None:
+                    expected_here = self.expected_total - page_size * (expected_pages - 1)
+                else:
+                    expected_here = page_size
+                if len(set(ids)) < expected_here and not (is_last and self.expected_total is None):
+                    short_pages.append(page)
+
+        missing_pages = []
+        partial = self.first_page > 1 or self.stopped_at is not None
+        if expected_pages:
+            last = min(expected_pages, self.stopped_at) if self.stopped_at else expected_pages
+            missing_pages = [page for page in range(self.first_page, last + 1) if page not in self.pages]
+
+        return {
+            'expected_total': self.expected_total,
+            'collected': collected,
+            'missing_count': (self.expected_total - collected) if self.expected_total is not None and not partial else None,
+            'page_size': page_size,
+            'expected_pages': expected_pages,
+            'short_pages': short_pages,
+            'missing_pages': missing_pages,
+            'missing_ranges': to_ranges(missing_pages),
+            'duplicates': duplicates,
+        }
+
+    def pages_to_refetch(self):
+        report = self.report()
+        return sorted(set(report['short_pages']) | set(report['missing_pages']))
+
+    def enqueue_refetch(self, queue, profile, url):
+        """Ставит короткие и пропущенные страницы в очередь работ; возвращает число работ."""
+        pages = self.pages_to_refetch()
+        if not pages:
+            return 0
+        queue.add_profile(profile, url)
+        added = 0
+        for first, last in to_ranges(pages):
+            added += queue.requeue(profile, first, last)
+        self.metrics.incr('audit.refetch_pages', len(pages))
+        return added
+
+    def print_report(self):
+        report = self.report()
+        print("\n🔎 ПРОВЕРКА ПОЛНОТЫ:")
+        print(f"   Ожидалось объектов: {report['expected_total'] if report['expected_total'] is not None else 'неизвестно'}")
+        print(f"   Собрано уникальных cosId: {report['collected']}")
+        if report['missing_count']:
+            print(f"   Не хватает: {report['missing_count']}")
+        print(f"   Размер страницы: {report['page_size']}, страниц ожидалось: {report['expected_pages']}")
+        if report['short_pages']:
+            print(f"   ⚠ Неполные страницы: {report['short_pages'][:30]}")
+        if report['missing_ranges']:
+            print(f"   ⚠ Пропущенные страницы: {report['missing_ranges'][:30]}")
+        if report['duplicates']:
+            print(f"   ⚠ Дубли cosId: {len(report['duplicates'])}")
+        self.metrics.incr('audit.short_pages', len(report['short_pages']))
+        self.metrics.incr('audit.missing_pages', len(report['missing_pages']))
+        return report
+
+    def save(self, filename):
+        """Сохраняет отчет и cosId по страницам в JSON."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'report': self.report(), 'pages': self.pages}, f, ensure_ascii=False, indent=1)
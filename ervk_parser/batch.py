@@ -0,0 +1,87 @@
+"""Пакет заданий: много профилей фильтров в одной прогретой сессии браузера.
+
+Файл заданий - JSON со списком профилей (адрес списка с уже примененными
+фильтрами, как в work_queue):
+
+    {"jobs": [
+        {"name": "msk_vet", "url": "https://ervk.gov.ru/objects?region=77&kind=...", "max_pages": 200},
+        {"name": "spb_fito", "url": "https://ervk.gov.ru/objects?region=78&kind=...", "output": "спб.xlsx"}
+    ]}
+
+    python -m ervk_parser crawl --jobs jobs.json
+
+Браузер запускается и прогревается (куки, первый заход на сайт) один раз,
+затем задания идут подряд: у каждого свой итоговый Excel, журнал JSON lines
+и запуск в SQLite, в конце - общая сводка. Необязательные поля задания:
+max_pages, max_duration ('45m'), first_page, last_page, output.
+
+С --queue задания с известной last_page раскладываются по диапазонам
+страниц в очередь работ, и их делят несколько воркеров
+(`crawl --queue ...` на других машинах).
+"""
+import json
+import re
+
+from .budget import format_duration, parse_duration
+
+
+def _safe_name(name):
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'job'
+
+
+def load_jobs(filename):
+    """Список заданий из JSON (список или {"jobs": [...]}) с проверкой полей."""
+    with open(filename, encoding='utf-8') as f:
+        data = json.load(f)
+    jobs = data['jobs'] if isinstance(data, dict) else data
+    names = set()
+    result = []
+    for index, job in enumerate(jobs, 1):
+        if not job.get('url'):
+            raise ValueError(f"задание {index}: нет адреса url")
+        job = dict(job)
+        job['name'] = _safe_name(job.get('name') or f'job{index}')
+        if job['name'] in names:
+            raise ValueError(f"задание {index}: имя {job['name']} уже занято")
+        names.add(job['name'])
+        if job.get('max_duration') is not None:
+            job['max_duration'] = parse_duration(job['max_duration'])
+        result.append(job)
+    return result
+
+
+def enqueue_jobs(queue, jobs, chunk=10):
+    """Задания с известной last_page -> профили и диапазоны страниц в очереди работ.
+
+    Возвращает (число работ, имена заданий без last_page).
+    """
+    added = 0
+    skipped = []
+    for job in jobs:
+        if not job.get('last_page'):
+            skipped.append(job['name'])
+            continue
+        queue.add_profile(job['name'], job['url'])
+        added += queue.enqueue_range(job['name'], job.get('first_page', 1), job['last_page'], chunk)
+    return added, skipped
+
+
+def print_summary(results, browser_seconds=None):
+    """Общая сводка пакета по результатам заданий."""
+    print("\n📚 СВОДКА ПАКЕТА:")
+    print(f"   {'задание':<24}{'статус':<12}{'страниц':>8}{'записей':>9}{'успешно':>9}{'время':>10}  итог")
+    for result in results:
+        print(f"   {result['name'][:23]:<24}{result['status']:<12}{result['pages']:>8}{result['records']:>9}"
+              f"{result['ok']:>9}{format_duration(result['seconds']):>10}  {result['output']}")
+        if result.get('error'):
+            print(f"      ⚠ {result['error']}")
+    done = sum(1 for result in results if result['status'] in ('finished', 'budget'))
+    print(f"   Выполнено заданий: {done} из {len(results)}, записей: {sum(r['records'] for r in results)}")
+    if browser_seconds is not None and results:
+        print(f"   Запуск браузера: {browser_seconds:.1f} с один раз на {len(results)} заданий")
+
+
+def save_summary(filename, results, **extra):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(dict(extra, jobs=results), f, ensure_ascii=False, indent=1)
+    return filename
@@ -0,0 +1,165 @@
+"""Бенчмарк устойчивости: режимы обхода против стенда со сбоями.
+
+Для каждого режима поднимается локальный стенд (standin.py) с одной и той
+же последовательностью сбоев, обход запускается отдельным процессом
+(`python -m ervk_parser crawl ...`) в чистом каталоге, а затем собранная
+база SQLite сравнивается с тем, что стенд отдал бы без сбоев:
+
+    время восстановления - от сбоя до следующего успешного ответа списка
+    потерянные страницы  - страницы, cosId которых собраны не полностью
+    дубли                - записанные строки сверх уникальных cosId
+
+    python -m ervk_parser.bench_resilience --modes selenium,prefetch,playwright \\
+        --pages 20 --slow-rate 0.1 --slow-seconds 20 --partial-rate 0.05 --expire-every 15
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from .standin import FaultConfig, StandInServer
+from .work_queue import WorkQueue
+
+# Аргументы `crawl` для каждого режима; {url} и {queue} подставляются
+MODES = {
+    'selenium': ['--batch', '--no-prefetch'],
+    'prefetch': ['--batch'],
+    'queue': ['--batch', '--queue', '{queue}'],
+    'playwright': ['--backend', 'playwright', '--url', '{url}'],
+}
+QUEUE_CHUNK = 5
+
+
+def recovery_times(events):
+    """Время от каждого сбоя до следующего успешного ответа списка (None - не восстановился)."""
+    times = []
+    for index, event in enumerate(events):
+        if event['kind'] == 'ok':
+            continue
+        recovered = next((later['t'] - event['t'] for later in events[index + 1:] if later['kind'] == 'ok'), None)
+        times.append(recovered)
+    return times
+
+
+def collected(db_path):
+    """(уникальные cosId, всего записанных строк) из базы обхода."""
+    if not os.path.exists(db_path):
+        return set(), 0
+    conn = sqlite3.connect(db_path)
+    try:
+        cos_ids = {row[0] for row in conn.execute("SELECT cos_id FROM objects")}
+        written = conn.execute("SELECT COALESCE(SUM(records), 0) FROM runs").fetchone()[0]
+    finally:
+        conn.close()
+    return cos_ids, written
+
+
+def run_mode(mode, pages, faults, timeout, seed=1, keep_dir=None):
+    """Один прогон режима; возвращает словарь с итогами."""
+    server = StandInServer(pages=pages, faults=faults, seed=seed)
+    url = server.start()
+    workdir = keep_dir or tempfile.mkdtemp(prefix=f'ervk_bench_{mode}_')
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, 'ervk.sqlite')
+    queue_path = os.path.join(workdir, 'ervk_work.sqlite')
+    if mode == 'queue':
+        queue = WorkQueue(queue_path)
+        queue.add_profile('bench', url)
+        queue.enqueue_range('bench', 1, server.total_pages, QUEUE_CHUNK)
+        queue.close()
+
+    args = [arg.format(url=url, queue=queue_path) for arg in MODES[mode]]
+    command = [sys.executable, '-m', 'ervk_parser', 'crawl', '--start-url', url, '--sqlite', db_path,
+               '--max-pages', str(server.total_pages), '-o', os.path.join(workdir, 'result.xlsx')] + args
+    env = dict(os.environ)
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = package_root + os.pathsep + env.get('PYTHONPATH', '')
+
+    started = time.time()
+    outcome = 'finished'
+    with open(os.path.join(workdir, 'crawl.log'), 'w', encoding='utf-8') as log:
+        try:
+            result = subprocess.run(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                    stdin=subprocess.DEVNULL, timeout=timeout)
+            if result.returncode != 0:
+                outcome = f'exit {result.returncode}'
+        except subprocess.TimeoutExpired:
+            outcome = 'timeout'
+    elapsed = time.time() - started
+    server.stop()
+
+    cos_ids, written = collected(db_path)
+    expected = server.expected_pages()
+    lost_pages = sorted(page for page, ids in expected.items() if not set(ids) <= cos_ids)
+    recoveries = recovery_times(server.events)
+    recovered = [value for value in recoveries if value is not None]
+    full_pages = len(expected) - len(lost_pages)
+    return {
+        'mode': mode,
+        'outcome': outcome,
+        'seconds': round(elapsed, 1),
+        'pages_per_min': round(full_pages / elapsed * 60, 2) if elapsed else 0,
+        'expected_rows': server.total,
+        'rows': len(cos_ids),
+        'lost_pages': lost_pages,
+        'duplicates': max(0, written - len(cos_ids)),
+        'faults': dict(Counter(event['kind'] for event in server.events if event['kind'] != 'ok')),
+        'recover_mean': round(statistics.mean(recovered), 2) if recovered else None,
+        'recover_max': round(max(recovered), 2) if recovered else None,
+        'unrecovered': len(recoveries) - len(recovered),
+        'workdir': workdir,
+    }
+
+
+def print_report(results):
+    print(f"\n{'режим':<11}{'итог':<10}{'сек':>8}{'стр/мин':>9}{'строк':>12}{'потеряно стр':>14}"
+          f"{'дубли':>7}{'восст. ср/макс, с':>20}{'не восст.':>10}")
+    for r in results:
+        recover = f"{r['recover_mean']}/{r['recover_max']}" if r['recover_mean'] is not None else '-'
+        print(f"{r['mode']:<11}{r['outcome']:<10}{r['seconds']:>8}{r['pages_per_min']:>9}"
+              f"{str(r['rows']) + '/' + str(r['expected_rows']):>12}{len(r['lost_pages']):>14}"
+              f"{r['duplicates']:>7}{recover:>20}{r['unrecovered']:>10}")
+    for r in results:
+        print(f"   {r['mode']}: сбои {r['faults'] or '-'}; потеряны страницы {r['lost_pages'][:20] or '-'}; "
+              f"журнал {r['workdir']}/crawl.log")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк устойчивости обхода на стенде со сбоями")
+    parser.add_argument('--modes', default='selenium,prefetch', help=f"через запятую из {', '.join(MODES)}")
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=1800, help="лимит на один режим, секунд")
+    parser.add_argument('--slow-rate', type=float, default=0.1)
+    parser.add_argument('--slow-seconds', type=float, default=20.0)
+    parser.add_argument('--partial-rate', type=float, default=0.05)
+    parser.add_argument('--stuck-rate', type=float, default=0.05)
+    parser.add_argument('--expire-every', type=int, default=0)
+    parser.add_argument('--hang-rate', type=float, default=0.0)
+    parser.add_argument('--json', help="сохранить итоги в JSON")
+    args = parser.parse_args(argv)
+
+    faults = FaultConfig(args.slow_rate, args.slow_seconds, args.partial_rate, args.stuck_rate,
+                         args.expire_every, args.hang_rate)
+    results = []
+    for mode in args.modes.split(','):
+        mode = mode.strip()
+        if mode not in MODES:
+            parser.error(f"неизвестный режим {mode}")
+        print(f"▶ {mode}: {args.pages} страниц, сбои {faults.to_dict()}")
+        results.append(run_mode(mode, args.pages, faults, args.timeout, seed=args.seed))
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'faults': faults.to_dict(), 'results': results}, f, ensure_ascii=False, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
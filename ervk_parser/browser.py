@@ -0,0 +1,190 @@
+"""Абстракция браузера: одни и те же операции для Selenium и Playwright.
+
+Парсеру от браузера нужно немного: открыть адрес, найти карточки,
+выполнить скрипт, кликнуть, дождаться условия и перехватить JSON ответы.
+BrowserBackend (abc) описывает эти операции, SeleniumBackend реализует их
+поверх синхронного WebDriver. Асинхронная реализация на Playwright (много
+страниц в одном контексте браузера под asyncio) - PlaywrightPage в
+playwright_backend.py, тоже наследник BrowserBackend, но ее методы - корутины.
+
+Скрипты написаны в стиле Selenium (тело функции, аргументы в arguments[]),
+Playwright оборачивает их сам.
+"""
+from abc import ABC, abstractmethod
+
+from .capture import NetworkCapture
+from .locators import locators
+from .prefetch import EXPAND_ALL_JS
+
+# Поиск карточек одним вызовом JS: вместо широкого XPath по всем MuiPaper-root
+# и чтения card.text через WebDriver для каждого кандидата браузер сам
+# отбирает настоящие карточки объектов и возвращает их вместе с cosId.
+FIND_CARDS_JS = """
+var selectors = arguments[0];
+var risks = ['значительный', 'низкий', 'средний', 'высокий'];
+var matched = [];
+var used = -1;
+for (var s = 0; s < selectors.length && matched.length === 0; s++) {
+    var candidates = document.querySelectorAll(selectors[s]);
+    used = s;
+    for (var i = 0; i < candidates.length; i++) {
+        var head = (candidates[i].innerText || '').slice(0, 50);
+        var number = head.match(/№\\s*(\\d+)/);
+        var lower = head.toLowerCase();
+        if (!number) continue;
+        for (var r = 0; r < risks.length; r++) {
+            if (lower.indexOf(risks[r]) !== -1) {
+                matched.push([candidates[i], number[1]]);
+                break;
+            }
+        }
+    }
+}
+
+// Отбрасываем обертки, внутри которых есть другая найденная карточка
+var result = [];
+for (var i = 0; i < matched.length; i++) {
+    var isWrapper = false;
+    for (var j = 0; j < matched.length; j++) {
+        if (i !== j && matched[i][0].contains(matched[j][0])) {
+            isWrapper = true;
+            break;
+        }
+    }
+    if (!isWrapper) result.push(matched[i]);
+}
+return {cards: result, selector: used};
+"""
+
+# Раскрытие всех карточек страницы одним вызовом, без ссылок на элементы
+EXPAND_PAGE_JS = """
+var found = (function() {%s}).apply(null, [arguments[0]]);
+var cards = found.cards.map(function(pair) { return pair[0]; });
+return (function() {%s}).apply(null, [cards]);
+""" % (FIND_CARDS_JS, EXPAND_ALL_JS)
+
+# Текст всех карточек и ФИО из DOM (те же XPath, что у реестра локаторов)
+EXTRACT_CARDS_JS = """
+var found = (function() {%s}).apply(null, [arguments[0]]);
+var personXPaths = arguments[1];
+var result = [];
+for (var i = 0; i < found.cards.length; i++) {
+    var card = found.cards[i][0];
+    var person = null;
+    for (var x = 0; x < personXPaths.length && person === null; x++) {
+        var node = document.evaluate(personXPaths[x], card, null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        var text = node ? (node.innerText || '').trim() : '';
+        if (text.length > 5 && text.indexOf(' ') !== -1) person = text;
+    }
+    result.push([found.cards[i][1], card.innerText || '', person]);
+}
+return {cards: result, selector: found.selector};
+""" % FIND_CARDS_JS
+
+CLICK_JS = "arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();"
+
+
+def person_xpaths():
+    """XPath поиска ФИО внутри карточки в порядке реестра локаторов."""
+    return [selector for _, (_, selector) in locators.ordered('person_name')]
+
+
+class BrowserBackend(ABC):
+    """Операции браузера, которые нужны парсеру.
+
+    navigate(url)                 - открыть адрес
+    run_script(script, *args)     - выполнить JS (тело функции с arguments[])
+    query_cards(selectors)        - [(cosId, элемент)] карточек страницы
+    extract_cards(selectors)      - [(cosId, текст, ФИО или None)] одним вызовом
+    click(element)                - клик по элементу
+    wait_for(css, timeout)        - дождаться элемента; True/False
+    intercept(url_patterns)       - сборщик JSON ответов (record_for(cos_id))
+    close()
+
+    query_cards и extract_cards отмечают в реестре локаторов селектор
+    карточек, который сработал (record_cards).
+    """
+
+    @staticmethod
+    def record_cards(found):
+        """Запоминает сработавший селектор карточек из ответа FIND_CARDS_JS."""
+        if found['cards']:
+            locators.record('card', found['selector'])
+
+    @abstractmethod
+    def navigate(self, url):
+        raise NotImplementedError
+
+    @abstractmethod
+    def run_script(self, script, *args):
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_cards(self, selectors):
+        raise NotImplementedError
+
+    @abstractmethod
+    def extract_cards(self, selectors):
+        raise NotImplementedError
+
+    @abstractmethod
+    def click(self, element):
+        raise NotImplementedError
+
+    @abstractmethod
+    def wait_for(self, css, timeout=10):
+        raise NotImplementedError
+
+    @abstractmethod
+    def intercept(self, url_patterns=('/api/',)):
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self):
+        raise NotImplementedError
+
+
+class SeleniumBackend(BrowserBackend):
+    """Реализация поверх синхронного WebDriver (одна вкладка - одна страница)."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def navigate(self, url):
+        self.driver.get(url)
+
+    def run_script(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    def query_cards(self, selectors):
+        found = self.run_script(FIND_CARDS_JS, list(selectors))
+        self.record_cards(found)
+        return [(cos_id, card) for card, cos_id in found['cards']]
+
+    def extract_cards(self, selectors):
+        found = self.run_script(EXTRACT_CARDS_JS, list(selectors), person_xpaths())
+        self.record_cards(found)
+        return [tuple(card) for card in found['cards']]
+
+    def click(self, element):
+        self.run_script(CLICK_JS, element)
+
+    def wait_for(self, css, timeout=10):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, css)))
+            return True
+        except Exception:
+            return False
+
+    def intercept(self, url_patterns=('/api/',)):
+        """Пассивный перехват через performance log: ответы разбирает capture.drain()."""
+        capture = NetworkCapture(self.driver, url_patterns)
+        capture.start()
+        return capture
+
+    def close(self):
+        self.driver.quit()
@@ -0,0 +1,135 @@
+"""Бюджет запуска по времени и страницам с остановкой в точке возобновления.
+
+Окна обхода фиксированы, поэтому запуск должен сам закончить работу
+вовремя: RunBudget после каждой страницы пересчитывает скорость
+(страниц в минуту) и говорит, пора ли остановиться. Новая страница не
+начинается, если средняя страница уже не успевает до конца окна, -
+текущая всегда дорабатывается, записи сбрасываются, итоговый Excel
+собирается из того, что есть. Точка продолжения пишется в checkpoint
+(JSON), с него запускается следующий обход:
+
+    python -m ervk_parser crawl --max-duration 3h --resume ЕРВК_checkpoint_<запуск>.json
+
+Прогноз предупреждает заранее, если оставшиеся страницы в окно не
+помещаются.
+"""
+import json
+import re
+import time
+
+from .metrics import metrics as default_metrics
+
+# Прогноз строится после стольких страниц (первые обычно медленнее)
+WARMUP_PAGES = 3
+DURATION_UNITS = {'s': 1, 'с': 1, 'm': 60, 'м': 60, 'h': 3600, 'ч': 3600}
+
+
+def parse_duration(text):
+    """'90' (минуты), '45m', '3h', '1h30m', '2ч' -> секунды."""
+    text = str(text).strip().lower()
+    if re.fullmatch(r'\d+(\.\d+)?', text):
+        return float(text) * 60
+    parts = re.findall(r'(\d+(?:\.\d+)?)\s*([smhсмч])', text)
+    if not parts or re.sub(r'(\d+(?:\.\d+)?)\s*([smhсмч])', '', text).strip():
+        raise ValueError(f"непонятная длительность: {text!r} (примеры: 90, 45m, 3h, 1h30m)")
+    return sum(float(value) * DURATION_UNITS[unit] for value, unit in parts)
+
+
+def format_duration(seconds):
+    seconds = int(max(seconds, 0))
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+class RunBudget:
+    """Лимиты запуска: max_seconds по времени, max_pages по страницам (None - без лимита)."""
+
+    def __init__(self, max_seconds=None, max_pages=None, metrics=None):
+        self.max_seconds = max_seconds
+        self.max_pages = max_pages
+        self.metrics = metrics or default_metrics
+        self.started = time.time()
+        self.pages = 0
+        self.page_seconds = []
+        self.warned = False
+        self.reason = None
+
+    def elapsed(self):
+        return time.time() - self.started
+
+    def record_page(self, seconds):
+        self.pages += 1
+        self.page_seconds.append(seconds)
+
+    def average_page(self):
+        """Среднее время страницы с учетом навигации (по всему запуску)."""
+        if not self.pages:
+            return None
+        return self.elapsed() / self.pages
+
+    def pages_per_min(self):
+        average = self.average_page()
+        return 60 / average if average else None
+
+    def exhausted(self):
+        """Причина остановки ('pages', 'time') или None, если следующую страницу можно начинать."""
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            self.reason = 'pages'
+        elif self.max_seconds is not None:
+            # Следующая страница должна успеть целиком
+            if self.elapsed() + (self.average_page() or 0) > self.max_seconds:
+                self.reason = 'time'
+        if self.reason:
+            self.metrics.incr(f'budget.stop.{self.reason}')
+        return self.reason
+
+    def forecast(self, remaining_pages):
+        """Прогноз по текущей скорости: {'eta', 'fits', 'pages_fit'} или None до разогрева."""
+        if remaining_pages is None or self.pages < WARMUP_PAGES:
+            return None
+        average = self.average_page()
+        eta = remaining_pages * average
+        result = {'eta': eta, 'fits': True, 'pages_fit': remaining_pages}
+        if self.max_pages is not None:
+            result['pages_fit'] = min(result['pages_fit'], self.max_pages - self.pages)
+        if self.max_seconds is not None:
+            left = max(self.max_seconds - self.elapsed(), 0)
+            result['pages_fit'] = min(result['pages_fit'], int(left // average))
+        result['fits'] = result['pages_fit'] >= remaining_pages
+        return result
+
+    def check_fit(self, remaining_pages, log):
+        """Один раз предупреждает, если оставшиеся страницы не помещаются в бюджет."""
+        forecast = self.forecast(remaining_pages)
+        if forecast is None:
+            return None
+        log.debug("   ⏱ %.1f стр/мин, осталось %d страниц, прогноз %s", self.pages_per_min(), remaining_pages,
+                  format_duration(forecast['eta']))
+        if not forecast['fits'] and not self.warned:
+            self.warned = True
+            self.metrics.incr('budget.forecast_short')
+            log.warning("   ⏱ Не успеваем: при %.1f стр/мин осталось %d страниц (%s), в бюджет поместится ~%d; "
+                        "остаток будет записан в checkpoint", self.pages_per_min(), remaining_pages,
+                        format_duration(forecast['eta']), forecast['pages_fit'])
+        return forecast
+
+    def describe(self):
+        limits = []
+        if self.max_seconds is not None:
+            limits.append(f"время {format_duration(self.max_seconds)}")
+        if self.max_pages is not None:
+            limits.append(f"страниц {self.max_pages}")
+        return ', '.join(limits) or 'без лимитов'
+
+
+def save_checkpoint(filename, **state):
+    """Точка продолжения обхода: адрес с фильтрами, следующая страница, причина остановки."""
+    state['saved_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    return filename
+
+
+def load_checkpoint(filename):
+    with open(filename, encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,227 @@
+"""Пассивный перехват ответов XHR во время обычного обхода страниц.
+
+Страница ЕРВК получает данные карточек JSON-ом до того, как их отрисовать.
+Браузер по-прежнему листает и раскрывает карточки как пользователь, а
+записи собираются из перехваченных ответов (performance log Chrome +
+CDP Network.getResponseBody), а не из card_element.text.
+"""
+import base64
+import json
+
+from .log import log
+from .metrics import metrics as default_metrics
+
+# Какие ответы считаем данными объектов (подстроки адреса)
+DEFAULT_URL_PATTERNS = ('/api/',)
+
+# Возможные имена полей в JSON ответах -> колонка записи
+COS_ID_KEYS = ('cosId', 'cos_id', 'objectId')
+FIELD_KEYS = {
+    'Адрес объекта контроля': ('address', 'objectAddress', 'addressText'),
+    'Категория риска': ('riskCategory', 'riskCategoryName', 'risk'),
+    'Тип объекта': ('name', 'title', 'objectName'),
+    'Вид контроля': ('controlKind', 'controlKindName', 'kindControl'),
+    'Вид объекта контроля': ('objectKind', 'objectKindName', 'kindObject'),
+    'Подвид объекта контроля': ('objectSubKind', 'objectSubKindName', 'subKindObject'),
+}
+PERSON_LIST_KEYS = ('controlledPersons', 'controlledSubjects', 'subjects', 'persons')
+PERSON_KEYS = {
+    'ФИО': ('fio', 'fullName', 'name'),
+    'ИНН': ('inn',),
+    'ОГРН': ('ogrn',),
+    'ОГРНИП': ('ogrnip',),
+}
+RISK_NAMES = ('значительный', 'низкий', 'средний', 'высокий')
+
+
+def enable_performance_log(options):
+    """Включает performance log в опциях Chrome (до запуска браузера)."""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def _text(value):
+    """Строковое значение поля: словари вида {'name': ...} разворачиваем."""
+    if isinstance(value, dict):
+        for key in ('name', 'title', 'value', 'text'):
+            if value.get(key) is not None:
+                return _text(value[key])
+        return None
+    if value is None or isinstance(value, (list, bool)):
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _first(obj, keys):
+    for key in keys:
+        if key in obj:
+            value = _text(obj[key])
+            if value is not None:
+                return value
+    return None
+
+
+def _risk(value):
+    if not value:
+        return None
+    lower = value.lower()
+    for name in RISK_NAMES:
+        if name in lower:
+            return name
+    return value
+
+
+def iter_objects(payload):
+    """Обходит JSON и отдает все словари, у которых есть cosId."""
+    stack = [payload]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if any(key in item for key in COS_ID_KEYS):
+                yield item
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+
+
+def object_to_record(obj):
+    """Частичная запись (колонки как в parse_card_data) из JSON объекта."""
+    record = {'cosId': _first(obj, COS_ID_KEYS)}
+    for column, keys in FIELD_KEYS.items():
+        record[column] = _first(obj, keys)
+    record['Категория риска'] = _risk(record['Категория риска'])
+
+    persons = next((obj[key] for key in PERSON_LIST_KEYS if isinstance(obj.get(key), list)), [])
+    person = next((p for p in persons if isinstance(p, dict)), None)
+    if person:
+        for column, keys in PERSON_KEYS.items():
+            record[column] = _first(person, keys)
+        record['Полное наименование контролируемого лица'] = record['ФИО']
+        if record['ОГРНИП'] and not record['ОГРН']:
+            record['ОГРН'] = record['ОГРНИП']
+    return record
+
+
+def _merge(target, source):
+    """Заполняет пустые поля target значениями из source."""
+    for key, value in source.items():
+        if value is not None and target.get(key) is None:
+            target[key] = value
+
+
+TOTAL_KEYS = ('total', 'totalElements', 'totalCount', 'count')
+
+
+def total_from_payload(payload):
+    """Общее число объектов из JSON ответа списка или None."""
+    if isinstance(payload, dict):
+        for key in TOTAL_KEYS:
+            value = payload.get(key)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+        for value in payload.values():
+            if isinstance(value, dict):
+                total = total_from_payload(value)
+                if total is not None:
+                    return total
+    return None
+
+
+class NetworkCapture:
+    """Собирает JSON ответы страницы и строит по ним записи по cosId."""
+
+    def __init__(self, driver, url_patterns=DEFAULT_URL_PATTERNS, metrics=None):
+        self.driver = driver
+        self.url_patterns = tuple(url_patterns)
+        self.metrics = metrics or default_metrics
+        self.pending = {}
+        self.finished = {}
+        self.records = {}
+        self.expected_total = None
+
+    def start(self):
+        self.driver.execute_cdp_cmd('Network.enable', {})
+
+    def _wanted(self, response):
+        return ('json' in response.get('mimeType', '')
+                and any(pattern in response.get('url', '') for pattern in self.url_patterns))
+
+    def drain(self):
+        """Разбирает накопленный performance log; возвращает число новых ответов.
+
+        Тело ответа можно прочитать только из вкладки, которая его получила
+        (например, при предзагрузке во второй вкладке), поэтому ответы
+        чужих вкладок ждут, пока та вкладка станет текущей.
+        """
+        for entry in self.driver.get_log('performance'):
+            try:
+                log = json.loads(entry['message'])
+                message = log['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived' and self._wanted(params.get('response', {})):
+                self.pending[params['requestId']] = (params['response']['url'], log.get('webview'))
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.pending:
+                self.finished[params['requestId']] = self.pending.pop(params['requestId'])
+
+        captured = 0
+        current = self.driver.current_window_handle
+        for request_id, (url, webview) in list(self.finished.items()):
+            if webview and webview != current:
+                continue
+            del self.finished[request_id]
+            payload = self._body(request_id, url)
+            if payload is not None:
+                self.add_payload(payload)
+                captured += 1
+        self.metrics.incr('capture.responses', captured)
+        return captured
+
+    def _body(self, request_id, url):
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            body = result['body']
+            if result.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            return json.loads(body)
+        except Exception as e:
+            log.warning("      Не удалось прочитать ответ %s: %s", url[:80], e)
+            self.metrics.incr('capture.body_errors')
+            return None
+
+    def add_payload(self, payload):
+        """Добавляет объекты из JSON ответа; детали дополняют данные списка."""
+        total = total_from_payload(payload)
+        if total is not None:
+            self.expected_total = total
+        for obj in iter_objects(payload):
+            record = object_to_record(obj)
+            if not record['cosId']:
+                continue
+            _merge(self.records.setdefault(record['cosId'], {}), record)
+
+    def record_for(self, cos_id):
+        return self.records.get(str(cos_id)) if cos_id is not None else None
+
+
+def cross_check(xhr_records, dom_records, fields=('ФИО', 'ИНН', 'ОГРН', 'Адрес объекта контроля', 'Категория риска')):
+    """Сравнивает записи из XHR и из DOM по общим cosId.
+
+    Возвращает словарь: сколько сравнено и список расхождений
+    (cosId, поле, значение XHR, значение DOM).
+    """
+    dom_by_id = {r['cosId']: r for r in dom_records if r.get('cosId')}
+    mismatches = []
+    compared = 0
+    for record in xhr_records:
+        dom = dom_by_id.get(record.get('cosId'))
+        if dom is None:
+            continue
+        compared += 1
+        for field in fields:
+            xhr_value, dom_value = record.get(field), dom.get(field)
+            if xhr_value and dom_value and str(xhr_value).strip() != str(dom_value).strip():
+                mismatches.append((record['cosId'], field, xhr_value, dom_value))
+    return {'compared': compared, 'mismatches': mismatches}
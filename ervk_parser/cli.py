@@ -0,0 +1,360 @@
+"""Командная строка парсера ЕРВК.
+
+    python -m ervk_parser crawl [--max-pages 50] [--queue ervk_queue.sqlite]
+    python -m ervk_parser crawl --jobs jobs.json
+    python -m ervk_parser merge temp_pages/*.xlsx -o итог.xlsx
+    python -m ervk_parser reparse -o перепарсинг.xlsx
+    python -m ervk_parser export --sqlite ervk.sqlite -o выгрузка.xlsx --split-by "Вид контроля"
+    python -m ervk_parser stats
+    python -m ervk_parser schedule --jobs jobs.json --budget 3h
+
+Каждая команда импортирует только нужные ей модули: selenium грузит
+только crawl, pandas/openpyxl - команды, работающие с Excel, а stats
+обходится стандартной библиотекой и стартует мгновенно.
+"""
+import argparse
+import datetime
+import glob
+import os
+import sys
+
+
+def _run_stamp():
+    return datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def _add_shard_options(parser):
+    parser.add_argument('--rows-per-part', type=int, help="строк на часть итогового Excel")
+    parser.add_argument('--split-by', help="колонка для деления на части, например 'Вид контроля'")
+    parser.add_argument('--shard-mode', choices=('files', 'sheets'), default='files',
+                        help="части отдельными книгами или листами одной книги")
+
+
+def _duration(text):
+    from .budget import parse_duration
+    try:
+        return parse_duration(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _shard_options(args):
+    return dict(rows_per_part=args.rows_per_part, split_by=args.split_by, shard_mode=args.shard_mode)
+
+
+def cmd_crawl(args):
+    from .log import setup_logging
+    setup_logging('quiet' if args.quiet else 'verbose' if args.verbose else 'normal', args.log_json)
+
+    if args.backend == 'playwright':
+        from .playwright_backend import run_crawl
+        status = run_crawl(args.url, first_page=args.first_page, last_page=args.last_page,
+                           max_pages=args.max_pages, concurrency=args.concurrency,
+                           headless=not args.headful, output_filename=args.output,
+                           sqlite_path=args.sqlite if args.sqlite is not None else 'ervk.sqlite')
+        return 0 if status == 'finished' else 1
+
+    from . import crawler
+
+    if args.max_duration is not None:
+        crawler.MAX_DURATION_SECONDS = args.max_duration
+    if args.resume:
+        from .budget import load_checkpoint
+        from .prefetch import page_url
+        checkpoint = load_checkpoint(args.resume)
+        crawler.START_URL = page_url(checkpoint['profile_url'], checkpoint['next_page'])
+        crawler.RESUME_PAGE = checkpoint['next_page']
+        crawler.INTERACTIVE = False
+        print(f"▶ Продолжение запуска {checkpoint['run_id']} со страницы {checkpoint['next_page']}")
+    if args.start_url:
+        crawler.START_URL = args.start_url
+    if args.batch:
+        crawler.INTERACTIVE = False
+    jobs = None
+    if args.jobs:
+        from .batch import enqueue_jobs, load_jobs
+        jobs = load_jobs(args.jobs)
+        crawler.INTERACTIVE = False
+        if args.queue:
+            # Задания делят воркеры: раскладываем их по очереди и работаем как воркер
+            from .work_queue import WorkQueue
+            queue = WorkQueue(args.queue)
+            added, skipped = enqueue_jobs(queue, jobs)
+            queue.close()
+            print(f"📥 В очередь {args.queue} поставлено работ: {added}")
+            if skipped:
+                print(f"   ⚠ Без last_page в очередь не попали задания: {', '.join(skipped)}")
+            jobs = None
+    if args.queue:
+        crawler.WORK_QUEUE_PATH = args.queue
+    if args.capture:
+        crawler.CAPTURE_MODE = args.capture
+    if args.details:
+        crawler.DETAIL_FETCH = True
+    if args.no_prefetch:
+        crawler.PREFETCH_NEXT_PAGE = False
+    if args.page_deadline is not None:
+        crawler.PAGE_DEADLINE_SECONDS = args.page_deadline or None
+    if args.trace:
+        crawler.TRACE_PATH = args.trace
+    if args.profile_phase:
+        crawler.PROFILE_PHASE = args.profile_phase
+    if args.sqlite is not None:
+        crawler.SQLITE_PATH = args.sqlite or None
+    if args.parquet:
+        crawler.PARQUET_DIR = args.parquet
+    if args.rows_per_part:
+        crawler.EXCEL_ROWS_PER_PART = args.rows_per_part
+    if args.split_by:
+        crawler.EXCEL_SPLIT_BY = args.split_by
+    crawler.EXCEL_SHARD_MODE = args.shard_mode
+    status = crawler.crawl(max_pages=args.max_pages, output_filename=args.output, jobs=jobs)
+    return 0 if status in ('finished', 'budget') else 1
+
+
+def cmd_merge(args):
+    from .excel import cleanup_temp_files, merge_all_pages
+
+    files = args.files or sorted(glob.glob(os.path.join('temp_pages', '*.xlsx')))
+    if not files:
+        print("⚠ Нет временных файлов для объединения")
+        return 1
+    output_filename = args.output or f'ЕРВК_все_страницы_{_run_stamp()}.xlsx'
+    print(f"📦 Объединяю {len(files)} файлов в {output_filename}...")
+    if not merge_all_pages(output_filename, files, parquet_dir=args.parquet, **_shard_options(args)):
+        return 1
+    if args.cleanup:
+        cleanup_temp_files(files)
+    return 0
+
+
+def cmd_reparse(args):
+    from .excel import save_merged
+    from .parse_cache import ParseCache
+    from .parsing import PARSER_VERSION, new_card_data, parse_card_text
+    from .schema import COLUMN_NAMES, timestamp
+    import pandas as pd
+
+    # Тексты всех версий: старая версия парсера удаляла бы их при открытии
+    source = ParseCache(args.cache, PARSER_VERSION, purge=False)
+    try:
+        texts = list(dict.fromkeys(source.iter_texts()))
+    finally:
+        source.close()
+    if not texts:
+        print(f"⚠ В кэше {args.cache} нет сохраненных карточек")
+        return 1
+
+    print(f"🔁 Перепарсинг {len(texts)} карточек версией парсера {PARSER_VERSION}...")
+    collected_at = timestamp()
+    # Записи новой версии заменяют старые: следующий обход сразу попадет в кэш
+    cache = ParseCache(args.cache, PARSER_VERSION)
+    records = []
+    try:
+        for card_text in texts:
+            record = parse_card_text(card_text, new_card_data(collected_at=collected_at))
+            cache.put(card_text, record)
+            records.append(record)
+    finally:
+        cache.close()
+
+    output_filename = args.output or f'ЕРВК_перепарсинг_{_run_stamp()}.xlsx'
+    df = pd.DataFrame.from_records([record.to_row() for record in records], columns=COLUMN_NAMES)
+    if not save_merged(df, output_filename, **_shard_options(args)):
+        return 1
+    if args.sqlite:
+        from .sqlite import SQLiteSink
+        sink = SQLiteSink(args.sqlite)
+        sink.begin_run(note=f'reparse v{PARSER_VERSION}')
+        sink.write_page(records)
+        sink.finish_run()
+        sink.close()
+    print(f"✅ Перепарсено {len(records)} карточек: {output_filename}")
+    return 0
+
+
+def cmd_export(args):
+    from .excel import IDENTIFIER_DTYPES, save_merged
+    from .schema import COLUMN_NAMES
+    from .validate import validate_frame
+    import pandas as pd
+
+    if args.sqlite:
+        from .sqlite import SQLiteSink
+        sink = SQLiteSink(args.sqlite)
+        try:
+            df = pd.DataFrame.from_records(list(sink.iter_rows(args.run)), columns=COLUMN_NAMES)
+        finally:
+            sink.close()
+    elif args.files:
+        frames = []
+        for filename in args.files:
+            if filename.endswith('.xlsx'):
+                frames.append(pd.read_excel(filename, dtype=IDENTIFIER_DTYPES))
+            else:
+                from .parquet import read_dataset
+                frames.append(read_dataset(filename))
+        df = pd.concat(frames, ignore_index=True)
+    else:
+        print("⚠ Укажите --sqlite или файлы xlsx/каталоги Parquet")
+        return 2
+
+    if args.dedupe:
+        df = df.drop_duplicates(subset='cosId', keep='last')
+    df = validate_frame(df)
+    print(f"📤 Выгружаю {len(df)} записей...")
+    ok = True
+    if args.output or not args.parquet:
+        ok = save_merged(df, args.output or f'ЕРВК_выгрузка_{_run_stamp()}.xlsx', **_shard_options(args))
+    if args.parquet:
+        from .parquet import write_dataset
+        rows = write_dataset(df, args.parquet)
+        print(f"   📦 Parquet: {rows} записей в {args.parquet}/")
+    return 0 if ok else 1
+
+
+def cmd_stats(args):
+    from .index import LookupIndex
+    from .sqlite import SQLiteSink
+    from .work_queue import WorkQueue, _print_status
+
+    if os.path.exists(args.sqlite):
+        sink = SQLiteSink(args.sqlite)
+        stats = sink.stats(last_runs=args.runs)
+        sink.close()
+        print(f"🗄 {args.sqlite}: {stats['objects']} объектов")
+        print("   По категориям риска: " + ', '.join(f"{name} {count}" for name, count in stats['by_risk']))
+        print("   По статусам: " + ', '.join(f"{name} {count}" for name, count in stats['by_status']))
+        print("   Последние запуски:")
+        for run_id, started_at, status, pages, records, seconds in stats['runs']:
+            duration = f"{seconds:.0f} с" if seconds else '-'
+            print(f"      #{run_id} {started_at} {status}: {pages} страниц, {records} записей, {duration}")
+    else:
+        print(f"🗄 {args.sqlite}: нет базы")
+
+    if os.path.exists(args.index):
+        index = LookupIndex(args.index)
+        print(f"🔎 {args.index}: {index.stats()}")
+        index.close()
+
+    if os.path.exists(args.queue):
+        queue = WorkQueue(args.queue)
+        print(f"📥 {args.queue}:")
+        _print_status(queue.status())
+        queue.close()
+    return 0
+
+
+def cmd_schedule(args):
+    from .batch import load_jobs
+    from .schedule import plan, print_plan, save_plan
+    from .sqlite import SQLiteSink
+
+    jobs = load_jobs(args.jobs)
+    path = args.sqlite
+    if not os.path.exists(path):
+        print(f"⚠ {path}: нет базы - все задания без истории")
+        path = ':memory:'
+    # SQLiteSink дополняет старую базу колонками query/added/changed
+    sink = SQLiteSink(path)
+    try:
+        entries = plan(jobs, sink.conn, args.budget, max_age_days=args.max_age)
+    finally:
+        sink.close()
+    print_plan(entries, args.budget)
+    if not any(entry['chosen'] for entry in entries):
+        print("⚠ В бюджет не помещается ни одно задание")
+        return 1
+    output = save_plan(args.output or f'ЕРВК_план_{_run_stamp()}.json', entries)
+    print(f"   📄 {output} (python -m ervk_parser crawl --jobs {output} --max-duration ...)")
+    return 0
+
+
+def build_parser():
+    from .index import DEFAULT_PATH as INDEX_PATH
+    from .parse_cache import DEFAULT_PATH as PARSE_CACHE_PATH
+    from .sqlite import DEFAULT_PATH as SQLITE_PATH
+    from .work_queue import DEFAULT_PATH as QUEUE_PATH
+
+    parser = argparse.ArgumentParser(prog='python -m ervk_parser', description="Парсер ЕРВК")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    crawl = commands.add_parser('crawl', help="обход страниц в браузере")
+    crawl.add_argument('--max-pages', type=int, default=1000, help="бюджет страниц на запуск")
+    crawl.add_argument('--max-duration', type=_duration, help="бюджет времени сбора: 90 (минут), 45m, 3h, 1h30m")
+    crawl.add_argument('--resume', help="продолжить с checkpoint прошлого запуска")
+    crawl.add_argument('-o', '--output', help="итоговый Excel")
+    crawl.add_argument('--queue', help="режим воркера: брать работы из очереди")
+    crawl.add_argument('--jobs', help="пакет заданий (JSON) в одной сессии браузера; с --queue - в очередь")
+    crawl.add_argument('--start-url', help="адрес списка с фильтрами (например локальный стенд)")
+    crawl.add_argument('--batch', action='store_true', help="без ручной настройки и ожидания Enter")
+    crawl.add_argument('--capture', choices=('dom', 'xhr'), help="источник данных карточек")
+    crawl.add_argument('--details', action='store_true', help="детали по cosId без раскрытия карточек")
+    crawl.add_argument('--no-prefetch', action='store_true', help="без предзагрузки во второй вкладке")
+    crawl.add_argument('--page-deadline', type=float, help="срок на страницу, секунд (0 - без сторожа)")
+    crawl.add_argument('--trace', help="трасса в формате Chrome trace events (Perfetto)")
+    crawl.add_argument('--profile-phase', help="cProfile фазы: find_cards, expand, parse, save, navigate...")
+    verbosity = crawl.add_mutually_exclusive_group()
+    verbosity.add_argument('-q', '--quiet', action='store_true', help="одна строка прогресса на страницу")
+    verbosity.add_argument('-v', '--verbose', action='store_true', help="строки по карточкам и командам WebDriver")
+    crawl.add_argument('--log-json', help="журнал JSON lines в файл (все уровни); '-' - в консоль")
+    crawl.add_argument('--sqlite', help="база SQLite ('' - не писать)")
+    crawl.add_argument('--parquet', help="каталог набора Parquet")
+    crawl.add_argument('--backend', choices=('selenium', 'playwright'), default='selenium')
+    crawl.add_argument('--url', help="playwright: адрес с фильтрами (без него - ручная настройка)")
+    crawl.add_argument('--first-page', type=int, default=1, help="playwright: первая страница")
+    crawl.add_argument('--last-page', type=int, help="playwright: последняя страница (по умолчанию из пагинатора)")
+    crawl.add_argument('--concurrency', type=int, default=4, help="playwright: вкладок параллельно")
+    crawl.add_argument('--headful', action='store_true', help="playwright: показывать браузер")
+    _add_shard_options(crawl)
+    crawl.set_defaults(func=cmd_crawl)
+
+    merge = commands.add_parser('merge', help="объединить временные файлы страниц")
+    merge.add_argument('files', nargs='*', help="по умолчанию temp_pages/*.xlsx")
+    merge.add_argument('-o', '--output')
+    merge.add_argument('--parquet', help="дописать записи в набор Parquet")
+    merge.add_argument('--cleanup', action='store_true', help="удалить временные файлы после объединения")
+    _add_shard_options(merge)
+    merge.set_defaults(func=cmd_merge)
+
+    reparse = commands.add_parser('reparse', help="перепарсить сохраненные тексты карточек текущей версией")
+    reparse.add_argument('--cache', default=PARSE_CACHE_PATH)
+    reparse.add_argument('-o', '--output')
+    reparse.add_argument('--sqlite', help="дописать результат в базу SQLite")
+    _add_shard_options(reparse)
+    reparse.set_defaults(func=cmd_reparse)
+
+    export = commands.add_parser('export', help="выгрузить базу/файлы в Excel частями или Parquet")
+    export.add_argument('files', nargs='*', help="итоговые xlsx или каталоги Parquet")
+    export.add_argument('--sqlite', help="источник - база SQLite")
+    export.add_argument('--run', type=int, help="только записи запуска с этим id")
+    export.add_argument('--dedupe', action='store_true', help="одна строка на cosId")
+    export.add_argument('-o', '--output', help="итоговый Excel")
+    export.add_argument('--parquet', help="каталог набора Parquet")
+    _add_shard_options(export)
+    export.set_defaults(func=cmd_export)
+
+    stats = commands.add_parser('stats', help="сводка по базе, индексу и очереди")
+    stats.add_argument('--sqlite', default=SQLITE_PATH)
+    stats.add_argument('--index', default=INDEX_PATH)
+    stats.add_argument('--queue', default=QUEUE_PATH)
+    stats.add_argument('--runs', type=int, default=10, help="сколько последних запусков показать")
+    stats.set_defaults(func=cmd_stats)
+
+    schedule = commands.add_parser('schedule', help="выбор заданий в бюджет по скорости изменений")
+    schedule.add_argument('--jobs', required=True, help="файл заданий (как у crawl --jobs)")
+    schedule.add_argument('--budget', type=_duration, required=True, help="время обхода: 90 (минут), 45m, 3h")
+    schedule.add_argument('--sqlite', default=SQLITE_PATH, help="база с историей запусков")
+    schedule.add_argument('--max-age', type=float, help="обходить обязательно, если не было столько суток")
+    schedule.add_argument('-o', '--output', help="файл заданий плана")
+    schedule.set_defaults(func=cmd_schedule)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1140 @@
+"""Обход ЕРВК в браузере: поиск, раскрытие и парсинг карточек по страницам.
+
+crawl() - полный обход с пагинацией (команда `python -m ervk_parser crawl`).
+Настройки обхода - константы модуля ниже; CLI переопределяет их перед
+вызовом crawl(). Состояние запуска (драйвер, хранилища) хранится в
+глобальных переменных модуля, как и в исходном скрипте.
+"""
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import StaleElementReferenceException
+import pandas as pd
+import time
+import datetime
+import logging
+import os
+from webdriver_manager.chrome import ChromeDriverManager
+
+from .browser import SeleniumBackend
+from .locators import locators
+from .metrics import metrics
+from .schema import timestamp
+from .parsing import PARSER_VERSION, card_data_from_xhr, new_card_data, parse_card_text
+from .prefetch import DoubleBufferedNavigator, page_url
+from .capture import cross_check, enable_performance_log
+from .details import DetailFetcher
+from .http_cache import BrowserCacheInterceptor, ResponseCache
+from .sqlite import SQLiteSink
+from .excel import cleanup_temp_files, merge_all_pages, save_to_excel
+from .index import LookupIndex
+from .parse_cache import ParseCache
+from .work_queue import WorkQueue, run_worker
+from .audit import CompletenessAuditor, read_expected
+from .driver_stats import command_stats
+from .trace import tracer
+from .budget import RunBudget, format_duration, save_checkpoint
+from .log import add_journal, flush_logging, is_configured, log, page_progress, remove_journal, setup_logging
+from .batch import print_summary as print_batch_summary, save_summary as save_batch_summary
+from .watchdog import PageTimeout, PageWatchdog, kill_driver
+
+# ============================================================================
+# НАСТРОЙКИ ОБХОДА
+# ============================================================================
+# Адрес списка объектов; без ручной настройки (INTERACTIVE = False) фильтры
+# берутся из параметров этого адреса, например для локального стенда
+START_URL = "https://ervk.gov.ru/objects"
+INTERACTIVE = True
+PREFETCH_NEXT_PAGE = True  # Грузить следующую страницу во второй вкладке
+CAPTURE_MODE = 'dom'  # 'dom' - текст карточек, 'xhr' - перехваченные JSON ответы
+CROSS_CHECK_SAMPLE = 3  # Сколько карточек на странице сверять с DOM в режиме 'xhr'
+# Детали объектов по cosId без раскрытия карточек. Адрес запроса деталей
+# берется из DevTools (вкладка Network при раскрытии карточки)
+DETAIL_FETCH = False
+DETAIL_URL_TEMPLATE = "https://ervk.gov.ru/api/objects/{cos_id}"
+DETAIL_WORKERS = 6
+# Дисковый кэш ответов: None - выключен; режимы 'record', 'replay' (офлайн),
+# 'refresh' (обновлять записи старше RESPONSE_CACHE_MAX_AGE_HOURS)
+RESPONSE_CACHE_DIR = None
+RESPONSE_CACHE_MODE = 'record'
+RESPONSE_CACHE_MAX_AGE_HOURS = 24
+RESPONSE_CACHE_MAX_MB = 500
+# База SQLite с upsert по cosId рядом с Excel: None - не писать
+SQLITE_PATH = 'ervk.sqlite'
+# Набор Parquet по дате запуска и категории риска: None - не писать
+PARQUET_DIR = None
+# Итоговый Excel частями: бюджет строк на часть и/или колонка для деления
+# (например 'Вид контроля'); больше лимита Excel делится всегда
+EXCEL_ROWS_PER_PART = None
+EXCEL_SPLIT_BY = None
+EXCEL_SHARD_MODE = 'files'  # 'files' - книга на часть, 'sheets' - лист на часть
+# Поисковый индекс по ИНН/ОГРН и тексту за все запуски (index.py): None - не обновлять
+INDEX_PATH = 'ervk_index.sqlite'
+# Кэш парсинга по хэшу текста карточки между запусками: None - выключен
+PARSE_CACHE_PATH = 'ervk_parse_cache.sqlite'
+PARSE_CACHE_MAX_ENTRIES = 200000
+# Очередь работ (work_queue.py): процесс берет из очереди профили фильтров
+# и диапазоны страниц вместо ручной настройки. None - обычный режим
+WORK_QUEUE_PATH = None
+# Проверка полноты: сверка cosId с числом "Найдено" и постановка неполных
+# и пропущенных страниц в очередь REFETCH_QUEUE_PATH (None - только отчет)
+AUDIT_COMPLETENESS = True
+REFETCH_QUEUE_PATH = 'ervk_queue.sqlite'
+# Учет команд WebDriver по страницам и фазам; бюджет - предупреждение, если
+# страница потратила больше команд (None - без проверки)
+INSTRUMENT_DRIVER = True
+COMMAND_BUDGET_PER_PAGE = None
+# Сторож страницы: срок на обработку страницы или переход, секунд (None -
+# выключен). По истечении браузер убивается, новая сессия открывает адрес
+# с фильтрами на той же странице; после PAGE_HANG_RETRIES повторов
+# страница пропускается и уходит в очередь дозагрузки
+PAGE_DEADLINE_SECONDS = 180
+# Добавка к сроку страницы на каждую найденную карточку, секунд: раскрытие
+# одной карточки занимает около 3 с, и страница на 100 карточек в 180 с
+# не укладывается (None - срок не зависит от числа карточек)
+PAGE_DEADLINE_PER_CARD = 5
+PAGE_HANG_RETRIES = 2
+# Бюджет запуска (budget.py): лимит времени сбора, секунд (None - без
+# лимита). Обход останавливается после текущей страницы, собирает итог и
+# пишет checkpoint ЕРВК_checkpoint_<запуск>.json для продолжения
+MAX_DURATION_SECONDS = None
+# Продолжение с checkpoint: номер первой страницы (None - с начала)
+RESUME_PAGE = None
+# Трасса страница/фаза/карточка/команда WebDriver в формате Chrome trace
+# events (trace.py), например 'ЕРВК_trace.json': None - выключена
+TRACE_PATH = None
+# cProfile одной фазы ('expand', 'parse', 'save', 'navigate'...) со
+# статистикой в ЕРВК_profile_<фаза>_<запуск>.pstats: None - выключен
+PROFILE_PHASE = None
+
+# Состояние текущего запуска, задается в crawl()
+driver = None
+wait = None
+backend = None
+capture = None
+details = None
+response_cache = None
+cache_interceptor = None
+watchdog = None
+budget = None
+profile_url = None
+sink = None
+lookup_index = None
+parse_cache = None
+temp_files = []
+temp_files_dir = 'temp_pages'
+processed_pages = 0
+run_id = None
+
+# ============================================================================
+# КОНФИГУРАЦИЯ БРАУЗЕРА
+# ============================================================================
+def setup_browser(capture_network=False):
+    """Настройка и запуск браузера."""
+    options = Options()
+    if capture_network:
+        enable_performance_log(options)
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--start-maximized")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    return driver, WebDriverWait(driver, 15)
+
+def open_session():
+    """Запускает браузер и все, что привязано к его сессии."""
+    global driver, wait, backend, capture, details, cache_interceptor
+    driver, wait = setup_browser(capture_network=(CAPTURE_MODE == 'xhr'))
+    if INSTRUMENT_DRIVER or TRACE_PATH:
+        command_stats.instrument(driver)
+    backend = SeleniumBackend(driver)
+    if response_cache:
+        cache_interceptor = BrowserCacheInterceptor(driver, response_cache)
+        cache_interceptor.start()
+    if CAPTURE_MODE == 'xhr':
+        capture = backend.intercept()
+    if DETAIL_FETCH:
+        details = DetailFetcher(driver, DETAIL_URL_TEMPLATE, workers=DETAIL_WORKERS, cache=response_cache)
+
+def restart_session(url):
+    """Убивает зависший браузер, поднимает новую сессию и открывает url."""
+    hung_capture = capture
+    if cache_interceptor:
+        cache_interceptor.stop()
+    kill_driver(driver)
+    log.warning("   🔄 Новая сессия браузера: %s", url)
+    with metrics.timer('watchdog.restart'):
+        open_session()
+        # Число "Найдено" из ответов старой сессии нужно проверке полноты
+        if hung_capture and capture and capture.expected_total is None:
+            capture.expected_total = hung_capture.expected_total
+        driver.get(url)
+        wait_for_page_load(15)
+    metrics.incr('watchdog.restarts')
+
+def recover_page(page_num, navigator=None):
+    """После срабатывания сторожа: новая сессия на странице page_num с теми
+    же фильтрами. Возвращает новый навигатор (старый жил в убитой сессии)."""
+    restart_session(page_url(profile_url, page_num))
+    if navigator:
+        navigator = DoubleBufferedNavigator(driver, find_cards)
+        navigator.start()
+    return navigator
+
+# ============================================================================
+# КЛЮЧЕВЫЕ ФУНКЦИИ РАБОТЫ С КАРТОЧКАМИ
+# ============================================================================
+def find_cards():
+    """Находит ВСЕ карточки на странице.
+
+    Возвращает список пар (cosId, элемент карточки).
+    """
+    try:
+        # Селекторы идут в порядке реестра: сначала тот, что сработал раньше
+        cards = backend.query_cards(locators.selectors('card'))
+        
+        log.info("   Найдено карточек: %d", len(cards))
+        return cards
+        
+    except Exception as e:
+        log.warning("   Ошибка поиска карточек: %s", e)
+        return []
+
+def expand_card_simple(card_element):
+    """Раскрывает карточку ПРОСТЫМ и НАДЕЖНЫМ способом через JS."""
+    try:
+        # Прокручиваем к карточке
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", card_element)
+        time.sleep(0.5)
+        
+        # ПРОСТОЙ JS КЛИК - как в работающем парсере
+        js_click = """
+        var card = arguments[0];
+        
+        // Пробуем кликнуть на все изображения внутри карточки
+        var images = card.getElementsByTagName('img');
+        for (var i = 0; i < images.length; i++) {
+            try {
+                images[i].click();
+            } catch(e) {}
+        }
+        
+        // Также кликаем на саму карточку
+        card.click();
+        
+        // Двойной клик для надежности
+        var evt = new MouseEvent('dblclick', {
+            bubbles: true,
+            cancelable: true,
+            view: window
+        });
+        card.dispatchEvent(evt);
+        
+        return true;
+        """
+        
+        # Выполняем JS клик
+        driver.execute_script(js_click, card_element)
+        
+        # Ждем загрузки раскрытой информации
+        time.sleep(2)
+        
+        # Проверяем, раскрылась ли карточка
+        try:
+            card_text = card_element.text
+            if 'Адрес объекта контроля:' in card_text or 'ИНН:' in card_text or 'Контролируемые лица' in card_text:
+                return True
+        except:
+            pass
+        
+        return False
+        
+    except Exception as e:
+        log.debug("      Ошибка при раскрытии: %s", e)
+        return False
+
+def expand_all_cards(cards):
+    """Раскрывает ВСЕ карточки на странице ПЕРЕД парсингом.
+
+    cards - результат find_cards(): те же ссылки на элементы потом
+    используются для парсинга, повторный поиск не нужен.
+    """
+    if not cards:
+        log.warning("   ⚠ Карточки не найдены")
+        return False
+    
+    log.info("   Раскрываю %d карточек...", len(cards))
+    
+    for i, (cos_id, card) in enumerate(cards):
+        try:
+            with tracer.span('card', index=i + 1, cos_id=cos_id):
+                # Прокручиваем
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card)
+                time.sleep(0.3)
+                
+                # Раскрываем
+                expand_card_simple(card)
+                
+            # Пауза между карточками
+            time.sleep(0.5)
+            
+        except Exception as e:
+            log.debug("      Ошибка карточки %d: %s", i + 1, e)
+    
+    # Даем время на загрузку всех данных
+    log.info("   Жду загрузки раскрытых данных...")
+    time.sleep(3)
+    
+    return True
+
+def _person_name(element):
+    """Текст элемента, если он похож на ФИО/наименование."""
+    text = element.text.strip()
+    if text and len(text) > 5 and ' ' in text:
+        return text
+    return None
+
+def parse_card_data(card_element, cos_id=None, collected_at=None):
+    """Парсит данные из раскрытой карточки."""
+    data = new_card_data(cos_id, collected_at)
+    
+    try:
+        # Получаем весь текст карточки
+        card_text = card_element.text
+        
+        # Такой же текст уже разбирали - берем готовый результат
+        if parse_cache:
+            cached = parse_cache.get(card_text)
+            if cached:
+                data.update(cached)
+                data.intern_categories()
+                return data
+        
+        # ФИО/наименование контролируемого лица ищем по элементам карточки
+        try:
+            person_name = locators.find(card_element, 'person_name', extract=_person_name)
+        except StaleElementReferenceException:
+            raise
+        except Exception as e:
+            log.debug("      Ошибка поиска ФИО: %s", e)
+            person_name = None
+        
+        parse_card_text(card_text, data, person_name)
+        
+        if parse_cache:
+            parse_cache.put(card_text, data)
+        
+        return data
+        
+    except StaleElementReferenceException:
+        raise
+    except Exception as e:
+        log.warning("      Ошибка парсинга: %s", e, extra={'cos_id': cos_id})
+        data.status = f'Ошибка: {str(e)[:30]}'
+        return data
+
+def process_page(page_num, navigator=None, expanded=False, capture=None, details=None):
+    """Обрабатывает одну страницу и возвращает данные.
+
+    navigator - DoubleBufferedNavigator: пока раскрывается и парсится эта
+    страница, он грузит следующую во второй вкладке. expanded=True значит,
+    что карточки уже раскрыты в фоне и кликать по ним повторно не нужно.
+    capture - NetworkCapture: записи берутся из перехваченных JSON ответов,
+    DOM парсится только для выборочной сверки и для карточек без ответа.
+    details - DetailFetcher: карточки не раскрываются, детали объектов
+    загружаются параллельно по cosId со свернутого списка.
+    """
+    log.info("\n%s\n📄 СТРАНИЦА %s\n%s", '=' * 60, page_num, '=' * 60, extra={'page': page_num})
+    
+    page_data = []
+    # Одно время сбора на всю страницу
+    collected_at = timestamp()
+    command_stats.begin_page(page_num)
+    
+    try:
+        # 1. Находим карточки ОДИН раз - те же элементы раскрываем и парсим
+        log.info("1. Ищу карточки на странице...")
+        command_stats.set_phase('find_cards')
+        cards = find_cards()
+        if watchdog and watchdog.deadline and PAGE_DEADLINE_PER_CARD:
+            watchdog.extend(watchdog.deadline + len(cards) * PAGE_DEADLINE_PER_CARD)
+        
+        # Следующая страница начинает грузиться во второй вкладке
+        if navigator and cards:
+            with command_stats.phase('prefetch'):
+                navigator.prefetch(page_num + 1)
+        
+        if details:
+            return collect_details_page(page_num, cards, details, navigator, collected_at)
+        
+        # 2. Раскрываем ВСЕ карточки на странице
+        command_stats.set_phase('expand')
+        if expanded:
+            log.info("2. Карточки уже раскрыты во второй вкладке")
+        else:
+            log.info("2. Раскрываю все карточки на странице...")
+            if not expand_all_cards(cards):
+                log.warning("   ⚠ Не удалось раскрыть карточки", extra={'page': page_num})
+                return page_data
+        
+        # Пока эта страница парсится, следующая раскрывается в фоне
+        if navigator:
+            with command_stats.phase('prefetch'):
+                navigator.prepare()
+        
+        log.info("   Найдено %d карточек для парсинга", len(cards))
+        
+        # 3. Парсим каждую карточку
+        log.info("3. Парсим данные...")
+        command_stats.set_phase('parse')
+        
+        # Ответы сервера, пришедшие при загрузке и раскрытии страницы
+        if capture:
+            capture.drain()
+        check_pairs = []
+        
+        for i, (cos_id, card) in enumerate(cards):
+            try:
+                xhr_record = capture.record_for(cos_id) if capture else None
+                if xhr_record and len(check_pairs) >= CROSS_CHECK_SAMPLE:
+                    # Карточка уже есть в перехваченном JSON - DOM не читаем
+                    card_data = card_data_from_xhr(cos_id, xhr_record, collected_at)
+                    card_data.page = page_num
+                    page_data.append(card_data)
+                    metrics.incr('capture.records')
+                    continue
+                
+                # Парсим данные; если React перерисовал карточку после
+                # раскрытия - один раз ищем карточки заново и берем по cosId
+                with tracer.span('card', index=i + 1, cos_id=cos_id):
+                    try:
+                        card_data = parse_card_data(card, cos_id, collected_at)
+                    except StaleElementReferenceException:
+                        fresh = dict(find_cards())
+                        if cos_id not in fresh:
+                            raise
+                        card_data = parse_card_data(fresh[cos_id], cos_id, collected_at)
+                card_data.page = page_num
+                
+                if xhr_record:
+                    # Выборка для сверки: DOM-запись остается в данных
+                    check_pairs.append((card_data_from_xhr(cos_id, xhr_record, collected_at), card_data))
+                
+                # Добавляем в данные страницы
+                page_data.append(card_data)
+                
+                # Выводим краткий результат
+                if i < 5 and log.isEnabledFor(logging.DEBUG):  # Показываем только первые 5 для логов
+                    status = "✓" if card_data.status == '✓ Успешно' else "⚠" if '⚠' in card_data.status else "✗"
+                    log.debug("   Карточка %d: %s %s... | ИНН: %s", i + 1, status, (card_data.fio or 'нет ФИО')[:20],
+                              card_data.inn or 'нет', extra={'page': page_num, 'cos_id': cos_id})
+                
+                # Пауза между карточками
+                time.sleep(0.3)
+                
+            except Exception as e:
+                log.warning("   Ошибка обработки карточки %d: %s", i + 1, e, extra={'page': page_num, 'cos_id': cos_id})
+        
+        if check_pairs:
+            report = cross_check([x for x, _ in check_pairs], [d for _, d in check_pairs])
+            metrics.incr('capture.checked', report['compared'])
+            metrics.incr('capture.mismatches', len(report['mismatches']))
+            log.info("   Сверка XHR/DOM: %d карточек, расхождений: %d", report['compared'], len(report['mismatches']))
+            for cos_id, field, xhr_value, dom_value in report['mismatches'][:5]:
+                log.info("      №%s %s: XHR=%r DOM=%r", cos_id, field, xhr_value, dom_value)
+        
+        # Показываем статистику по странице
+        success_count = sum(1 for d in page_data if d.status == '✓ Успешно')
+        if log.isEnabledFor(logging.INFO):
+            log.info("\n📊 Статистика страницы %s:\n   Всего карточек: %d\n   Успешно собрано: %d\n"
+                     "   С ФИО: %d\n   С ИНН: %d", page_num, len(page_data), success_count,
+                     sum(1 for d in page_data if d.fio), sum(1 for d in page_data if d.inn))
+        if log.isEnabledFor(logging.DEBUG):
+            command_stats.print_page_summary(page_num, emit=log.debug)
+        for problem in command_stats.check_budget(page_num, max_commands=COMMAND_BUDGET_PER_PAGE):
+            metrics.incr('webdriver.budget_exceeded')
+            log.warning("   ⚠ Превышен бюджет команд: %s", problem, extra={'page': page_num})
+        
+        return page_data
+        
+    except Exception as e:
+        log.error("⚠ Критическая ошибка на странице %s: %s", page_num, e, extra={'page': page_num})
+        return page_data
+
+def collect_details_page(page_num, cards, details, navigator=None, collected_at=None):
+    """Собирает страницу без раскрытия: детали по cosId загружаются параллельно."""
+    if not cards:
+        log.warning("   ⚠ Карточки не найдены", extra={'page': page_num})
+        return []
+    
+    # Следующая страница грузится во второй вкладке, раскрывать ее не нужно
+    if navigator:
+        navigator.prepare(expand=False)
+    
+    log.info("2. Загружаю детали %d объектов по cosId...", len(cards))
+    fetched = details.fetch_all([cos_id for cos_id, _ in cards])
+    
+    page_data = []
+    for cos_id, card in cards:
+        if fetched.get(cos_id):
+            card_data = card_data_from_xhr(cos_id, fetched[cos_id], collected_at)
+        else:
+            # Детали не пришли - берем то, что видно в свернутой карточке
+            card_data = parse_card_data(card, cos_id, collected_at)
+        card_data.page = page_num
+        page_data.append(card_data)
+    
+    success_count = sum(1 for d in page_data if d.status == '✓ Успешно')
+    log.info("   Собрано %d карточек, успешно: %d", len(page_data), success_count)
+    return page_data
+
+def store_page(page_data, page_num, temp_filename):
+    """Пишет страницу во все включенные хранилища и во временный Excel."""
+    command_stats.set_phase('save')
+    # Upsert страницы в SQLite одной транзакцией
+    if sink:
+        try:
+            with tracer.span('sqlite', rows=len(page_data)):
+                sink.write_page(page_data, page_num)
+        except Exception as e:
+            log.error("   ⚠ Ошибка записи в SQLite: %s", e, extra={'page': page_num})
+    
+    if parse_cache:
+        with tracer.span('parse_cache'):
+            parse_cache.flush()
+    
+    # Индекс поиска обновляется постранично
+    if lookup_index:
+        try:
+            with tracer.span('index'):
+                lookup_index.update(page_data, run_id=run_id)
+        except Exception as e:
+            log.error("   ⚠ Ошибка обновления индекса: %s", e, extra={'page': page_num})
+    
+    with tracer.span('save_to_excel', rows=len(page_data)):
+        return save_to_excel(page_data, temp_filename)
+
+def crawl_work_item(item):
+    """Обходит страницы работы из очереди; возвращает число записей.
+
+    Фильтры берутся из адреса профиля, ручная настройка не нужна. Пустая
+    страница считается ошибкой - работа вернется в очередь целиком.
+    """
+    global processed_pages
+    records = 0
+    log.info("\n📦 Работа %s: профиль %s, страницы %s-%s (попытка %s)",
+             item.id, item.profile, item.page_from, item.page_to, item.attempts)
+    for page in item.pages():
+        page_started = time.time()
+        with watchdog.guard(page):
+            command_stats.begin_page(page)
+            command_stats.set_phase('navigate')
+            driver.get(page_url(item.url, page))
+            wait_for_page_load(15)
+            page_data = process_page(page, capture=capture, details=details)
+        if watchdog.expired:
+            # Работа вернется в очередь, следующей нужна живая сессия
+            restart_session(item.url)
+            raise PageTimeout(f"страница {page} дольше {watchdog.limit:g} с")
+        if not page_data:
+            raise RuntimeError(f"страница {page} без карточек")
+        temp_filename = os.path.join(temp_files_dir, f'{item.profile}_page_{page:03d}.xlsx')
+        if store_page(page_data, page, temp_filename):
+            temp_files.append(temp_filename)
+            processed_pages += 1
+        records += len(page_data)
+        budget.record_page(time.time() - page_started)
+        page_progress(page, len(page_data), sum(1 for d in page_data if d.status == '✓ Успешно'),
+                      time.time() - page_started)
+    return records
+
+def _active_button(button):
+    return button if button.is_displayed() and button.is_enabled() else None
+
+def _page_number(button):
+    page_text = button.text.strip()
+    return int(page_text) if page_text.isdigit() else None
+
+def _find_on_page(role, extract):
+    """locators.find по всей странице; если пагинатор перерисовался во время поиска - еще раз."""
+    try:
+        return locators.find(driver, role, extract=extract)
+    except StaleElementReferenceException:
+        return locators.find(driver, role, extract=extract)
+
+def find_next_page_button():
+    """Находит кнопку перехода на следующую страницу."""
+    try:
+        # Селекторы перебирает реестр, начиная с сработавшего в прошлый раз;
+        # подходит только видимая и активная кнопка
+        return _find_on_page('next_button', _active_button)
+        
+    except Exception as e:
+        log.warning("   Ошибка поиска кнопки следующей страницы: %s", e)
+        return None
+
+def wait_for_page_load(timeout=10):
+    """Ждет загрузки страницы."""
+    try:
+        # Ждем появления карточек
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'css-s85nh6')]"))
+        )
+        return True
+    except:
+        log.warning("   ⚠ Таймаут загрузки страницы, но продолжаем...")
+        return True  # Все равно продолжаем
+
+def get_current_page_number():
+    """Пытается определить текущий номер страницы из пагинатора."""
+    try:
+        # Ищем активную (выбранную) кнопку страницы в пагинаторе,
+        # включая вариант классов сайта ЕРВК (fp-MuiPaginationItem-page)
+        page_number = _find_on_page('active_page', _page_number)
+        if page_number is not None:
+            return page_number
+        
+        return 1  # Значение по умолчанию
+        
+    except Exception as e:
+        log.warning("Ошибка определения номера страницы: %s", e)
+        return 1
+
+def crawl_listing(budget, auditor=None, start_page=1, temp_prefix='page'):
+    """Основной цикл по страницам открытого списка: обработка, запись, переход.
+
+    Возвращает итог: записей, успешных, страница остановки по бюджету
+    (stopped_at) и зависшие страницы (hung_pages).
+    """
+    global processed_pages
+    result = {'records': 0, 'ok': 0, 'stopped_at': None, 'hung_pages': []}
+    current_page = start_page
+    prefetched = False
+    navigator = None
+    if PREFETCH_NEXT_PAGE:
+        navigator = DoubleBufferedNavigator(driver, find_cards)
+        navigator.start()
+    
+    while True:
+        log.info("\n%s\n🚀 НАЧИНАЮ ОБРАБОТКУ СТРАНИЦЫ %s\n%s", '=' * 60, current_page, '=' * 60)
+        
+        # Обрабатываем текущую страницу
+        page_started = time.time()
+        with watchdog.guard(current_page):
+            page_data = process_page(current_page, navigator=navigator, expanded=prefetched,
+                                     capture=capture, details=details)
+        prefetched = False
+        
+        # Страница зависла: данные неполные, повторяем ее в новой сессии
+        if watchdog.expired:
+            hangs = sum(1 for incident in watchdog.incidents if incident['page'] == current_page)
+            if hangs > PAGE_HANG_RETRIES:
+                log.warning("   ⚠ Страница %s зависает %d раз - пропускаю, она уйдет в очередь дозагрузки",
+                            current_page, hangs, extra={'page': current_page})
+                result['hung_pages'].append(current_page)
+                if auditor:
+                    auditor.record_page(current_page, [])
+                current_page += 1
+            navigator = recover_page(current_page, navigator)
+            continue
+        if auditor:
+            auditor.record_page(current_page, [data.cos_id for data in page_data])
+        
+        if page_data:
+            # Сохраняем данные страницы
+            temp_filename = os.path.join(temp_files_dir, f'{temp_prefix}_{current_page:03d}.xlsx')
+            if store_page(page_data, current_page, temp_filename):
+                temp_files.append(temp_filename)
+                processed_pages += 1
+                ok = sum(1 for d in page_data if d.status == '✓ Успешно')
+                result['records'] += len(page_data)
+                result['ok'] += ok
+                page_progress(current_page, len(page_data), ok, time.time() - page_started)
+        
+        # Бюджет запуска: текущая страница доработана, следующая не начинается,
+        # если не успеет целиком
+        budget.record_page(time.time() - page_started)
+        if auditor and auditor.expected_pages():
+            budget.check_fit(auditor.expected_pages() - current_page, log)
+        if budget.exhausted():
+            result['stopped_at'] = current_page
+            if budget.reason == 'pages':
+                # Лимит страниц задан пользователем - это не сбой
+                log.info("\n✅ Достигнут лимит в %s страниц (страница %s)", budget.max_pages, current_page)
+            else:
+                log.warning("\n⚠ Бюджет запуска исчерпан (время) после страницы %s: %d страниц за %s",
+                            current_page, budget.pages, format_duration(budget.elapsed()))
+            break
+        
+        # Следующая страница уже загружена и раскрыта во второй вкладке
+        if navigator and navigator.swap(current_page + 1, get_current_page_number):
+            current_page += 1
+            prefetched = True
+            log.info("   ✅ Переход на страницу %s из второй вкладки", current_page)
+            continue
+        
+        # Пытаемся перейти на следующую страницу
+        log.info("\n🔍 Ищу следующую страницу после %s...", current_page)
+        command_stats.set_phase('navigate')
+        watchdog.arm(current_page + 1, 'navigate')
+        
+        # Сохраняем элемент для проверки обновления DOM
+        try:
+            stale_element = driver.find_element(By.XPATH, "//div[contains(@class, 'css-s85nh6')]")
+        except:
+            stale_element = None
+        
+        # Ищем кнопку следующей страницы
+        next_button = find_next_page_button()
+        
+        if not next_button:
+            log.info("   ✅ Кнопка следующей страницы не найдена - это последняя страница")
+            # Объединение и выгрузка идут уже без таймера перехода
+            watchdog.disarm()
+            break
+        
+        # Кликаем по кнопке следующей страницы[citation:6]
+        try:
+            log.debug("   Найдена кнопка следующей страницы")
+            
+            # Прокручиваем к кнопке
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
+            time.sleep(0.5)
+            
+            # Кликаем через JS
+            driver.execute_script("arguments[0].click();", next_button)
+            
+            # Ждем загрузки новой страницы[citation:1][citation:2]
+            log.debug("   Жду загрузки страницы %s...", current_page + 1)
+            time.sleep(2)
+            
+            # Ключевое исправление: ждем, пока элемент со старой страницы станет неактивным[citation:4]
+            if stale_element:
+                try:
+                    WebDriverWait(driver, 10).until(EC.staleness_of(stale_element))
+                    log.debug("   ✅ DOM обновился, загрузка страницы %s подтверждена", current_page + 1)
+                except:
+                    log.warning("   ⚠ Элемент не устарел, но продолжаем...")
+            
+            # Дополнительная проверка: ждем появления карточек на новой странице
+            try:
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'css-s85nh6')]"))
+                )
+                log.debug("   ✅ Карточки на странице %s загружены", current_page + 1)
+            except:
+                log.warning("   ⚠ Карточки не найдены, но продолжаем...")
+            
+            # Проверяем, изменился ли номер текущей страницы в пагинаторе
+            try:
+                # Ждем, пока обновится активная кнопка пагинации
+                time.sleep(1)
+                new_page_num = get_current_page_number()
+                if new_page_num > current_page:
+                    current_page = new_page_num
+                    log.info("   ✅ Успешный переход на страницу %s", current_page)
+                else:
+                    # Если не удалось определить номер, просто увеличиваем счетчик
+                    current_page += 1
+                    log.info("   ✅ Предположительный переход на страницу %s", current_page)
+            except:
+                current_page += 1
+            
+            # Небольшая пауза перед обработкой следующей страницы
+            time.sleep(1)
+            
+        except Exception as e:
+            if not watchdog.expired:
+                log.error("   ⚠ Ошибка при переходе на следующую страницу: %s", e, exc_info=True)
+                watchdog.disarm()
+                break
+            current_page += 1
+        
+        # Переход завис: открываем нужную страницу по адресу в новой сессии
+        watchdog.disarm()
+        if watchdog.expired:
+            navigator = recover_page(current_page, navigator)
+    
+    if navigator:
+        navigator.close()
+    return result
+
+def finish_listing(output_filename, result, budget, auditor=None, tag=None, shard_options=None):
+    """После цикла: checkpoint при остановке по времени, проверка полноты с
+    очередью дозагрузки, итоговый Excel и очистка временных файлов.
+    Возвращает статус: 'budget' или 'finished'."""
+    tag = tag or run_id
+    shard_options = shard_options or {}
+    # Остановка по бюджету: точка продолжения, пропуском считается только пройденная часть
+    stopped_at = result['stopped_at']
+    hung_pages = result['hung_pages']
+    if stopped_at is not None:
+        last_known = auditor.expected_pages() if auditor else None
+        if auditor:
+            auditor.stopped_at = stopped_at
+        # Остановка по --max-pages - намеренная, продолжать ее не нужно
+        if budget.reason != 'pages' and (last_known is None or stopped_at < last_known):
+            checkpoint = save_checkpoint(
+                f'ЕРВК_checkpoint_{tag}.json', run_id=tag, profile_url=profile_url,
+                next_page=stopped_at + 1, last_page=last_known, reason=budget.reason,
+                pages_done=budget.pages, seconds=round(budget.elapsed()), output=output_filename)
+            print(f"   💾 Точка продолжения: страница {stopped_at + 1} "
+                  f"(python -m ervk_parser crawl --resume {checkpoint})")
+
+    # 5. ПРОВЕРКА ПОЛНОТЫ: перезагружаем только неполные и пропущенные страницы
+    if auditor:
+        if auditor.expected_total is None and capture:
+            auditor.expected_total = capture.expected_total
+        auditor.print_report()
+        auditor.save(f'ЕРВК_проверка_{tag}.json')
+        if REFETCH_QUEUE_PATH and auditor.pages_to_refetch():
+            refetch_queue = WorkQueue(REFETCH_QUEUE_PATH)
+            added = auditor.enqueue_refetch(refetch_queue, f'refetch_{tag}', profile_url)
+            refetch_queue.close()
+            print(f"   📥 В очередь {REFETCH_QUEUE_PATH} поставлено работ: {added} "
+                  f"(python -m ervk_parser crawl --queue {REFETCH_QUEUE_PATH})")
+    elif hung_pages and REFETCH_QUEUE_PATH:
+        # Без проверки полноты зависшие страницы ставятся в очередь напрямую
+        refetch_queue = WorkQueue(REFETCH_QUEUE_PATH)
+        refetch_queue.add_profile(f'refetch_{tag}', profile_url)
+        for page in hung_pages:
+            refetch_queue.enqueue(f'refetch_{tag}', page)
+        refetch_queue.close()
+        print(f"   📥 Зависшие страницы {hung_pages} поставлены в очередь {REFETCH_QUEUE_PATH}")
+
+    # 6. ОБЪЕДИНЕНИЕ ВСЕХ СТРАНИЦ
+    print("\n" + "=" * 70)
+    print("ОБЪЕДИНЕНИЕ ДАННЫХ СО ВСЕХ СТРАНИЦ")
+    print("=" * 70)
+
+    if temp_files:
+        print(f"\n📦 Объединяю данные из {len(temp_files)} страниц...")
+
+        # Объединяем все временные файлы
+        if merge_all_pages(output_filename, temp_files, parquet_dir=PARQUET_DIR, run_id=tag,
+                           **shard_options):
+            print("\n🎉 ПАРСИНГ УСПЕШНО ЗАВЕРШЕН!")
+
+            # Показываем примеры данных
+            try:
+                df = pd.read_excel(output_filename, nrows=3)
+                if 'cosId' not in df.columns:
+                    raise ValueError("итог выгружен частями, примеры смотрите в файлах частей")
+                print("\n📋 ПРИМЕРЫ СОБРАННЫХ ДАННЫХ:")
+                print("-" * 80)
+
+                sample = df.head(3)
+                for idx, row in sample.iterrows():
+                    print(f"Запись {idx+1} (страница {row.get('Номер страницы', '?')}):")
+                    print(f"  cosId: {row.get('cosId')}")
+                    print(f"  ФИО: {row.get('ФИО', 'не найдено')}")
+                    print(f"  ИНН: {row.get('ИНН', 'не найдено')}")
+                    print(f"  Адрес: {str(row.get('Адрес объекта контроля', 'не найден'))[:50]}...")
+                    print(f"  Статус: {row.get('Статус', '?')}")
+                    print()
+
+                print("-" * 80)
+
+            except Exception as e:
+                print(f"Ошибка при чтении итогового файла: {e}")
+
+        else:
+            print("⚠ Ошибка объединения данных")
+    else:
+        print("⚠ Нет данных для объединения")
+
+
+    # 7. ОЧИСТКА ВРЕМЕННЫХ ФАЙЛОВ
+    print("\n🧹 Очищаю временные файлы...")
+    cleanup_temp_files(temp_files)
+
+    # Удаляем временную директорию если она пуста
+    try:
+        if os.path.exists(temp_files_dir) and not os.listdir(temp_files_dir):
+            os.rmdir(temp_files_dir)
+    except:
+        pass
+    
+    return 'budget' if stopped_at is not None else 'finished'
+
+def run_job(job, max_pages, shard_options=None):
+    """Одно задание пакета в уже открытой сессии: свой бюджет, журнал,
+    запуск в SQLite и итоговый Excel. Ошибка задания не останавливает пакет.
+
+    max_pages - лимит страниц запуска для заданий без своего max_pages.
+    """
+    global budget, profile_url, temp_files, processed_pages
+    name = job['name']
+    first_page = job.get('first_page', 1)
+    tag = f"{name}_{run_id}"
+    output_filename = job.get('output') or f'ЕРВК_{name}_{run_id}.xlsx'
+    journal = add_journal(f'ЕРВК_{tag}.jsonl')
+    temp_files = []
+    processed_pages = 0
+    budget = RunBudget(max_seconds=job.get('max_duration') or MAX_DURATION_SECONDS,
+                       max_pages=job.get('max_pages') or max_pages)
+    result = {'name': name, 'url': job['url'], 'output': output_filename, 'status': 'failed',
+              'pages': 0, 'records': 0, 'ok': 0, 'seconds': 0, 'error': None}
+    started = time.time()
+    if sink:
+        sink.begin_run(note=f'batch {name}', query=name)
+    log.info("\n%s\n📚 ЗАДАНИЕ %s: %s\n%s", '=' * 70, name, job['url'], '=' * 70, extra={'event': 'job'})
+    try:
+        # Число "Найдено" прошлого задания к этому профилю не относится
+        if capture:
+            capture.expected_total = None
+        # Нумерация страниц начинается с first_page - туда и переходим
+        driver.get(page_url(job['url'], first_page) if first_page > 1 else job['url'])
+        wait_for_page_load(15)
+        if first_page > 1 and get_current_page_number() != first_page:
+            raise RuntimeError(f"не удалось открыть страницу {first_page} по адресу задания")
+        profile_url = driver.current_url
+        log.info("   ⏱ Бюджет задания: %s", budget.describe())
+        auditor = None
+        if AUDIT_COMPLETENESS:
+            expected_total, last_page = read_expected(driver)
+            auditor = CompletenessAuditor(expected_total=expected_total, last_page=last_page,
+                                          first_page=first_page)
+        listing = crawl_listing(budget, auditor, start_page=first_page, temp_prefix=name)
+        result['records'] = listing['records']
+        result['ok'] = listing['ok']
+        flush_logging()
+        result['status'] = finish_listing(output_filename, listing, budget, auditor, tag, shard_options)
+    except Exception as e:
+        log.error("   ⚠ Задание %s завершилось ошибкой: %s", name, e, exc_info=True)
+        result['error'] = str(e)
+        cleanup_temp_files(temp_files)
+        # Следующее задание начинается в рабочей сессии
+        try:
+            restart_session(START_URL)
+        except Exception as restart_error:
+            log.error("   ⚠ Не удалось перезапустить браузер: %s", restart_error)
+    finally:
+        if watchdog:
+            watchdog.disarm()
+        if sink:
+            sink.finish_run(result['status'])
+        remove_journal(journal)
+    result['pages'] = processed_pages
+    result['seconds'] = round(time.time() - started, 1)
+    return result
+
+# ============================================================================
+# ОСНОВНОЙ КОД
+# ============================================================================
+def crawl(max_pages=1000, output_filename=None, jobs=None):
+    """Полный обход: ручная настройка фильтров (или очередь работ, или пакет
+    заданий jobs), все страницы, объединение в итоговый Excel. Возвращает
+    статус запуска."""
+    global response_cache, cache_interceptor, watchdog, budget, profile_url
+    global sink, lookup_index, parse_cache, temp_files, processed_pages, run_id
+    
+    if not is_configured():
+        setup_logging()
+        
+    log.info("%s\nПАРСЕР ЕРВК - ПОЛНАЯ ВЕРСИЯ С ПАГИНАЦИЕЙ\nОБРАБАТЫВАЕТ ВСЕ СТРАНИЦЫ АВТОМАТИЧЕСКИ\n%s",
+             '=' * 70, '=' * 70)
+
+    # Создаем имя файла
+    run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_filename = output_filename or f'ЕРВК_все_страницы_{run_id}.xlsx'
+    temp_files = []
+    processed_pages = 0
+    response_cache = cache_interceptor = None
+    os.makedirs(temp_files_dir, exist_ok=True)
+    if TRACE_PATH or PROFILE_PHASE:
+        tracer.start(trace=bool(TRACE_PATH), profile_phase=PROFILE_PHASE)
+
+    log.info("📁 Итоговый файл: %s\n📁 Временные файлы: %s/\n\n%s", output_filename, temp_files_dir, '=' * 70)
+        
+    run_status = 'failed'
+    auditor = None
+    budget = RunBudget(max_seconds=MAX_DURATION_SECONDS, max_pages=max_pages)
+    shard_options = dict(rows_per_part=EXCEL_ROWS_PER_PART, split_by=EXCEL_SPLIT_BY, shard_mode=EXCEL_SHARD_MODE)
+        
+    try:
+        # 1. Настройка браузера
+        log.info("\n1. Запускаю браузер...")
+        if RESPONSE_CACHE_DIR:
+            response_cache = ResponseCache(RESPONSE_CACHE_DIR, mode=RESPONSE_CACHE_MODE,
+                                           max_age=RESPONSE_CACHE_MAX_AGE_HOURS * 3600,
+                                           max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024)
+            log.info("   Кэш ответов: %s (режим %s)", RESPONSE_CACHE_DIR, RESPONSE_CACHE_MODE)
+        with metrics.timer('browser.start'):
+            open_session()
+        # Сторож смотрит на текущий драйвер: после перезапуска он уже другой
+        watchdog = PageWatchdog(PAGE_DEADLINE_SECONDS, on_expire=lambda: kill_driver(driver))
+        
+        if SQLITE_PATH:
+            sink = SQLiteSink(SQLITE_PATH)
+            if not jobs:
+                sink.begin_run(note=output_filename)
+                log.info("   База SQLite: %s (запуск #%s)", SQLITE_PATH, sink.run_id)
+        if INDEX_PATH:
+            lookup_index = LookupIndex(INDEX_PATH)
+        if PARSE_CACHE_PATH:
+            parse_cache = ParseCache(PARSE_CACHE_PATH, PARSER_VERSION, max_entries=PARSE_CACHE_MAX_ENTRIES)
+        
+        # 2. Переход на сайт
+        log.info("2. Открываю сайт %s...", START_URL)
+        driver.get(START_URL)
+        time.sleep(3)
+        
+        # 3. Ручная настройка (в режиме очереди и пакета фильтры берутся из профилей)
+        if not WORK_QUEUE_PATH and not jobs:
+            if INTERACTIVE:
+                # Инструкция нужна в любом режиме журнала
+                flush_logging()
+                print("\n" + "=" * 70)
+                print("ШАГ 1: РУЧНАЯ НАСТРОЙКА ПОИСКА")
+                print("=" * 70)
+                print("ВАЖНО: НЕ закрывайте браузер!")
+                print("1. Настройте фильтры (регион, вид контроля и т.д.)")
+                print("2. Дождитесь загрузки результатов")
+                print("3. Нажмите Enter в этом окне")
+                print("\nПрограмма автоматически обработает ВСЕ страницы")
+                print("=" * 70)
+                
+                input("\nНажмите Enter, когда готовы...")
+                # Время на ручную настройку в бюджет сбора не входит
+                budget.started = time.time()
+            else:
+                # Без ручной настройки фильтры заданы в адресе START_URL
+                wait_for_page_load(15)
+            
+            # 4. Начинаем сбор данных
+            log.info("\n2. Начинаю сбор данных со всех страниц...\n"
+                     "   🔍 Будет обработано до %s страниц автоматически\n"
+                     "   📊 Каждая страница сохраняется отдельно\n"
+                     "   ⏳ Процесс может занять длительное время\n\n%s", max_pages, '=' * 70)
+            log.info("   ⏱ Бюджет запуска: %s", budget.describe())
+            
+            time.sleep(2)
+            # Адрес с настроенными фильтрами: с него сторож начинает новую сессию
+            profile_url = driver.current_url
+            # Обход идет с открытой страницы: пользователь мог перейти дальше первой
+            start_page = RESUME_PAGE or get_current_page_number()
+            if start_page > 1:
+                log.info("   ▶ Начинаю со страницы %s", start_page)
+            
+            if AUDIT_COMPLETENESS:
+                expected_total, last_page = read_expected(driver)
+                auditor = CompletenessAuditor(expected_total=expected_total, last_page=last_page,
+                                              first_page=start_page)
+                log.info("   🔎 Ожидается объектов: %s", expected_total if expected_total is not None else 'неизвестно')
+        
+        # ============================================================================
+        # ОСНОВНОЙ ЦИКЛ ПО СТРАНИЦАМ
+        # ============================================================================
+        processed_pages = 0
+        
+        if jobs:
+            # ПАКЕТ: профили фильтров подряд в уже прогретой сессии
+            results = [run_job(job, max_pages, shard_options) for job in jobs]
+            flush_logging()
+            print_batch_summary(results, browser_seconds=metrics.timings.get('browser.start'))
+            summary = save_batch_summary(f'ЕРВК_пакет_{run_id}.json', results, run_id=run_id)
+            print(f"   📄 {summary} - сводка пакета")
+            run_status = 'finished' if all(r['status'] in ('finished', 'budget') for r in results) else 'failed'
+        elif WORK_QUEUE_PATH:
+            # РЕЖИМ ВОРКЕРА: берем работы из общей очереди, пока она не опустеет
+            # или не кончится бюджет (проверяется между работами)
+            work_queue = WorkQueue(WORK_QUEUE_PATH)
+            done_items = run_worker(work_queue, crawl_work_item, should_stop=budget.exhausted)
+            if budget.reason:
+                log.warning("\n⚠ Бюджет запуска исчерпан (%s), выполнено работ: %d; остальные ждут в очереди",
+                            budget.reason, done_items)
+            else:
+                log.info("\n✅ Очередь пуста, выполнено работ: %d", done_items)
+            work_queue.close()
+            flush_logging()
+            run_status = finish_listing(output_filename, {'stopped_at': None, 'hung_pages': []}, budget,
+                                        shard_options=shard_options)
+        else:
+            result = crawl_listing(budget, auditor, start_page=start_page)
+            
+            # Дальше отчеты печатаются напрямую - сначала выписываем журнал
+            flush_logging()
+            run_status = finish_listing(output_filename, result, budget, auditor, shard_options=shard_options)
+
+    except KeyboardInterrupt:
+        flush_logging()
+        print("\n\n⚠ ПАРСИНГ ПРЕРВАН ПОЛЬЗОВАТЕЛЕМ!")
+        run_status = 'interrupted'
+        
+        # Сохраняем то, что успели собрать
+        if temp_files:
+            print("\n💾 Сохраняю собранные данные...")
+            emergency_filename = f'ЕРВК_прервано_{run_id}.xlsx'
+            if merge_all_pages(emergency_filename, temp_files, parquet_dir=PARQUET_DIR, run_id=run_id,
+                               **shard_options):
+                print(f"✅ Данные сохранены в {emergency_filename}")
+        
+        cleanup_temp_files(temp_files)
+        
+    except Exception as e:
+        log.critical("\n\n⚠ КРИТИЧЕСКАЯ ОШИБКА: %s", e, exc_info=True)
+        
+    finally:
+        if watchdog:
+            watchdog.disarm()
+        flush_logging()
+        
+        print("\n" + "=" * 70)
+        print("ЗАВЕРШЕНИЕ РАБОТЫ")
+        print("=" * 70)
+        
+        print("\n📋 ИТОГОВАЯ СТАТИСТИКА:")
+        print(f"   Обработано страниц: {processed_pages}")
+        print(f"   Сохранено временных файлов: {len(temp_files)}")
+        
+        print("\n📈 МЕТРИКИ:")
+        metrics.report()
+        command_stats.print_report()
+        if watchdog:
+            watchdog.print_report()
+        if TRACE_PATH or PROFILE_PHASE:
+            tracer.finish(TRACE_PATH, f'ЕРВК_profile_{PROFILE_PHASE}_{run_id}.pstats' if PROFILE_PHASE else None)
+        
+        print("\n📁 СОЗДАННЫЕ ФАЙЛЫ:")
+        if os.path.exists(output_filename):
+            print(f"   📄 {output_filename} - итоговый файл со всеми данными")
+        
+        print("\n🔧 РЕКОМЕНДАЦИИ:")
+        print("1. Проверьте итоговый Excel файл")
+        print("2. Если нужно продолжить с прерванного места:")
+        print("   - Запустите парсер снова")
+        print("   - Настройте фильтры на нужной странице")
+        print("   - Программа продолжит с текущей страницы")
+        print("3. Для больших объемов данных увеличьте timeout в wait_for_page_load()")
+        print("=" * 70)
+        
+        if cache_interceptor:
+            cache_interceptor.stop()
+        
+        if lookup_index:
+            lookup_index.close()
+        
+        if parse_cache:
+            parse_cache.close()
+        
+        if sink:
+            if not jobs:
+                sink.finish_run(run_status)
+            sink.close()
+            print(f"   📄 {SQLITE_PATH} - база SQLite (запуск завершен: {run_status})")
+        
+        if driver:
+            if INTERACTIVE:
+                input("\nНажмите Enter для закрытия браузера...")
+            driver.quit()
+        
+    return run_status
@@ -0,0 +1,100 @@
+"""Параллельная загрузка деталей объектов по cosId.
+
+Вместо раскрытия каждой карточки в списке (около 3 с на карточку)
+cosId собираются со свернутого списка, а детали каждого объекта
+запрашиваются напрямую пулом потоков с куками текущей сессии браузера.
+Результаты соединяются с карточками списка по cosId.
+"""
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .capture import iter_objects, object_to_record
+from .http_cache import CacheMiss
+from .log import log
+from .metrics import metrics as default_metrics
+
+
+def _has_fields(record):
+    """В записи есть хоть одно поле, кроме cosId."""
+    return any(value is not None for key, value in record.items() if key != 'cosId')
+
+
+class DetailFetcher:
+    """Пул потоков, загружающий JSON деталей объекта по шаблону адреса."""
+
+    def __init__(self, driver, url_template, workers=6, timeout=20, retries=2, cache=None, metrics=None):
+        self.driver = driver
+        self.cache = cache
+        self.url_template = url_template
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self.metrics = metrics or default_metrics
+        self.headers = {}
+
+    def refresh_session(self):
+        """Берет куки и User-Agent из браузера, чтобы запросы шли в той же сессии."""
+        cookies = '; '.join(f"{c['name']}={c['value']}" for c in self.driver.get_cookies())
+        self.headers = {
+            'Cookie': cookies,
+            'User-Agent': self.driver.execute_script("return navigator.userAgent;"),
+            'Accept': 'application/json',
+            'Referer': self.driver.current_url,
+        }
+
+    def fetch(self, cos_id):
+        """Запись с деталями объекта или None, если загрузить не удалось."""
+        url = self.url_template.format(cos_id=cos_id)
+        for attempt in range(self.retries + 1):
+            try:
+                if self.cache:
+                    body = self.cache.fetch(url, headers=self.headers, timeout=self.timeout)
+                else:
+                    request = urllib.request.Request(url, headers=self.headers)
+                    with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                        body = response.read()
+                payload = json.loads(body.decode('utf-8'))
+                break
+            except CacheMiss as e:
+                log.warning("      Нет в кэше деталей №%s: %s", cos_id, e)
+                return None
+            except Exception as e:
+                if attempt == self.retries:
+                    log.warning("      Не удалось загрузить детали №%s: %s", cos_id, e)
+                    self.metrics.incr('details.errors')
+                    return None
+                time.sleep(0.5 * (attempt + 1))
+
+        # Объект с тем же cosId, иначе первый объект в ответе; запись без
+        # единого поля (ошибка, пустой ответ) деталями не считается
+        record = None
+        for obj in iter_objects(payload):
+            candidate = object_to_record(obj)
+            if not _has_fields(candidate):
+                continue
+            if candidate['cosId'] == str(cos_id):
+                record = candidate
+                break
+            if record is None:
+                record = candidate
+        if record is None and isinstance(payload, dict):
+            candidate = object_to_record(payload)
+            if _has_fields(candidate):
+                record = candidate
+        if record is None:
+            log.warning("      В ответе нет деталей №%s", cos_id)
+            self.metrics.incr('details.empty')
+            return None
+        record['cosId'] = str(cos_id)
+        self.metrics.incr('details.fetched')
+        return record
+
+    def fetch_all(self, cos_ids):
+        """Загружает детали всех cosId параллельно; возвращает {cosId: запись или None}."""
+        self.refresh_session()
+        with self.metrics.timer('details.fetch'):
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = pool.map(self.fetch, cos_ids)
+                return dict(zip(cos_ids, results))
@@ -0,0 +1,183 @@
+"""Учет команд WebDriver по типам, фазам и страницам.
+
+Почти все время парсера уходит на HTTP запросы к chromedriver: каждый
+find_elements, execute_script, .text или click - отдельный запрос.
+CommandStats подменяет driver.execute (через него идут и команды
+WebElement) и считает число и время команд по каждой странице и фазе.
+assert_budget позволяет бенчмарку проверить бюджет вида "не больше
+10 команд на страницу", чтобы лишние запросы в find_cards или
+parse_card_data ловились сразу.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from .metrics import metrics as default_metrics
+from .trace import tracer
+
+# Короткие имена для частых команд (W3C имена Selenium 4)
+COMMAND_NAMES = {
+    'findElement': 'find_element',
+    'findElements': 'find_elements',
+    'findChildElement': 'find_element',
+    'findChildElements': 'find_elements',
+    'w3cExecuteScript': 'execute_script',
+    'w3cExecuteScriptAsync': 'execute_script',
+    'executeScript': 'execute_script',
+    'getElementText': 'get_text',
+    'isElementDisplayed': 'is_displayed',
+    'clickElement': 'click',
+    'getElementAttribute': 'get_attribute',
+    'getElementProperty': 'get_attribute',
+    'get': 'get',
+    'getCurrentUrl': 'current_url',
+}
+
+
+class BudgetExceeded(AssertionError):
+    """Страница или фаза превысила бюджет команд WebDriver."""
+
+
+class CommandStats:
+    """Счетчики и время команд WebDriver по (страница, фаза, команда)."""
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics or default_metrics
+        self.lock = threading.Lock()
+        self.counts = defaultdict(int)
+        self.times = defaultdict(float)
+        self.current_page = None
+        self.current_phase = 'other'
+        self.driver = None
+
+    def instrument(self, driver):
+        """Подменяет driver.execute; повторный вызов для того же драйвера ничего не делает."""
+        if getattr(driver, '_ervk_stats', None) is self:
+            return driver
+        original = driver.execute
+
+        def execute(driver_command, params=None):
+            started = time.perf_counter()
+            try:
+                return original(driver_command, params)
+            finally:
+                seconds = time.perf_counter() - started
+                self.record(driver_command, seconds)
+                tracer.complete(COMMAND_NAMES.get(driver_command, driver_command), started, seconds, 'webdriver')
+
+        driver.execute = execute
+        driver._ervk_stats = self
+        self.driver = driver
+        return driver
+
+    def record(self, driver_command, seconds):
+        command = COMMAND_NAMES.get(driver_command, driver_command)
+        key = (self.current_page, self.current_phase, command)
+        with self.lock:
+            self.counts[key] += 1
+            self.times[key] += seconds
+        self.metrics.incr(f'webdriver.{command}')
+        self.metrics.add_time(f'webdriver.{command}', seconds)
+
+    def begin_page(self, page_num):
+        """Дальнейшие команды относятся к странице page_num."""
+        self.current_page = page_num
+        self.current_phase = 'other'
+        tracer.begin_page(page_num)
+
+    def set_phase(self, name):
+        self.current_phase = name
+        tracer.set_phase(name)
+
+    @contextmanager
+    def phase(self, name):
+        """Команды внутри блока относятся к фазе name."""
+        previous = self.current_phase
+        self.set_phase(name)
+        try:
+            yield
+        finally:
+            self.set_phase(previous)
+
+    def _select(self, page=None, phase=None, command=None):
+        with self.lock:
+            items = list(self.counts.items())
+            times = dict(self.times)
+        for key, count in items:
+            key_page, key_phase, key_command = key
+            if page is not None and key_page != page:
+                continue
+            if phase is not None and key_phase != phase:
+                continue
+            if command is not None and key_command != command:
+                continue
+            yield key, count, times[key]
+
+    def page_summary(self, page):
+        """Число и время команд страницы в целом, по фазам и по типам команд."""
+        summary = {'commands': 0, 'seconds': 0.0, 'by_phase': defaultdict(int), 'by_command': defaultdict(int)}
+        for (_, phase, command), count, seconds in self._select(page=page):
+            summary['commands'] += count
+            summary['seconds'] += seconds
+            summary['by_phase'][phase] += count
+            summary['by_command'][command] += count
+        summary['by_phase'] = dict(summary['by_phase'])
+        summary['by_command'] = dict(summary['by_command'])
+        return summary
+
+    def pages(self):
+        with self.lock:
+            return sorted({page for page, _, _ in self.counts if page is not None})
+
+    def print_page_summary(self, page, emit=print):
+        summary = self.page_summary(page)
+        phases = ', '.join(f"{name} {count}" for name, count in sorted(summary['by_phase'].items()))
+        commands = ', '.join(f"{name} {count}" for name, count in
+                             sorted(summary['by_command'].items(), key=lambda item: -item[1])[:6])
+        emit(f"   🔌 Команд WebDriver: {summary['commands']} за {summary['seconds']:.2f} с ({phases})")
+        if commands:
+            emit(f"      По типам: {commands}")
+
+    def print_report(self, top=10):
+        """Страницы с наибольшим числом команд."""
+        pages = [(page, self.page_summary(page)) for page in self.pages()]
+        if not pages:
+            return
+        total = sum(summary['commands'] for _, summary in pages)
+        print(f"   Команд WebDriver на страницу в среднем: {total / len(pages):.1f}")
+        for page, summary in sorted(pages, key=lambda item: -item[1]['commands'])[:top]:
+            print(f"   Страница {page}: {summary['commands']} команд, {summary['seconds']:.2f} с")
+
+    def check_budget(self, page, max_commands=None, max_seconds=None, phase=None, command=None):
+        """Список нарушений бюджета для страницы (пустой, если бюджет соблюден)."""
+        count = 0
+        seconds = 0.0
+        for _, key_count, key_seconds in self._select(page=page, phase=phase, command=command):
+            count += key_count
+            seconds += key_seconds
+        scope = f"страница {page}" + (f", фаза {phase}" if phase else '') + (f", {command}" if command else '')
+        problems = []
+        if max_commands is not None and count > max_commands:
+            problems.append(f"{scope}: {count} команд > {max_commands}")
+        if max_seconds is not None and seconds > max_seconds:
+            problems.append(f"{scope}: {seconds:.2f} с > {max_seconds}")
+        return problems
+
+    def assert_budget(self, page=None, max_commands=None, max_seconds=None, phase=None, command=None):
+        """Бросает BudgetExceeded, если страница (по умолчанию каждая) вышла за бюджет."""
+        pages = [page] if page is not None else self.pages()
+        problems = []
+        for page_num in pages:
+            problems.extend(self.check_budget(page_num, max_commands, max_seconds, phase, command))
+        if problems:
+            raise BudgetExceeded('; '.join(problems))
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+            self.times.clear()
+
+
+# Общий экземпляр на процесс
+command_stats = CommandStats()
@@ -0,0 +1,188 @@
+"""Сохранение страниц в Excel и объединение временных файлов в итоговый.
+
+Браузер здесь не нужен: модуль используют и обход (crawl), и команды
+merge/export, которые запускаются без Selenium.
+"""
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import PatternFill, Font, Alignment
+from openpyxl.utils import get_column_letter
+
+from .export import EXCEL_MAX_ROWS, export_sharded
+from .log import log
+from .schema import (COLUMN_NAMES, COLUMN_WIDTHS, IDENTIFIER_COLUMNS, STATUS_COLORS, STATUS_COLUMN, output_columns,
+                     to_row)
+from .validate import validate_frame, validity_counts
+
+# Идентификаторы читаем строками, иначе ИНН/ОГРН станут float
+IDENTIFIER_DTYPES = {column: str for column in IDENTIFIER_COLUMNS}
+
+
+def save_to_excel(data_list, filename):
+    """Сохраняет данные в Excel файл с правильной структурой.
+
+    data_list - записи CardRecord/словари или уже готовый DataFrame.
+    """
+    try:
+        if isinstance(data_list, pd.DataFrame):
+            df = data_list
+            # Добавляем недостающие колонки
+            for col in COLUMN_NAMES:
+                if col not in df.columns:
+                    df[col] = None
+
+            # Упорядочиваем колонки (флаги проверки - после колонок схемы)
+            df = df[output_columns(df.columns)]
+        else:
+            # Строки сразу в порядке схемы, без промежуточных словарей
+            df = pd.DataFrame.from_records([to_row(record) for record in data_list], columns=COLUMN_NAMES)
+
+        # Сохраняем в Excel
+        df.to_excel(filename, index=False)
+
+        # Форматируем файл
+        try:
+            wb = load_workbook(filename)
+            ws = wb.active
+
+            # Ширина столбцов
+            for index, width in enumerate(COLUMN_WIDTHS, 1):
+                ws.column_dimensions[get_column_letter(index)].width = width
+
+            # Заголовки жирным и цветом
+            fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            font = Font(color="FFFFFF", bold=True)
+
+            for cell in ws[1]:
+                cell.fill = fill
+                cell.font = font
+                cell.alignment = Alignment(horizontal='center', wrap_text=True)
+
+            # Автоперенос текста для всех ячеек
+            for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+                for cell in row:
+                    cell.alignment = Alignment(wrap_text=True, vertical='top')
+
+            # Цвет строк по статусу
+            for row in range(2, ws.max_row + 1):
+                status = ws.cell(row=row, column=STATUS_COLUMN).value
+                if status in STATUS_COLORS:
+                    fill = PatternFill(start_color=STATUS_COLORS[status], end_color=STATUS_COLORS[status], fill_type="solid")
+                    for col in range(1, len(COLUMN_NAMES) + 1):
+                        ws.cell(row=row, column=col).fill = fill
+
+            # Сохраняем форматирование
+            wb.save(filename)
+            wb.close()
+
+        except Exception as e:
+            log.warning("    Ошибка форматирования %s: %s", filename, e, extra={'event': 'excel_error'})
+
+        # Вызывается на каждую страницу: строка видна только в подробном режиме
+        log.debug("   💾 Сохранено %d записей в %s", len(data_list), filename,
+                  extra={'event': 'excel_save', 'records': len(data_list)})
+        return True
+
+    except Exception as e:
+        log.warning("    Ошибка сохранения в Excel %s: %s", filename, e, extra={'event': 'excel_error'})
+        return False
+
+
+def save_merged(combined_df, output_filename, rows_per_part=None, split_by=None, shard_mode='files', parallel=True):
+    """Итоговый Excel: одна книга или части, если строк слишком много."""
+    too_big = len(combined_df) > EXCEL_MAX_ROWS - 1
+    if not (too_big or rows_per_part or split_by):
+        return save_to_excel(combined_df, output_filename)
+
+    try:
+        parts = export_sharded(combined_df, output_filename,
+                               rows_per_part=rows_per_part or EXCEL_MAX_ROWS - 1,
+                               split_by=split_by, mode=shard_mode, parallel=parallel)
+        print(f"   💾 Сохранено {len(combined_df)} записей в {len(parts)} частях, оглавление: {output_filename}")
+        for part in parts:
+            print(f"      {part['file']} / {part['sheet']}: {part['rows']} строк")
+        return True
+    except Exception as e:
+        log.warning("    Ошибка сохранения частей Excel: %s", e, extra={'event': 'excel_error'})
+        return False
+
+
+def read_pages(temp_files):
+    """Читает временные файлы страниц в один DataFrame (None, если читать нечего)."""
+    all_data = []
+
+    for temp_file in temp_files:
+        try:
+            df = pd.read_excel(temp_file, dtype=IDENTIFIER_DTYPES)
+            all_data.append(df)
+            log.debug("   Загружено %d записей из %s", len(df), temp_file,
+                      extra={'event': 'excel_read', 'records': len(df)})
+        except Exception as e:
+            log.warning("   Ошибка загрузки %s: %s", temp_file, e, extra={'event': 'excel_error'})
+
+    if not all_data:
+        return None
+    return pd.concat(all_data, ignore_index=True)
+
+
+def print_summary(combined_df):
+    """Статистика итоговой таблицы - операциями над колонками, без цикла по строкам."""
+    total_pages = combined_df['Номер страницы'].nunique()
+    success_count = int(combined_df['Статус'].eq('✓ Успешно').sum())
+
+    print("📈 Статистика:")
+    print(f"   Всего страниц: {total_pages}")
+    print(f"   Всего записей: {len(combined_df)}")
+    print(f"   Успешно собрано: {success_count} ({success_count/len(combined_df)*100:.1f}%)")
+    print(f"   С ФИО: {combined_df['ФИО'].notna().sum()}")
+    print(f"   С ИНН: {combined_df['ИНН'].notna().sum()}")
+    print(f"   Повторов cosId: {int(combined_df['cosId'].duplicated().sum())}")
+    counts = validity_counts(combined_df)
+    if counts:
+        print("   Проверка полей (верно / ошибка / пусто):")
+        for flag, (valid, invalid, empty) in counts.items():
+            print(f"      {flag}: {valid} / {invalid} / {empty}")
+
+
+def merge_all_pages(output_filename, temp_files, parquet_dir=None, run_id=None, **shard_options):
+    """Объединяет все временные файлы в один итоговый.
+
+    parquet_dir - дополнительно дописать записи в набор Parquet.
+    shard_options - rows_per_part, split_by, shard_mode, parallel для save_merged.
+    """
+    combined_df = read_pages(temp_files)
+    if combined_df is None:
+        return False
+    # Нормализация наименований и проверка ИНН/ОГРН/ОГРНИП по всей таблице
+    combined_df = validate_frame(combined_df)
+
+    # Сохраняем итоговый файл
+    if not save_merged(combined_df, output_filename, **shard_options):
+        return False
+
+    print(f"\n✅ Итоговый файл создан: {output_filename}")
+    print(f"📊 Всего записей: {len(combined_df)}")
+    print_summary(combined_df)
+
+    if parquet_dir:
+        try:
+            # pyarrow нужен только для этого вывода
+            from .parquet import write_dataset as write_parquet_dataset
+            rows = write_parquet_dataset(combined_df, parquet_dir, run_id=run_id)
+            print(f"   📦 Parquet: {rows} записей в {parquet_dir}/")
+        except Exception as e:
+            print(f"   ⚠ Ошибка записи Parquet: {e}")
+
+    return True
+
+
+def cleanup_temp_files(temp_files):
+    """Удаляет временные файлы."""
+    for temp_file in temp_files:
+        try:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        except:
+            pass
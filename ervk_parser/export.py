@@ -0,0 +1,159 @@
+"""Выгрузка больших результатов в несколько листов или файлов Excel.
+
+Лист Excel вмещает 1 048 576 строк, а огромная книга с оформлением
+долго пишется и открывается. Здесь результат делится по бюджету строк
+и/или по значению колонки (регион, 'Вид контроля'), каждая часть пишется
+своим потоковым writer'ом openpyxl (write_only), части-файлы - параллельно
+в отдельных процессах. Небольшой лист-оглавление перечисляет все части.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from .schema import COLUMN_NAMES, COLUMN_WIDTHS, STATUS_COLORS, STATUS_COLUMN, output_columns
+
+EXCEL_MAX_ROWS = 1048576
+DEFAULT_ROWS_PER_PART = 500000
+INDEX_SHEET = 'Оглавление'
+
+
+def sheet_title(text, used=()):
+    """Допустимое и уникальное имя листа (до 31 символа, без []:*?/\\)."""
+    title = re.sub(r'[\[\]:*?/\\]', '_', str(text)).strip() or 'Лист'
+    title = title[:31]
+    base, number = title, 2
+    while title in used:
+        suffix = f"_{number}"
+        title = base[:31 - len(suffix)] + suffix
+        number += 1
+    return title
+
+
+def plan_parts(df, rows_per_part=DEFAULT_ROWS_PER_PART, split_by=None):
+    """Делит DataFrame на части: [(ключ, номер части, DataFrame)]."""
+    rows_per_part = min(rows_per_part or DEFAULT_ROWS_PER_PART, EXCEL_MAX_ROWS - 1)
+    if split_by:
+        groups = [(key, group) for key, group in df.groupby(df[split_by].fillna('не указано'), sort=True)]
+    else:
+        groups = [(None, df)]
+
+    parts = []
+    for key, group in groups:
+        for number, start in enumerate(range(0, max(len(group), 1), rows_per_part), 1):
+            parts.append((key, number, group.iloc[start:start + rows_per_part]))
+    return parts
+
+
+def _rows(df, columns=COLUMN_NAMES):
+    """Строки для записи: NaN -> None, порядок колонок по схеме."""
+    df = df.reindex(columns=columns)
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def _write_sheet(wb, title, rows, columns=COLUMN_NAMES):
+    ws = wb.create_sheet(title)
+    for index, width in enumerate(COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+    ws.freeze_panes = 'A2'
+
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(color="FFFFFF", bold=True)
+    header = []
+    for name in columns:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', wrap_text=True)
+        header.append(cell)
+    ws.append(header)
+
+    # Цветом помечаем только ячейку статуса - так запись остается потоковой
+    fills = {status: PatternFill(start_color=color, end_color=color, fill_type="solid")
+             for status, color in STATUS_COLORS.items()}
+    status_index = STATUS_COLUMN - 1
+    for row in rows:
+        row = list(row)
+        fill = fills.get(row[status_index])
+        if fill is not None:
+            cell = WriteOnlyCell(ws, value=row[status_index])
+            cell.fill = fill
+            row[status_index] = cell
+        ws.append(row)
+
+
+def write_part_file(filename, title, rows, columns=COLUMN_NAMES):
+    """Пишет одну часть отдельной книгой (запускается и в дочернем процессе)."""
+    wb = Workbook(write_only=True)
+    _write_sheet(wb, title, rows, columns)
+    wb.save(filename)
+    return filename
+
+
+def _write_index(wb, entries):
+    ws = wb.create_sheet(INDEX_SHEET, 0)
+    ws.append(['Часть', 'Файл', 'Лист', 'Ключ', 'Строк', 'Первый cosId', 'Последний cosId'])
+    for entry in entries:
+        ws.append([entry['part'], entry['file'], entry['sheet'], entry['key'],
+                   entry['rows'], entry['first'], entry['last']])
+
+
+def _entry(part, filename, sheet, key, rows):
+    cos_index = COLUMN_NAMES.index('cosId')
+    return {
+        'part': part,
+        'file': os.path.basename(filename),
+        'sheet': sheet,
+        'key': key,
+        'rows': len(rows),
+        'first': rows[0][cos_index] if rows else None,
+        'last': rows[-1][cos_index] if rows else None,
+    }
+
+
+def export_sharded(df, output_filename, rows_per_part=DEFAULT_ROWS_PER_PART, split_by=None,
+                   mode='files', parallel=True, workers=None):
+    """Выгружает df частями; возвращает список описаний частей.
+
+    mode='files'  - каждая часть в своей книге рядом с output_filename
+                    (<имя>_partNNN.xlsx), output_filename - книга-оглавление;
+    mode='sheets' - одна книга output_filename, часть на лист + оглавление.
+    parallel - писать книги-части в отдельных процессах (только 'files').
+    """
+    parts = plan_parts(df, rows_per_part, split_by)
+    # Флаги проверки полей (validate_frame) пишутся после колонок схемы
+    columns = output_columns(df.columns)
+    base, ext = os.path.splitext(output_filename)
+    used_titles = {INDEX_SHEET}
+    jobs = []
+    for index, (key, number, part_df) in enumerate(parts, 1):
+        title = sheet_title(f"{key}_{number}" if key is not None else f"Часть {index}", used_titles)
+        used_titles.add(title)
+        filename = output_filename if mode == 'sheets' else f"{base}_part{index:03d}{ext or '.xlsx'}"
+        jobs.append((index, filename, title, key, _rows(part_df, columns)))
+
+    entries = [_entry(index, filename, title, key, rows) for index, filename, title, key, rows in jobs]
+
+    if mode == 'sheets':
+        wb = Workbook(write_only=True)
+        _write_index(wb, entries)
+        for _, _, title, _, rows in jobs:
+            _write_sheet(wb, title, rows, columns)
+        wb.save(output_filename)
+        return entries
+
+    if parallel and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(write_part_file, *zip(*[(f, t, r, columns) for _, f, t, _, r in jobs])))
+    else:
+        for _, filename, title, _, rows in jobs:
+            write_part_file(filename, title, rows, columns)
+
+    index_wb = Workbook(write_only=True)
+    _write_index(index_wb, entries)
+    index_wb.save(output_filename)
+    return entries
@@ -0,0 +1,283 @@
+"""Дисковый кэш HTTP ответов для воспроизводимых обходов и отладки.
+
+Каждый ответ хранится отдельным файлом в формате записи HAR
+(request/response/content), весь кэш можно выгрузить одним .har файлом.
+Кэш стоит и за браузером (перехват CDP Fetch), и за прямыми запросами
+(DetailFetcher).
+
+Режимы:
+    'record'  - всегда идем в сеть и перезаписываем ответы;
+    'replay'  - только кэш, без сети; промах - ошибка (полностью офлайн);
+    'refresh' - кэш, если запись моложе max_age, иначе сеть и запись.
+
+Размер ограничен max_bytes: при превышении удаляются давно не
+использованные записи (LRU по времени изменения файла).
+"""
+import base64
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.request
+
+from .log import log
+from .metrics import metrics as default_metrics
+
+MODES = ('record', 'replay', 'refresh')
+# Fetch.getResponseBody отдает уже распакованное тело: заголовки сжатия и
+# длины от исходного ответа к нему не подходят и при подмене ответа ломают
+# разбор в браузере
+DECODED_BODY_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class CacheMiss(Exception):
+    """Ответа нет в кэше, а режим 'replay' запрещает идти в сеть."""
+
+
+class ResponseCache:
+    """Хранилище записей HAR на диске с LRU вытеснением по размеру."""
+
+    def __init__(self, directory, mode='record', max_age=None, max_bytes=500 * 1024 * 1024, metrics=None):
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим кэша: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.metrics = metrics or default_metrics
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path in self._files())
+
+    def _files(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.json')]
+
+    @staticmethod
+    def key(method, url, body=None):
+        digest = hashlib.sha1(f"{method.upper()} {url}".encode('utf-8'))
+        if body:
+            digest.update(body if isinstance(body, bytes) else body.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def lookup(self, method, url, body=None):
+        """Запись HAR из кэша с учетом режима или None."""
+        if self.mode == 'record':
+            return None
+        path = self._path(self.key(method, url, body))
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.metrics.incr('http_cache.miss')
+            if self.mode == 'replay':
+                raise CacheMiss(f"{method} {url}")
+            return None
+        if self.mode == 'refresh' and self.max_age is not None:
+            if time.time() - entry['_stored'] > self.max_age:
+                self.metrics.incr('http_cache.expired')
+                return None
+        # Отмечаем использование для LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.metrics.incr('http_cache.hit')
+        return entry
+
+    def store(self, method, url, status, headers, body, mime_type='', request_body=None):
+        """Сохраняет ответ; body - bytes или str."""
+        if isinstance(body, str):
+            content = {'size': len(body), 'mimeType': mime_type, 'text': body}
+        else:
+            try:
+                content = {'size': len(body), 'mimeType': mime_type, 'text': body.decode('utf-8')}
+            except UnicodeDecodeError:
+                content = {'size': len(body), 'mimeType': mime_type,
+                           'text': base64.b64encode(body).decode('ascii'), 'encoding': 'base64'}
+        request = {'method': method.upper(), 'url': url, 'headers': []}
+        if request_body:
+            request['postData'] = {'text': request_body if isinstance(request_body, str) else request_body.decode('utf-8', 'replace')}
+        entry = {
+            'startedDateTime': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'request': request,
+            'response': {
+                'status': status,
+                'headers': [{'name': name, 'value': value} for name, value in headers],
+                'content': content,
+            },
+            '_stored': time.time(),
+        }
+        data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        path = self._path(self.key(method, url, request_body))
+        with self.lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.total_bytes += len(data) - old_size
+            self.metrics.incr('http_cache.stored')
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Удаляет самые давно использованные записи, пока не влезем в лимит."""
+        files = sorted(self._files(), key=os.path.getmtime)
+        target = self.max_bytes * 0.9
+        for path in files:
+            if self.total_bytes <= target:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            self.total_bytes -= size
+            self.metrics.incr('http_cache.evicted')
+
+    @staticmethod
+    def body(entry):
+        """Тело ответа из записи HAR в bytes."""
+        content = entry['response']['content']
+        if content.get('encoding') == 'base64':
+            return base64.b64decode(content['text'])
+        return content.get('text', '').encode('utf-8')
+
+    def fetch(self, url, headers=None, timeout=20, method='GET', data=None):
+        """HTTP запрос через кэш; возвращает тело ответа в bytes."""
+        entry = self.lookup(method, url, data)
+        if entry is not None:
+            return self.body(entry)
+        request = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            self.store(method, url, response.status, list(response.headers.items()), body,
+                       response.headers.get('Content-Type', ''), data)
+        return body
+
+    def export_har(self, filename):
+        """Выгружает весь кэш одним HAR архивом (открывается в DevTools)."""
+        entries = []
+        for path in sorted(self._files(), key=os.path.getmtime):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            entry.pop('_stored', None)
+            entries.append(entry)
+        har = {'log': {'version': '1.2', 'creator': {'name': 'ervk_parser', 'version': '1'}, 'entries': entries}}
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(har, f, ensure_ascii=False)
+        return len(entries)
+
+
+class BrowserCacheInterceptor:
+    """Ставит кэш перед браузером через CDP Fetch.
+
+    Запросы перехватываются на стадии запроса (ответ из кэша через
+    Fetch.fulfillRequest) и на стадии ответа (запись в кэш). Обработка
+    событий идет в отдельном потоке через bidi_connection Selenium (trio);
+    start() ждет, пока Fetch.enable подтвержден, иначе первые запросы
+    страницы прошли бы мимо кэша.
+    """
+
+    def __init__(self, driver, cache, url_patterns=('*',)):
+        self.driver = driver
+        self.cache = cache
+        self.url_patterns = url_patterns
+        self.thread = None
+        self.token = None
+        self.cancel_scope = None
+        self.ready = threading.Event()
+        self.enabled = False
+
+    def start(self, timeout=15):
+        """Запускает поток перехвата; True, если перехват включился за timeout секунд."""
+        self.ready.clear()
+        self.thread = threading.Thread(target=self._run, name='ervk-cache-intercept', daemon=True)
+        self.thread.start()
+        if not self.ready.wait(timeout):
+            log.warning("   ⚠ Перехват запросов для кэша не включился за %s с", timeout,
+                        extra={'event': 'cache_intercept'})
+        return self.enabled
+
+    def stop(self):
+        if self.token is not None and self.cancel_scope is not None:
+            import trio
+            try:
+                trio.from_thread.run_sync(self.cancel_scope.cancel, trio_token=self.token)
+            except Exception:
+                pass
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def _run(self):
+        import trio
+        try:
+            trio.run(self._intercept)
+        except Exception as e:
+            log.warning("   ⚠ Перехват запросов для кэша остановлен: %s", e, extra={'event': 'cache_intercept'})
+        finally:
+            self.enabled = False
+            self.ready.set()
+
+    async def _intercept(self):
+        import trio
+        self.token = trio.lowlevel.current_trio_token()
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            fetch = devtools.fetch
+            patterns = []
+            for pattern in self.url_patterns:
+                patterns.append(fetch.RequestPattern(url_pattern=pattern, request_stage=fetch.RequestStage.REQUEST))
+                if self.cache.mode != 'replay':
+                    patterns.append(fetch.RequestPattern(url_pattern=pattern, request_stage=fetch.RequestStage.RESPONSE))
+            await session.execute(fetch.enable(patterns=patterns))
+            self.enabled = True
+            self.ready.set()
+            with trio.CancelScope() as self.cancel_scope:
+                async with trio.open_nursery() as nursery:
+                    async for event in session.listen(fetch.RequestPaused):
+                        nursery.start_soon(self._handle, session, devtools, event)
+
+    async def _handle(self, session, devtools, event):
+        fetch = devtools.fetch
+        request = event.request
+        post_data = getattr(request, 'post_data', None)
+        try:
+            if event.response_status_code is None:
+                # Стадия запроса: отдаем из кэша, если можно
+                try:
+                    entry = self.cache.lookup(request.method, request.url, post_data)
+                except CacheMiss:
+                    await session.execute(fetch.fail_request(event.request_id,
+                                                             devtools.network.ErrorReason.INTERNET_DISCONNECTED))
+                    return
+                if entry is None:
+                    await session.execute(fetch.continue_request(event.request_id))
+                    return
+                response = entry['response']
+                # Записи, сохраненные до очистки заголовков, тоже отдаем без них
+                headers = [fetch.HeaderEntry(name=h['name'], value=h['value']) for h in response['headers']
+                           if h['name'].lower() not in DECODED_BODY_HEADERS]
+                body = base64.b64encode(self.cache.body(entry)).decode('ascii')
+                await session.execute(fetch.fulfill_request(event.request_id, response['status'],
+                                                            response_headers=headers, body=body))
+            else:
+                # Стадия ответа: записываем тело в кэш и пропускаем дальше
+                try:
+                    body, is_base64 = await session.execute(fetch.get_response_body(event.request_id))
+                    raw = base64.b64decode(body) if is_base64 else body.encode('utf-8')
+                    headers = [(h.name, h.value) for h in (event.response_headers or [])
+                               if h.name.lower() not in DECODED_BODY_HEADERS]
+                    mime = next((value for name, value in headers if name.lower() == 'content-type'), '')
+                    self.cache.store(request.method, request.url, event.response_status_code, headers, raw, mime, post_data)
+                except Exception:
+                    pass
+                await session.execute(fetch.continue_request(event.request_id))
+        except Exception as e:
+            log.warning("      Ошибка перехвата %s: %s", request.url[:80], e, extra={'event': 'cache_intercept'})
@@ -0,0 +1,188 @@
+"""Поисковый индекс по собранным карточкам: ИНН, ОГРН, ОГРНИП и полнотекст.
+
+SQLite: B-tree индексы по идентификаторам и FTS5 по наименованию
+контролируемого лица и адресу объекта. Индекс общий для всех запусков:
+каждый объект хранится по cosId с номером последнего запуска, где он
+встречался, и обновляется инкрементально после каждого обхода.
+
+Примеры:
+    python -m ervk_parser.index import ЕРВК_все_страницы_20250101_120000.xlsx
+    python -m ervk_parser.index inn 7701234567
+    python -m ervk_parser.index text "ромашка москва"
+"""
+import argparse
+import sqlite3
+import sys
+import time
+
+from .schema import ATTRIBUTES, COLUMN_NAMES, IDENTIFIER_COLUMNS, to_row
+
+DEFAULT_PATH = 'ervk_index.sqlite'
+
+# Поля схемы, которые попадают в индекс; колонки индекса называются как
+# атрибуты CardRecord, cos_id - первой
+INDEXED_ATTRIBUTES = ('cos_id', 'full_name', 'fio', 'inn', 'ogrn', 'ogrnip', 'address', 'risk_category',
+                      'control_kind', 'object_kind', 'status', 'collected_at')
+# Колонка записи -> колонка индекса
+INDEXED = {COLUMN_NAMES[ATTRIBUTES.index(attr)]: attr for attr in INDEXED_ATTRIBUTES}
+_POSITIONS = [(COLUMN_NAMES.index(column), name) for column, name in INDEXED.items()]
+_NAMES = [name for _, name in _POSITIONS]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    cos_id TEXT PRIMARY KEY,
+""" + ''.join(f"    {name} TEXT,\n" for name in _NAMES[1:]) + """    first_run TEXT,
+    last_run TEXT
+);
+CREATE INDEX IF NOT EXISTS objects_inn ON objects(inn);
+CREATE INDEX IF NOT EXISTS objects_ogrn ON objects(ogrn);
+CREATE INDEX IF NOT EXISTS objects_ogrnip ON objects(ogrnip);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS objects_fts USING fts5(
+    full_name, address, content='objects', content_rowid='rowid', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS objects_ai AFTER INSERT ON objects BEGIN
+    INSERT INTO objects_fts(rowid, full_name, address) VALUES (new.rowid, new.full_name, new.address);
+END;
+CREATE TRIGGER IF NOT EXISTS objects_ad AFTER DELETE ON objects BEGIN
+    INSERT INTO objects_fts(objects_fts, rowid, full_name, address) VALUES ('delete', old.rowid, old.full_name, old.address);
+END;
+CREATE TRIGGER IF NOT EXISTS objects_au AFTER UPDATE ON objects BEGIN
+    INSERT INTO objects_fts(objects_fts, rowid, full_name, address) VALUES ('delete', old.rowid, old.full_name, old.address);
+    INSERT INTO objects_fts(rowid, full_name, address) VALUES (new.rowid, new.full_name, new.address);
+END;
+"""
+
+RESULT_COLUMNS = ('cos_id', 'full_name', 'inn', 'ogrn', 'ogrnip', 'address', 'risk_category', 'control_kind', 'last_run')
+
+
+def _value(value):
+    if value is None or value != value or value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+class LookupIndex:
+    """Python API индекса; все поиски возвращают списки словарей."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        # timeout: в базу могут писать несколько процессов-воркеров
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        updates = ', '.join(f"{name} = COALESCE(excluded.{name}, {name})" for name in _NAMES if name != 'cos_id')
+        self.upsert_sql = (
+            f"INSERT INTO objects ({', '.join(_NAMES)}, first_run, last_run) "
+            f"VALUES ({', '.join('?' * (len(_NAMES) + 2))}) "
+            f"ON CONFLICT(cos_id) DO UPDATE SET {updates}, last_run = excluded.last_run"
+        )
+
+    def update(self, records, run_id):
+        """Инкрементально добавляет/обновляет записи одного запуска."""
+        rows = []
+        for record in records:
+            row = to_row(record)
+            values = [_value(row[position]) for position, _ in _POSITIONS]
+            if values[0]:
+                rows.append(values + [run_id, run_id])
+        with self.conn:
+            self.conn.executemany(self.upsert_sql, rows)
+        return len(rows)
+
+    def import_file(self, filename, run_id=None):
+        """Загружает итоговый xlsx или набор Parquet в индекс."""
+        import pandas as pd
+        if filename.endswith('.xlsx'):
+            df = pd.read_excel(filename, dtype={column: str for column in IDENTIFIER_COLUMNS})
+        else:
+            from .parquet import read_dataset
+            df = read_dataset(filename)
+        run_id = run_id or filename
+        return self.update(df.to_dict('records'), run_id)
+
+    def _select(self, where, params, limit):
+        sql = f"SELECT {', '.join(RESULT_COLUMNS)} FROM objects WHERE {where} LIMIT ?"
+        return [dict(row) for row in self.conn.execute(sql, (*params, limit))]
+
+    def by_inn(self, inn, limit=100):
+        return self._select("inn = ?", (str(inn),), limit)
+
+    def by_ogrn(self, ogrn, limit=100):
+        """ОГРН или ОГРНИП."""
+        return self._select("ogrn = ? OR ogrnip = ?", (str(ogrn), str(ogrn)), limit)
+
+    def by_cos_id(self, cos_id):
+        return self._select("cos_id = ?", (str(cos_id),), 1)
+
+    def search(self, text, limit=50):
+        """Полнотекстовый поиск по наименованию и адресу (все слова, префиксы)."""
+        terms = [word.replace('"', '') for word in text.split() if word.strip('"')]
+        if not terms:
+            return []
+        query = ' '.join(f'"{word}"*' for word in terms)
+        sql = (
+            f"SELECT {', '.join('o.' + c for c in RESULT_COLUMNS)} FROM objects_fts f "
+            f"JOIN objects o ON o.rowid = f.rowid WHERE objects_fts MATCH ? ORDER BY rank LIMIT ?"
+        )
+        return [dict(row) for row in self.conn.execute(sql, (query, limit))]
+
+    def stats(self):
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS objects, COUNT(DISTINCT inn) AS inns, COUNT(DISTINCT last_run) AS runs FROM objects"
+        ).fetchone()
+        return dict(row)
+
+    def close(self):
+        self.conn.close()
+
+
+def _print_results(results, elapsed):
+    for row in results:
+        print(f"№{row['cos_id']} | {row['full_name'] or '-'} | ИНН {row['inn'] or '-'} | "
+              f"ОГРН {row['ogrn'] or row['ogrnip'] or '-'} | {row['address'] or '-'}")
+    print(f"Найдено: {len(results)} ({elapsed * 1000:.1f} мс)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Поиск по собранным карточкам ЕРВК")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="файл индекса")
+    commands = parser.add_subparsers(dest='command', required=True)
+    imp = commands.add_parser('import', help="добавить итоговый xlsx или набор Parquet")
+    imp.add_argument('files', nargs='+')
+    for name, help_text in (('inn', "объекты по ИНН"), ('ogrn', "объекты по ОГРН/ОГРНИП"),
+                            ('cos', "объект по cosId"), ('text', "полнотекстовый поиск по наименованию и адресу")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument('value')
+        sub.add_argument('--limit', type=int, default=50)
+    commands.add_parser('stats', help="размер индекса")
+    args = parser.parse_args(argv)
+
+    index = LookupIndex(args.db)
+    try:
+        if args.command == 'import':
+            for filename in args.files:
+                print(f"{filename}: {index.import_file(filename)} записей")
+            return 0
+        if args.command == 'stats':
+            print(index.stats())
+            return 0
+        started = time.perf_counter()
+        if args.command == 'inn':
+            results = index.by_inn(args.value, args.limit)
+        elif args.command == 'ogrn':
+            results = index.by_ogrn(args.value, args.limit)
+        elif args.command == 'cos':
+            results = index.by_cos_id(args.value)
+        else:
+            results = index.search(args.value, args.limit)
+        _print_results(results, time.perf_counter() - started)
+        return 0
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Реестр локаторов с кэшем сработавшей стратегии на время сессии.
+
+Для каждой роли (карточка, кнопка следующей страницы, активная страница,
+ФИО контролируемого лица) хранится список селекторов. Сначала пробуется
+тот, что сработал в прошлый раз, остальные - только при промахе.
+
+Счетчики: locator.<роль>.hit - сработал закэшированный, .miss - сработала
+другая стратегия, .none - не сработала ни одна.
+"""
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from .metrics import metrics as default_metrics
+
+# Стратегии по ролям в порядке первоначального перебора
+DEFAULT_STRATEGIES = {
+    # Для карточек - CSS селекторы, их перебирает FIND_CARDS_JS в браузере
+    'card': [
+        (By.CSS_SELECTOR, "div.css-s85nh6"),
+        (By.CSS_SELECTOR, "div.object-card"),
+        (By.CSS_SELECTOR, "div.MuiPaper-root"),
+    ],
+    # Стрелки "назад" и "вперед" отличаются только положением: класс
+    # previousNext у обеих, поэтому берется последняя. Сработавшая стратегия
+    # запоминается, и на второй странице шире заданный селектор попал бы
+    # в активную стрелку "назад"
+    'next_button': [
+        (By.XPATH, "//button[@aria-label='Перейти на следующую страницу']"),
+        (By.XPATH, "(//button[contains(@class, 'fp-MuiPaginationItem-previousNext')])[last()]"
+                   "[not(contains(@class, 'Mui-disabled'))]"),
+        (By.XPATH, "//button[.//*[contains(text(), '›') or contains(@data-testid, 'NavigateNextIcon')]]"),
+    ],
+    'active_page': [
+        (By.XPATH, "//button[contains(@class, 'Mui-selected') and contains(@class, 'MuiPaginationItem-page')]"),
+        (By.XPATH, "//button[contains(@class, 'Mui-selected') and contains(@class, 'fp-MuiPaginationItem-page')]"),
+    ],
+    'person_name': [
+        (By.XPATH, ".//p[contains(@class, 'css-kific6-wordBreak')]"),
+        (By.XPATH, ".//p[contains(@class, 'wordBreak')]"),
+    ],
+}
+
+
+class LocatorRegistry:
+    """Запоминает, какая стратегия сработала для каждой роли."""
+
+    def __init__(self, strategies=None, metrics=None):
+        self.strategies = {role: list(items) for role, items in (strategies or DEFAULT_STRATEGIES).items()}
+        self.metrics = metrics or default_metrics
+        self.winners = {}
+
+    def ordered(self, role):
+        """Стратегии роли: сначала закэшированный победитель."""
+        strategies = self.strategies[role]
+        winner = self.winners.get(role)
+        if winner is None:
+            return list(enumerate(strategies))
+        return [(winner, strategies[winner])] + [
+            (index, strategy) for index, strategy in enumerate(strategies) if index != winner
+        ]
+
+    def selectors(self, role):
+        """Только строки селекторов роли в порядке перебора."""
+        return [selector for _, (by, selector) in self.ordered(role)]
+
+    def record(self, role, position):
+        """Отмечает, что сработала стратегия номер position из selectors(role)."""
+        index = self.ordered(role)[position][0]
+        self._remember(role, index)
+
+    def _remember(self, role, index):
+        if self.winners.get(role) == index:
+            self.metrics.incr(f'locator.{role}.hit')
+        else:
+            self.metrics.incr(f'locator.{role}.miss')
+            self.winners[role] = index
+
+    def find(self, context, role, extract=None):
+        """Ищет первый подходящий элемент роли внутри context.
+
+        extract(element) возвращает значение или None, если элемент не
+        подходит (например, кнопка не активна). Без extract возвращается
+        сам элемент. Если ничего не подошло - None.
+
+        StaleElementReferenceException не глотается: context или элемент
+        перерисованы, и искать заново должен вызывающий.
+        """
+        for index, (by, selector) in self.ordered(role):
+            try:
+                elements = context.find_elements(by, selector)
+            except StaleElementReferenceException:
+                raise
+            except (NoSuchElementException, WebDriverException):
+                continue
+            for element in elements:
+                try:
+                    value = extract(element) if extract else element
+                except StaleElementReferenceException:
+                    raise
+                except (NoSuchElementException, WebDriverException):
+                    continue
+                if value is not None:
+                    self._remember(role, index)
+                    return value
+        self.metrics.incr(f'locator.{role}.none')
+        return None
+
+
+# Общий реестр на сессию браузера
+locators = LocatorRegistry()
@@ -0,0 +1,148 @@
+"""Журнал парсера: уровни, JSON lines и вывод в фоновом потоке.
+
+Горячие циклы crawler пишут через logger 'ervk' с отложенным
+форматированием (log.debug("... %s", x)): при выключенном уровне вызов
+стоит одной проверки isEnabledFor, а строка не собирается вовсе.
+Включенные записи уходят в очередь, форматируются и пишутся в консоль или
+файл потоком QueueListener - медленный терминал по SSH или перенаправление
+в файл не тормозят обход.
+
+Уровни консоли:
+    quiet   - одна строка прогресса на страницу и предупреждения
+    normal  - шаги обхода и статистика страниц (как раньше)
+    verbose - плюс строки по карточкам и команды WebDriver страницы
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+log = logging.getLogger('ervk')
+# Строки прогресса "страница N: записей, секунд" видны и в режиме quiet
+progress_log = logging.getLogger('ervk.progress')
+
+VERBOSITY = ('quiet', 'normal', 'verbose')
+# Поля extra, которые попадают в JSON записи
+FIELDS = ('event', 'page', 'cos_id', 'records', 'ok', 'seconds', 'phase')
+
+_queue = None
+_listener = None
+_journals = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON."""
+
+    def format(self, record):
+        data = {'ts': round(record.created, 3), 'level': record.levelname.lower(),
+                'logger': record.name, 'msg': record.getMessage().strip()}
+        for field in FIELDS:
+            if hasattr(record, field):
+                data[field] = getattr(record, field)
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Очередь внутри процесса: запись передается как есть, форматирование
+        # (getMessage, JSON) выполняет поток слушателя, а не горячий цикл
+        return record
+
+
+class _Journals(logging.Handler):
+    """Журналы заданий: файлы добавляются и снимаются без перезапуска слушателя."""
+
+    def __init__(self):
+        super().__init__()
+        self.handlers = []
+
+    def emit(self, record):
+        for handler in list(self.handlers):
+            handler.handle(record)
+
+
+def setup_logging(verbosity='normal', json_path=None):
+    """Настраивает logger 'ervk'; json_path '-' - JSON lines в консоль вместо текста."""
+    global _queue, _listener, _journals
+    stop_logging()
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(JsonFormatter() if json_path == '-' else logging.Formatter('%(message)s'))
+    handlers = [console]
+    if json_path and json_path != '-':
+        # Файл получает и отладочные записи, независимо от режима консоли
+        file_handler = logging.FileHandler(json_path, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+        console.setLevel(logging.DEBUG if verbosity == 'verbose' else logging.INFO)
+        if verbosity == 'quiet':
+            console.addFilter(lambda record: record.levelno >= logging.WARNING or record.name == progress_log.name)
+
+    if json_path and json_path != '-':
+        level = logging.DEBUG
+    else:
+        level = {'quiet': logging.WARNING, 'normal': logging.INFO, 'verbose': logging.DEBUG}[verbosity]
+    log.setLevel(level)
+    progress_log.setLevel(logging.INFO)
+
+    _queue = queue.Queue()
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+    log.addHandler(_QueueHandler(_queue))
+    log.propagate = False
+    _journals = _Journals()
+    handlers.append(_journals)
+    _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return log
+
+
+def flush_logging():
+    """Ждет, пока фоновый поток выпишет очередь (перед прямым print отчетов)."""
+    if _queue is not None and _listener is not None:
+        _queue.join()
+
+
+def add_journal(path):
+    """Отдельный JSON lines журнал, например на одно задание пакета (до remove_journal)."""
+    handler = logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(JsonFormatter())
+    if _journals is not None:
+        _journals.handlers.append(handler)
+    return handler
+
+
+def remove_journal(handler):
+    flush_logging()
+    if _journals is not None and handler in _journals.handlers:
+        _journals.handlers.remove(handler)
+    handler.close()
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        for handler in _journals.handlers:
+            handler.close()
+        _listener = None
+
+
+def is_configured():
+    return _listener is not None
+
+
+def page_progress(page, records, ok, seconds):
+    """Строка прогресса страницы (видна во всех режимах)."""
+    progress_log.info("📄 Страница %s: %d карточек, успешно %d, %.1f с", page, records, ok, seconds,
+                      extra={'event': 'page', 'page': page, 'records': records, 'ok': ok,
+                             'seconds': round(seconds, 2)})
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,44 @@
+"""Счетчики и таймеры работы парсера ЕРВК."""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class Metrics:
+    """Простые именованные счетчики и суммарное время по фазам."""
+
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self.timings = defaultdict(float)
+
+    def incr(self, name, amount=1):
+        self.counters[name] += amount
+
+    def add_time(self, name, seconds):
+        self.timings[name] += seconds
+
+    @contextmanager
+    def timer(self, name):
+        """Засекает время блока и добавляет его к таймеру name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def snapshot(self):
+        return {
+            'counters': dict(self.counters),
+            'timings': {name: round(value, 3) for name, value in self.timings.items()},
+        }
+
+    def report(self):
+        """Печатает все счетчики и таймеры."""
+        for name in sorted(self.counters):
+            print(f"   {name}: {self.counters[name]}")
+        for name in sorted(self.timings):
+            print(f"   {name}: {self.timings[name]:.2f} с")
+
+
+# Общий экземпляр на процесс
+metrics = Metrics()
@@ -0,0 +1,104 @@
+"""Вывод карточек в набор Parquet с явной схемой.
+
+Набор разбит на разделы по дате запуска и категории риска
+(run_date=.../Категория риска=.../*.parquet). Идентификаторы хранятся
+строками, поля с малым числом значений - словарными (категориальными)
+колонками. Аналитика по многим запускам читает только нужные колонки
+и разделы вместо разбора больших xlsx. Таблица собирается из DataFrame
+целыми колонками, без обхода строк в Python.
+"""
+import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .schema import COLUMN_NAMES, FIELDS, IDENTIFIER_COLUMNS, TIME_FORMAT, to_row
+from .validate import clean_identifiers
+
+RUN_DATE = 'run_date'
+RISK = 'Категория риска'
+PARTITION_COLUMNS = [RUN_DATE, RISK]
+
+_category = pa.dictionary(pa.int32(), pa.string())
+
+# Типы колонок по атрибутам CardRecord; не указанные здесь - строки.
+# Категория риска - раздел набора, ее колонка идет последней
+COLUMN_TYPES = {
+    'page': pa.int32(),
+    'control_kind': _category,
+    'object_kind': _category,
+    'collected_at': pa.timestamp('s'),
+    'status': _category,
+}
+
+SCHEMA = pa.schema(
+    [pa.field(column, COLUMN_TYPES.get(attr, pa.string())) for attr, column, _ in FIELDS if column != RISK]
+    + [pa.field('run_id', pa.string()), pa.field(RUN_DATE, pa.string()), pa.field(RISK, _category)]
+)
+
+# Значения разделов - строки из имен каталогов: словарный тип раздела
+# требует заранее известного словаря, поэтому категория риска кодируется
+# словарем уже после чтения
+PARTITIONING = ds.partitioning(
+    pa.schema([SCHEMA.field(RUN_DATE), pa.field(RISK, pa.string())]), flavor='hive'
+)
+READ_SCHEMA = SCHEMA.set(SCHEMA.get_field_index(RISK), pa.field(RISK, pa.string()))
+
+
+def _text(series):
+    """Строки без пробелов по краям; пустые - NULL."""
+    text = series.astype('string').str.strip()
+    return text.mask(text.str.len() == 0)
+
+
+def frame_to_table(df, run_date, run_id=None):
+    """Таблица Arrow со схемой SCHEMA из DataFrame с колонками записей."""
+    columns = {}
+    for field in SCHEMA:
+        name = field.name
+        if name == RUN_DATE:
+            columns[name] = pd.Series(run_date, index=df.index, dtype='string')
+        elif name == 'run_id':
+            columns[name] = pd.Series(run_id, index=df.index, dtype='string')
+        elif name not in df.columns:
+            columns[name] = pd.Series(None, index=df.index, dtype='string')
+        elif name in IDENTIFIER_COLUMNS:
+            # 7701234567.0 из Excel -> '7701234567'
+            columns[name] = _text(clean_identifiers(df[name]))
+        elif name == 'Номер страницы':
+            columns[name] = pd.to_numeric(df[name], errors='coerce').astype('Int32')
+        elif name == 'Время сбора':
+            columns[name] = pd.to_datetime(_text(df[name]).str.slice(0, 19), format=TIME_FORMAT, errors='coerce')
+        else:
+            columns[name] = _text(df[name])
+    table = pa.Table.from_pandas(pd.DataFrame(columns), schema=SCHEMA, preserve_index=False)
+    return table.replace_schema_metadata(None)
+
+
+def write_dataset(records, root, run_date=None, run_id=None):
+    """Дописывает записи запуска в набор Parquet; возвращает число строк.
+
+    records - DataFrame (итоговая таблица) или список записей/словарей.
+    """
+    run_date = run_date or datetime.date.today().isoformat()
+    run_id = run_id or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    if not isinstance(records, pd.DataFrame):
+        records = pd.DataFrame([to_row(record) for record in records], columns=COLUMN_NAMES)
+    table = frame_to_table(records, run_date, run_id)
+    ds.write_dataset(
+        table, root, format='parquet', partitioning=PARTITIONING,
+        basename_template=f"part-{run_id}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return table.num_rows
+
+
+def read_dataset(root, columns=None, filter=None):
+    """Читает набор в DataFrame; columns и filter ограничивают чтение."""
+    dataset = ds.dataset(root, format='parquet', schema=READ_SCHEMA, partitioning=PARTITIONING)
+    table = dataset.to_table(columns=columns, filter=filter)
+    if RISK in table.column_names:
+        index = table.schema.get_field_index(RISK)
+        table = table.set_column(index, SCHEMA.field(RISK), table.column(index).dictionary_encode())
+    return table.to_pandas()
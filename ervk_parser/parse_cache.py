@@ -0,0 +1,112 @@
+"""Кэш результатов парсинга карточек по хэшу их текста.
+
+При повторных обходах текст большинства карточек не меняется, и
+регулярные выражения parse_card_data можно не запускать. Ключ - хэш
+версии парсера и сырого текста карточки, поэтому смена PARSER_VERSION
+делает старые записи недействительными (они удаляются при открытии).
+Кэш хранится в SQLite между запусками и ограничен по числу записей с
+вытеснением давно не использованных (LRU). Сырой текст тоже хранится -
+по нему можно перепарсить снимок офлайн новой версией парсера.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+
+from .log import log
+from .metrics import metrics as default_metrics
+
+DEFAULT_PATH = 'ervk_parse_cache.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_cache (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    card_text TEXT NOT NULL,
+    record TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parse_cache_last_used ON parse_cache(last_used);
+"""
+
+# Эти поля зависят от конкретного обхода, а не от текста карточки
+VOLATILE_COLUMNS = ('Номер страницы', 'Время сбора')
+
+
+class ParseCache:
+    """Кэш {хэш текста карточки: разобранные поля}."""
+
+    def __init__(self, path, version, max_entries=200000, metrics=None, purge=True):
+        self.version = str(version)
+        self.max_entries = max_entries
+        self.metrics = metrics or default_metrics
+        # timeout: в базу могут писать несколько процессов-воркеров
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        removed = 0
+        # purge=False - только чтение текстов старых версий для перепарсинга
+        if purge:
+            with self.conn:
+                removed = self.conn.execute("DELETE FROM parse_cache WHERE version != ?", (self.version,)).rowcount
+        if removed:
+            log.info("   Кэш парсинга: удалено %d записей старой версии парсера", removed,
+                     extra={'event': 'parse_cache'})
+        self.pending = {}
+        self.touched = {}
+
+    def key(self, card_text):
+        return hashlib.sha1(f"{self.version}\n{card_text}".encode('utf-8')).hexdigest()
+
+    def get(self, card_text):
+        """Поля карточки (словарь по заголовкам колонок) или None."""
+        key = self.key(card_text)
+        if key in self.pending:
+            self.metrics.incr('parse_cache.hit')
+            return self.pending[key][1]
+        row = self.conn.execute("SELECT record FROM parse_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.metrics.incr('parse_cache.miss')
+            return None
+        self.touched[key] = time.time()
+        self.metrics.incr('parse_cache.hit')
+        return json.loads(row[0])
+
+    def put(self, card_text, record):
+        """Запоминает результат парсинга; на диск попадает при flush()."""
+        fields = {column: value for column, value in record.to_dict().items() if column not in VOLATILE_COLUMNS}
+        self.pending[self.key(card_text)] = (card_text, fields)
+
+    def flush(self):
+        """Одна транзакция на страницу: новые записи, отметки LRU, вытеснение."""
+        now = time.time()
+        with self.conn:
+            if self.pending:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO parse_cache (key, version, card_text, record, last_used) VALUES (?, ?, ?, ?, ?)",
+                    [(key, self.version, text, json.dumps(fields, ensure_ascii=False), now)
+                     for key, (text, fields) in self.pending.items()],
+                )
+            if self.touched:
+                self.conn.executemany("UPDATE parse_cache SET last_used = ? WHERE key = ?",
+                                      [(used, key) for key, used in self.touched.items()])
+            count = self.conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+            if count > self.max_entries:
+                # Вытесняем с запасом 10%, чтобы не чистить на каждой странице
+                excess = count - int(self.max_entries * 0.9)
+                self.conn.execute(
+                    "DELETE FROM parse_cache WHERE key IN "
+                    "(SELECT key FROM parse_cache ORDER BY last_used LIMIT ?)", (excess,)
+                )
+                self.metrics.incr('parse_cache.evicted', excess)
+        self.pending.clear()
+        self.touched.clear()
+
+    def iter_texts(self):
+        """Все сохраненные тексты карточек - для офлайн перепарсинга."""
+        for (card_text,) in self.conn.execute("SELECT card_text FROM parse_cache"):
+            yield card_text
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,165 @@
+"""Разбор текста карточки объекта ЕРВК в запись CardRecord.
+
+Модуль не зависит от браузера: parse_card_data в crawler.py получает
+текст раскрытой карточки и ФИО из DOM, а перепарсинг (cli reparse)
+разбирает сохраненные в кэше тексты офлайн.
+"""
+import re
+
+from .schema import CardRecord, timestamp
+
+# Версия правил разбора карточки: увеличить при любом изменении
+# parse_card_text, иначе кэш парсинга вернет результаты старых правил
+PARSER_VERSION = 2
+
+RISK_CATEGORIES = ('значительный', 'низкий', 'средний', 'высокий')
+
+# Веса контрольных цифр ИНН (10 цифр; 12 цифр - две контрольные)
+INN10_WEIGHTS = (2, 4, 10, 3, 5, 9, 4, 6, 8)
+INN11_WEIGHTS = (7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+INN12_WEIGHTS = (3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+
+
+def _control_digit(digits, weights):
+    return sum(digit * weight for digit, weight in zip(digits, weights)) % 11 % 10
+
+
+def inn_is_valid(text):
+    """ИНН из 10 или 12 цифр с верными контрольными цифрами."""
+    if not text or not re.fullmatch(r'[0-9]{10}|[0-9]{12}', text):
+        return False
+    digits = [int(char) for char in text]
+    if len(digits) == 10:
+        return _control_digit(digits, INN10_WEIGHTS) == digits[9]
+    return (_control_digit(digits, INN11_WEIGHTS) == digits[10] and
+            _control_digit(digits, INN12_WEIGHTS) == digits[11])
+
+
+def ogrn_is_valid(text):
+    """ОГРН (13 цифр, остаток от деления на 11) или ОГРНИП (15 цифр, на 13)."""
+    if not text or not re.fullmatch(r'[0-9]{13}|[0-9]{15}', text):
+        return False
+    if len(text) == 13:
+        return int(text[:12]) % 11 % 10 == int(text[12])
+    return int(text[:14]) % 13 % 10 == int(text[14])
+
+
+def new_card_data(cos_id=None, collected_at=None):
+    """Пустая запись карточки со всеми колонками."""
+    return CardRecord(cos_id=cos_id, collected_at=collected_at or timestamp())
+
+
+def set_card_status(data):
+    """Статус сбора по наличию ФИО и ИНН."""
+    if data.fio and data.inn:
+        data.status = '✓ Успешно'
+    elif data.fio:
+        data.status = '⚠ Только ФИО'
+    elif data.inn:
+        data.status = '⚠ Только ИНН'
+    else:
+        data.status = '✗ Данных нет'
+
+
+def card_data_from_xhr(cos_id, xhr_record, collected_at=None):
+    """Запись карточки из перехваченного JSON ответа."""
+    data = new_card_data(cos_id, collected_at)
+    data.update(xhr_record)
+    set_card_status(data)
+    data.intern_categories()
+    return data
+
+
+def parse_card_text(card_text, data, person_name=None):
+    """Заполняет data полями из текста раскрытой карточки.
+
+    person_name - ФИО/наименование, найденное в DOM карточки; если его нет,
+    ФИО ищется по строкам текста.
+    """
+    # 1. Извлекаем номер карточки (cosId)
+    match = re.search(r'№\s*(\d+)', card_text)
+    if match:
+        data.cos_id = match.group(1)
+
+    # 2. Категория риска
+    lower = card_text.lower()
+    for risk in RISK_CATEGORIES:
+        if f'{risk} риск' in lower:
+            data.risk_category = risk
+            break
+
+    # 3. Тип объекта (из заголовка)
+    title_match = re.search(r'№\s*\d+\s*(.+?)(?:\s*версия\s*\d+)?$', card_text, re.MULTILINE)
+    if title_match:
+        data.object_type = title_match.group(1).strip()
+
+    # 4. ВИД КОНТРОЛЯ - используем регулярные выражения
+    control_match = re.search(r'Вид контроля:\s*(.+)', card_text)
+    if control_match:
+        data.control_kind = control_match.group(1).strip()
+
+    # 5. ВИД ОБЪЕКТА КОНТРОЛЯ
+    object_type_match = re.search(r'Вид объекта контроля:\s*(.+)', card_text)
+    if object_type_match:
+        data.object_kind = object_type_match.group(1).strip()
+
+    # 6. ПОДВИД ОБЪЕКТА КОНТРОЛЯ
+    subtype_match = re.search(r'Подвид объекта контроля:\s*(.+)', card_text)
+    if subtype_match:
+        data.object_subkind = subtype_match.group(1).strip()
+
+    # 7. АДРЕС
+    address_match = re.search(r'Адрес объекта контроля:\s*(.+)', card_text)
+    if address_match:
+        data.address = address_match.group(1).strip()
+
+    # 8. КОНТРОЛИРУЕМЫЕ ЛИЦА: ФИО из DOM, иначе ищем в тексте карточки
+    if person_name:
+        data.fio = person_name
+        data.full_name = person_name
+    else:
+        for line in card_text.split('\n'):
+            line = line.strip()
+            if (len(line) > 8 and ' ' in line and
+                    line[0].isupper() and
+                    not any(marker in line for marker in ['ИНН:', 'ОГРН:', 'Адрес:', 'Вид:', 'Тип:'])):
+                words = line.split()
+                if 2 <= len(words) <= 4:
+                    data.fio = line
+                    data.full_name = line
+                    break
+
+    # 9. ИНН и ОГРН - ищем по паттернам
+    inn_match = re.search(r'ИНН\s*[:：]?\s*(\d{10,12})', card_text)
+    if inn_match:
+        data.inn = inn_match.group(1)
+
+    ogrn_match = re.search(r'ОГРН\s*[:：]?\s*(\d{13})', card_text)
+    if ogrn_match:
+        data.ogrn = ogrn_match.group(1)
+
+    ogrnip_match = re.search(r'ОГРНИП\s*[:：]?\s*(\d{15})', card_text)
+    if ogrnip_match:
+        data.ogrnip = ogrnip_match.group(1)
+        if not data.ogrn:
+            data.ogrn = data.ogrnip
+
+    # 10. Если ИНН/ОГРН не найдены, пробуем поискать в любом месте текста;
+    # число без подписи берем, только если сходятся контрольные цифры
+    # (иначе подхватывается cosId, телефон или номер документа)
+    if not data.inn:
+        for num in re.findall(r'\b\d{10,12}\b', card_text):
+            if num != data.cos_id and inn_is_valid(num):
+                data.inn = num
+                break
+
+    if not data.ogrn:
+        for num in re.findall(r'\b\d{13,15}\b', card_text):
+            if num != data.cos_id and ogrn_is_valid(num):
+                data.ogrn = num
+                break
+
+    # 11. Статус сбора
+    set_card_status(data)
+    data.intern_categories()
+    return data
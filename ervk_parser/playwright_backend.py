@@ -0,0 +1,338 @@
+"""Асинхронный браузер на Playwright: много страниц в одном контексте.
+
+Вместо одного блокирующего Chrome на процесс страницы ЕРВК открываются
+параллельно во вкладках одного контекста под asyncio. Playwright сам
+ждет элементы (auto-waiting), а маршрутизация запросов (route) отсекает
+картинки и шрифты еще до сети. PlaywrightPage - наследник BrowserBackend
+из browser.py, но ее методы - корутины.
+
+    python -m ervk_parser crawl --backend playwright --url "<адрес с фильтрами>" --concurrency 4
+
+Нужен пакет playwright: pip install playwright && python -m playwright install
+"""
+import asyncio
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .audit import PAGINATOR_JS, parse_total, same_total
+from .browser import EXPAND_PAGE_JS, EXTRACT_CARDS_JS, FIND_CARDS_JS, BrowserBackend, person_xpaths
+from .capture import NetworkCapture
+from .locators import locators
+from .log import flush_logging, log, progress_log
+from .metrics import metrics
+from .parsing import new_card_data, parse_card_text
+from .prefetch import page_url
+from .schema import timestamp
+
+# Ресурсы, которые парсеру не нужны: отвечаем abort() без запроса в сеть
+BLOCKED_RESOURCES = ('image', 'font', 'media')
+CARD_CSS = "div.css-s85nh6"
+
+
+class FiltersLost(RuntimeError):
+    """Страница по адресу показывает другую выдачу: фильтры не в адресе."""
+
+
+def _wrap(script):
+    """Тело функции в стиле Selenium -> функция Playwright с массивом аргументов."""
+    return "(args) => (function() {\n%s\n}).apply(null, args)" % script
+
+
+class PlaywrightCapture(NetworkCapture):
+    """Сборщик JSON ответов на событиях Playwright (без performance log)."""
+
+    def __init__(self, page, url_patterns=('/api/',)):
+        super().__init__(None, url_patterns)
+        self.page = page
+        self.tasks = set()
+
+    def start(self):
+        self.page.on('response', self._on_response)
+
+    def _on_response(self, response):
+        if 'json' not in response.headers.get('content-type', ''):
+            return
+        if not any(pattern in response.url for pattern in self.url_patterns):
+            return
+        task = asyncio.ensure_future(self._read(response))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _read(self, response):
+        try:
+            self.add_payload(await response.json())
+            self.metrics.incr('capture.responses')
+        except Exception as e:
+            log.warning("      ⚠ Не удалось прочитать ответ %s: %s", response.url[:80], e)
+
+    def drain(self):
+        # Ответы разбираются по мере прихода; drain оставлен для совместимости
+        return 0
+
+
+class PlaywrightPage(BrowserBackend):
+    """Одна вкладка контекста; методы BrowserBackend, но async."""
+
+    def __init__(self, page):
+        self.page = page
+
+    async def navigate(self, url):
+        await self.page.goto(url, wait_until='domcontentloaded')
+
+    async def run_script(self, script, *args):
+        return await self.page.evaluate(_wrap(script), list(args))
+
+    async def query_cards(self, selectors):
+        found = await self.page.evaluate_handle(_wrap(FIND_CARDS_JS), [list(selectors)])
+        selector = await (await found.get_property('selector')).json_value()
+        cards = []
+        pairs = await (await found.get_property('cards')).get_properties()
+        for pair in pairs.values():
+            element = (await pair.get_property('0')).as_element()
+            cos_id = await (await pair.get_property('1')).json_value()
+            cards.append((cos_id, element))
+        await found.dispose()
+        self.record_cards({'cards': cards, 'selector': selector})
+        return cards
+
+    async def extract_cards(self, selectors):
+        found = await self.run_script(EXTRACT_CARDS_JS, list(selectors), person_xpaths())
+        self.record_cards(found)
+        return [tuple(card) for card in found['cards']]
+
+    async def click(self, element):
+        # Родной клик Playwright сам ждет видимости и прокручивает к элементу
+        await element.click()
+
+    async def wait_for(self, css, timeout=10):
+        try:
+            await self.page.wait_for_selector(css, timeout=timeout * 1000)
+            return True
+        except Exception:
+            return False
+
+    def intercept(self, url_patterns=('/api/',)):
+        capture = PlaywrightCapture(self.page, url_patterns)
+        capture.start()
+        return capture
+
+    async def close(self):
+        await self.page.close()
+
+
+class PlaywrightBackend:
+    """Браузер и общий контекст; страницы создаются через new_page()."""
+
+    def __init__(self, headless=True, block_resources=BLOCKED_RESOURCES):
+        self.headless = headless
+        self.block_resources = tuple(block_resources)
+        self.playwright = None
+        self.browser = None
+        self.context = None
+
+    async def start(self):
+        from playwright.async_api import async_playwright
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        self.context = await self.browser.new_context(viewport={'width': 1920, 'height': 1080}, locale='ru-RU')
+        if self.block_resources:
+            await self.context.route('**/*', self._route)
+        return self
+
+    async def _route(self, route):
+        if route.request.resource_type in self.block_resources:
+            metrics.incr('playwright.blocked')
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def new_page(self):
+        return PlaywrightPage(await self.context.new_page())
+
+    async def close(self):
+        if self.context:
+            await self.context.close()
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+
+async def _expanded(tab, timeout):
+    """Ждет, пока раскрытые карточки догрузят адрес/ИНН (или таймаут)."""
+    try:
+        await tab.page.wait_for_function(
+            "(css) => { var cards = document.querySelectorAll(css);"
+            " return cards.length > 0 && Array.prototype.every.call(cards, function(c) {"
+            " return /Адрес объекта контроля:|ИНН:|Контролируемые лица/.test(c.innerText); }); }",
+            arg=CARD_CSS, timeout=timeout * 1000)
+    except Exception:
+        metrics.incr('playwright.expand_timeout')
+
+
+async def crawl_page(tab, base_url, page_num, expand_timeout=10, expected_total=None):
+    """Открывает страницу, раскрывает карточки одним скриптом и парсит тексты.
+
+    expected_total - число найденных объектов из pick_filters: если на
+    странице другое, фильтры по адресу не восстановились (FiltersLost).
+    """
+    await tab.navigate(page_url(base_url, page_num))
+    if not await tab.wait_for(CARD_CSS, timeout=20):
+        log.warning("   ⚠ Страница %s: карточки не загрузились", page_num)
+        return []
+    if expected_total is not None:
+        total = parse_total((await tab.run_script(PAGINATOR_JS))['text'])
+        if not same_total(expected_total, total):
+            raise FiltersLost(f"страница {page_num}: найдено {total} вместо {expected_total}")
+    selectors = locators.selectors('card')
+    await tab.run_script(EXPAND_PAGE_JS, selectors)
+    await _expanded(tab, expand_timeout)
+    collected_at = timestamp()
+    records = []
+    for cos_id, card_text, person in await tab.extract_cards(selectors):
+        record = parse_card_text(card_text, new_card_data(cos_id, collected_at), person)
+        record.page = page_num
+        records.append(record)
+    return records
+
+
+async def crawl_pages(base_url, pages, on_page, concurrency=4, headless=True, expected_total=None, writer=None):
+    """Обходит pages параллельно в concurrency вкладках одного контекста.
+
+    on_page(page_num, records) - запись в хранилища после каждой страницы;
+    она блокирующая и выполняется в потоке writer (ThreadPoolExecutor,
+    None - пул цикла событий), чтобы не останавливать остальные вкладки.
+    Возвращает {номер страницы: записей}.
+    Если страница показывает не expected_total объектов, обход
+    останавливается и поднимается FiltersLost.
+    """
+    backend = await PlaywrightBackend(headless=headless).start()
+    queue = asyncio.Queue()
+    for page_num in pages:
+        queue.put_nowait(page_num)
+    done = {}
+    lost = []
+
+    async def worker():
+        tab = await backend.new_page()
+        try:
+            while True:
+                try:
+                    page_num = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                with metrics.timer('playwright.page'):
+                    try:
+                        records = await crawl_page(tab, base_url, page_num, expected_total=expected_total)
+                    except FiltersLost as e:
+                        # Остальные страницы были бы той же чужой выдачей
+                        lost.append(e)
+                        while not queue.empty():
+                            queue.get_nowait()
+                        return
+                    except Exception as e:
+                        log.warning("   ⚠ Ошибка страницы %s: %s", page_num, e)
+                        metrics.incr('playwright.page_errors')
+                        records = []
+                done[page_num] = len(records)
+                progress_log.info("   📄 Страница %s: %d карточек", page_num, len(records),
+                                  extra={'event': 'page', 'page': page_num, 'records': len(records)})
+                if records:
+                    await asyncio.get_running_loop().run_in_executor(writer, on_page, page_num, records)
+        finally:
+            await tab.close()
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        await backend.close()
+    if lost:
+        raise lost[0]
+    return done
+
+
+async def pick_filters(start_url="https://ervk.gov.ru/objects", manual=True):
+    """Открывает первую страницу и читает пагинатор.
+
+    manual=True - видимый браузер для ручной настройки фильтров. Возвращает
+    (адрес с фильтрами, последняя страница, ожидаемое число объектов).
+    """
+    backend = await PlaywrightBackend(headless=not manual, block_resources=()).start()
+    try:
+        tab = await backend.new_page()
+        await tab.navigate(start_url)
+        if manual:
+            await asyncio.get_running_loop().run_in_executor(
+                None, input, "\nНастройте фильтры в браузере и нажмите Enter...")
+        await tab.wait_for(CARD_CSS, timeout=20)
+        info = await tab.run_script(PAGINATOR_JS)
+        last_page = max(info['pages']) if info['pages'] else None
+        return tab.page.url, last_page, parse_total(info['text'])
+    finally:
+        await backend.close()
+
+
+def run_crawl(url=None, first_page=1, last_page=None, max_pages=1000, concurrency=4, headless=True,
+              output_filename=None, temp_files_dir='temp_pages', sqlite_path=None):
+    """Синхронная обертка для CLI: обход, временные Excel и итоговый файл."""
+    from .excel import cleanup_temp_files, merge_all_pages, save_to_excel
+    from .sqlite import SQLiteSink
+
+    expected_total = None
+    if not url or not last_page:
+        url, found_last, expected_total = asyncio.run(
+            pick_filters(url or "https://ervk.gov.ru/objects", manual=not url))
+        last_page = last_page or found_last
+    if not last_page:
+        log.warning("⚠ Не удалось определить число страниц, укажите --last-page")
+        return 'failed'
+    last_page = min(last_page, first_page + max_pages - 1)
+    log.info("🌐 Playwright: страницы %s-%s, вкладок %s%s", first_page, last_page, concurrency,
+             f", ожидается объектов: {expected_total}" if expected_total is not None else '')
+
+    run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_filename = output_filename or f'ЕРВК_все_страницы_{run_id}.xlsx'
+    os.makedirs(temp_files_dir, exist_ok=True)
+    # Запись страниц - в одном отдельном потоке: соединение SQLite живет в
+    # нем, а цикл событий не ждет Excel и базу
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ervk-writer')
+    sink = writer.submit(SQLiteSink, sqlite_path).result() if sqlite_path else None
+    if sink:
+        writer.submit(sink.begin_run, note=output_filename).result()
+    temp_files = []
+
+    def store(page_num, records):
+        if sink:
+            sink.write_page(records, page_num)
+        temp_filename = os.path.join(temp_files_dir, f'page_{page_num:03d}.xlsx')
+        if save_to_excel(records, temp_filename):
+            temp_files.append(temp_filename)
+
+    status = 'failed'
+    try:
+        done = asyncio.run(crawl_pages(url, range(first_page, last_page + 1), store,
+                                       concurrency=concurrency, headless=headless,
+                                       expected_total=expected_total, writer=writer))
+        empty = sorted(page for page, count in done.items() if not count)
+        if empty:
+            log.warning("⚠ Страницы без карточек: %s", empty)
+        temp_files.sort()
+        if temp_files and merge_all_pages(output_filename, temp_files, run_id=run_id):
+            cleanup_temp_files(temp_files)
+        status = 'finished'
+    except FiltersLost as e:
+        log.warning("⚠ Фильтры не передаются через адрес (%s), обход остановлен. "
+                    "Запустите обычный обход: python -m ervk_parser crawl", e)
+    except KeyboardInterrupt:
+        status = 'interrupted'
+    finally:
+        if sink:
+            writer.submit(sink.finish_run, status).result()
+            writer.submit(sink.close).result()
+        writer.shutdown()
+        # Отчет печатается напрямую - сначала выписываем журнал
+        flush_logging()
+        print("\n📈 МЕТРИКИ:")
+        metrics.report()
+    return status
@@ -0,0 +1,177 @@
+"""Двойная буферизация страниц в двух вкладках одной сессии браузера.
+
+Пока в основной вкладке раскрывается и парсится страница N, во второй
+вкладке уже грузится страница N+1 и по ней запускается раскрытие карточек.
+После сохранения страницы N вкладки меняются местами. Второй процесс
+браузера не нужен - обе вкладки живут в одной сессии WebDriver.
+
+Вторая вкладка открывается по адресу, а фильтры сайт может держать не в
+адресе. Поэтому вкладка принимается, только если в ней та же выдача:
+номер страницы и общее число "Найдено" совпадают с основной вкладкой.
+Если число найденных не видно, предзагрузка не включается.
+"""
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .audit import read_expected, same_total
+from .log import log
+from .metrics import metrics as default_metrics
+
+# Раскрытие всех карточек одним вызовом, без ожидания ответов сервера:
+# данные догружаются, пока основная вкладка занята парсингом
+EXPAND_ALL_JS = """
+var cards = arguments[0];
+for (var c = 0; c < cards.length; c++) {
+    var card = cards[c];
+    var images = card.getElementsByTagName('img');
+    for (var i = 0; i < images.length; i++) {
+        try {
+            images[i].click();
+        } catch(e) {}
+    }
+    card.click();
+    card.dispatchEvent(new MouseEvent('dblclick', {bubbles: true, cancelable: true, view: window}));
+}
+return cards.length;
+"""
+
+WINDOW_NAMES = ('ervk_buffer_0', 'ervk_buffer_1')
+
+
+def page_url(url, page, param='page'):
+    """Тот же адрес с фильтрами, но с номером страницы page."""
+    parts = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != param]
+    query.append((param, str(page)))
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+class DoubleBufferedNavigator:
+    """Держит две вкладки: основную (парсинг) и фоновую (следующая страница)."""
+
+    def __init__(self, driver, find_cards, page_param='page', card_xpath="//div[contains(@class, 'css-s85nh6')]",
+                 load_timeout=10, metrics=None):
+        self.driver = driver
+        self.find_cards = find_cards
+        self.page_param = page_param
+        self.card_xpath = card_xpath
+        self.load_timeout = load_timeout
+        self.metrics = metrics or default_metrics
+        self.enabled = True
+        self.base_url = None
+        self.front = None
+        self.back = None
+        self.names = {}
+        self.back_page = None
+        self.back_ready = False
+        self.expected_total = None
+
+    def start(self):
+        """Запоминает текущую вкладку с настроенными фильтрами как основную."""
+        self.front = self.driver.current_window_handle
+        self.base_url = self.driver.current_url
+        self.driver.execute_script("window.name = arguments[0];", WINDOW_NAMES[0])
+        self.names[self.front] = WINDOW_NAMES[0]
+        self.expected_total = read_expected(self.driver)[0]
+        if self.expected_total is None:
+            log.warning("   ⚠ Не видно числа найденных объектов - фильтры во второй вкладке не проверить, "
+                        "предзагрузка отключена")
+            self.enabled = False
+
+    def prefetch(self, page_num):
+        """Начинает загрузку page_num в фоновой вкладке, не переключаясь на нее."""
+        if not self.enabled:
+            return
+        url = page_url(self.base_url, page_num, self.page_param)
+        handles_before = set(self.driver.window_handles)
+        back_name = self.names.get(self.back, WINDOW_NAMES[1])
+        # Именованное окно: при повторном вызове грузится в ту же вкладку
+        self.driver.execute_script("window.open(arguments[0], arguments[1]);", url, back_name)
+        if self.back is None:
+            new_handles = [h for h in self.driver.window_handles if h not in handles_before]
+            if not new_handles:
+                log.warning("   ⚠ Не удалось открыть вторую вкладку, предзагрузка отключена")
+                self.enabled = False
+                return
+            self.back = new_handles[0]
+            self.names[self.back] = back_name
+        self.back_page = page_num
+        self.back_ready = False
+        self.metrics.incr('prefetch.started')
+
+    def prepare(self, expand=True):
+        """Запускает раскрытие карточек в фоновой вкладке и возвращается назад.
+
+        Вызывается, когда основная вкладка уже раскрыта: к этому моменту
+        следующая страница обычно успевает загрузиться. expand=False -
+        только дождаться загрузки (детали грузятся отдельно по cosId).
+        """
+        if not self.enabled or self.back_page is None:
+            return
+        self.driver.switch_to.window(self.back)
+        try:
+            with self.metrics.timer('prefetch.prepare'):
+                try:
+                    WebDriverWait(self.driver, self.load_timeout).until(
+                        EC.presence_of_element_located((By.XPATH, self.card_xpath))
+                    )
+                except Exception:
+                    log.warning("   ⚠ Страница %s во второй вкладке не загрузилась", self.back_page)
+                    return
+                cards = self.find_cards()
+                if cards:
+                    if expand:
+                        self.driver.execute_script(EXPAND_ALL_JS, [card for _, card in cards])
+                    self.back_ready = True
+        finally:
+            self.driver.switch_to.window(self.front)
+
+    def swap(self, expected_page, get_page_number):
+        """Делает фоновую вкладку основной, если в ней действительно expected_page.
+
+        Если номер страницы или число найденных объектов не совпали (сайт не
+        понимает параметр страницы в адресе или держит фильтры не в адресе),
+        предзагрузка отключается до конца сессии и возвращается False -
+        тогда переходим по кнопке как обычно.
+        """
+        if not self.enabled or not self.back_ready or self.back_page != expected_page:
+            return False
+        self.driver.switch_to.window(self.back)
+        if get_page_number() != expected_page:
+            return self._reject("Номер страницы во второй вкладке не совпал")
+        total = read_expected(self.driver)[0]
+        if not same_total(self.expected_total, total):
+            return self._reject(f"Во второй вкладке найдено {total} вместо {self.expected_total} - "
+                                f"фильтры не перенеслись")
+        self.front, self.back = self.back, self.front
+        self.back_page = None
+        self.back_ready = False
+        self.metrics.incr('prefetch.swapped')
+        # Даем раскрытым в фоне карточкам догрузить данные
+        time.sleep(0.5)
+        return True
+
+    def _reject(self, reason):
+        log.warning("   ⚠ %s, предзагрузка отключена", reason)
+        self.enabled = False
+        self.driver.switch_to.window(self.front)
+        self.close()
+        self.metrics.incr('prefetch.rejected')
+        return False
+
+    def close(self):
+        """Закрывает фоновую вкладку и оставляет основную активной."""
+        if self.back is None:
+            return
+        try:
+            self.driver.switch_to.window(self.back)
+            self.driver.close()
+        except Exception:
+            pass
+        finally:
+            self.back = None
+            self.driver.switch_to.window(self.front)
@@ -0,0 +1,148 @@
+"""Планировщик повторных обходов по скорости изменения запросов.
+
+Одни регионы и виды контроля меняются каждый день, другие - раз в месяц,
+а обходятся одинаково часто. Запуски заданий пакета пишутся в таблицу
+runs SQLite с именем запроса (query = имя задания), числом новых и
+измененных объектов и стоимостью (секунды, страницы). По этой истории
+для каждого запроса оцениваются:
+
+    rate     - изменений в сутки (новые + измененные объекты между
+               соседними запусками; частичный запуск масштабируется
+               на полную выдачу)
+    cost     - секунд на полный обход (секунд на страницу x страниц)
+    priority - сколько изменений накопилось с прошлого обхода на час
+               работы: rate * суток с прошлого обхода / cost в часах
+
+Запросы без истории (меньше двух запусков) и давно не обходившиеся
+(--max-age) идут первыми, остальные - по priority, пока хватает бюджета
+времени. Выбранные задания пишутся новым файлом заданий:
+
+    python -m ervk_parser schedule --jobs jobs.json --budget 3h
+    python -m ervk_parser crawl --jobs ЕРВК_план_<время>.json
+
+Имена заданий должны быть постоянными - по ним ищется история.
+"""
+import datetime
+import json
+
+from .budget import format_duration
+
+# Сколько последних запусков запроса учитывать
+HISTORY_RUNS = 10
+# Секунд на страницу, пока нет ни одного запуска с замерами
+DEFAULT_PAGE_SECONDS = 30
+# Страниц у задания без истории, max_pages и last_page
+DEFAULT_PAGES = 50
+
+
+def query_history(conn, query, last_runs=HISTORY_RUNS):
+    """Последние завершенные запуски запроса, от старых к новым."""
+    rows = conn.execute(
+        "SELECT started_at, status, pages, added, changed, total_seconds FROM runs "
+        "WHERE query = ? AND status IN ('finished', 'budget') ORDER BY id DESC LIMIT ?",
+        (query, last_runs)).fetchall()
+    return [{'started_at': datetime.datetime.fromisoformat(started_at), 'status': status, 'pages': pages,
+             'added': added, 'changed': changed, 'seconds': seconds}
+            for started_at, status, pages, added, changed, seconds in reversed(rows)]
+
+
+def estimate(history, now=None):
+    """Скорость изменений, стоимость и давность обхода запроса по его истории."""
+    now = now or datetime.datetime.now()
+    result = {'runs': len(history), 'last_run': None, 'days_since': None, 'rate': None,
+              'page_seconds': None, 'full_pages': None}
+    if not history:
+        return result
+    result['last_run'] = history[-1]['started_at']
+    result['days_since'] = (now - result['last_run']).total_seconds() / 86400
+
+    measured = [run for run in history if run['pages'] and run['seconds']]
+    if measured:
+        result['page_seconds'] = sum(run['seconds'] for run in measured) / sum(run['pages'] for run in measured)
+    finished = [run['pages'] for run in history if run['status'] == 'finished' and run['pages']]
+    result['full_pages'] = max(finished or [run['pages'] for run in history]) or None
+
+    # Первый запуск окна не считается: интервал до него неизвестен
+    changes = 0
+    days = 0
+    for previous, run in zip(history, history[1:]):
+        interval = (run['started_at'] - previous['started_at']).total_seconds() / 86400
+        if interval <= 0 or not run['pages']:
+            continue
+        scale = max(result['full_pages'] or run['pages'], run['pages']) / run['pages']
+        changes += (run['added'] + run['changed']) * scale
+        days += interval
+    if days:
+        result['rate'] = changes / days
+    return result
+
+
+def plan(jobs, conn, budget_seconds, max_age_days=None, now=None):
+    """Оценки и выбор заданий в бюджет времени.
+
+    Возвращает список записей {'job', 'estimate', 'cost', 'priority',
+    'reason', 'chosen'} в порядке очередности.
+    """
+    now = now or datetime.datetime.now()
+    entries = [{'job': job, 'estimate': estimate(query_history(conn, job['name']), now)} for job in jobs]
+    known = [entry['estimate']['page_seconds'] for entry in entries if entry['estimate']['page_seconds']]
+    default_page_seconds = sum(known) / len(known) if known else DEFAULT_PAGE_SECONDS
+
+    for entry in entries:
+        job, stats = entry['job'], entry['estimate']
+        pages = stats['full_pages'] or job.get('last_page') or job.get('max_pages') or DEFAULT_PAGES
+        if job.get('max_pages'):
+            pages = min(pages, job['max_pages'])
+        entry['cost'] = pages * (stats['page_seconds'] or default_page_seconds)
+        if job.get('max_duration'):
+            entry['cost'] = min(entry['cost'], job['max_duration'])
+        entry['priority'] = None
+        if stats['rate'] is None:
+            entry['reason'] = 'нет истории'
+        elif max_age_days is not None and stats['days_since'] >= max_age_days:
+            entry['reason'] = 'давно'
+        else:
+            entry['reason'] = 'изменения'
+            entry['priority'] = stats['rate'] * stats['days_since'] / (entry['cost'] / 3600)
+
+    # Сначала обязательные (без истории, давние - самые старые первыми), затем по приоритету
+    entries.sort(key=lambda entry: (entry['priority'] is not None, -(entry['priority'] or 0),
+                                    -(entry['estimate']['days_since'] or float('inf'))))
+    left = budget_seconds
+    for entry in entries:
+        entry['chosen'] = entry['cost'] <= left
+        if entry['chosen']:
+            left -= entry['cost']
+    return entries
+
+
+def print_plan(entries, budget_seconds):
+    print(f"\n🗓 ПЛАН ОБХОДА (бюджет {format_duration(budget_seconds)}):")
+    print(f"   {'':2}{'задание':<24}{'изм/сут':>9}{'дней':>7}{'обход':>10}{'приоритет':>11}  причина")
+    for entry in entries:
+        stats = entry['estimate']
+        rate = f"{stats['rate']:.1f}" if stats['rate'] is not None else '-'
+        days = f"{stats['days_since']:.1f}" if stats['days_since'] is not None else '-'
+        priority = f"{entry['priority']:.1f}" if entry['priority'] is not None else '-'
+        mark = '✓' if entry['chosen'] else ' '
+        print(f"   {mark:<2}{entry['job']['name'][:23]:<24}{rate:>9}{days:>7}"
+              f"{format_duration(entry['cost']):>10}{priority:>11}  {entry['reason']}")
+    chosen = [entry for entry in entries if entry['chosen']]
+    print(f"   Выбрано заданий: {len(chosen)} из {len(entries)}, "
+          f"оценка времени: {format_duration(sum(entry['cost'] for entry in chosen))}")
+
+
+def save_plan(filename, entries):
+    """Выбранные задания - файл заданий для crawl --jobs."""
+    jobs = []
+    for entry in entries:
+        if not entry['chosen']:
+            continue
+        job = dict(entry['job'])
+        if job.get('max_duration') is not None:
+            # load_jobs читает число без единиц как минуты
+            job['max_duration'] = f"{int(job['max_duration'])}s"
+        jobs.append(job)
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({'jobs': jobs}, f, ensure_ascii=False, indent=1)
+    return filename
@@ -0,0 +1,143 @@
+"""Единая схема записи карточки ЕРВК.
+
+FIELDS задает порядок колонок (как в Excel), имя атрибута, заголовок
+колонки и ширину столбца. Из FIELDS строятся колонки Excel (save_to_excel
+и выгрузка частями), таблицы SQLite и индекса и схема Parquet; сами
+модули задают только типы хранения своих колонок.
+"""
+import datetime
+import sys
+
+# (атрибут, колонка, ширина в Excel)
+FIELDS = (
+    ('page', 'Номер страницы', 12),
+    ('cos_id', 'cosId', 15),
+    ('risk_category', 'Категория риска', 15),
+    ('object_type', 'Тип объекта', 40),
+    ('fio', 'ФИО', 30),
+    ('full_name', 'Полное наименование контролируемого лица', 40),
+    ('inn', 'ИНН', 15),
+    ('ogrn', 'ОГРН', 20),
+    ('ogrnip', 'ОГРНИП', 20),
+    ('address', 'Адрес объекта контроля', 50),
+    ('control_kind', 'Вид контроля', 40),
+    ('object_kind', 'Вид объекта контроля', 50),
+    ('object_subkind', 'Подвид объекта контроля', 50),
+    ('collected_at', 'Время сбора', 20),
+    ('status', 'Статус', 15),
+)
+
+ATTRIBUTES = tuple(attr for attr, _, _ in FIELDS)
+COLUMN_NAMES = [column for _, column, _ in FIELDS]
+COLUMN_WIDTHS = [width for _, _, width in FIELDS]
+COLUMN_TO_ATTR = {column: attr for attr, column, _ in FIELDS}
+STATUS_COLUMN = COLUMN_NAMES.index('Статус') + 1  # номер колонки в Excel (с 1)
+
+# Идентификаторы храним строками: из Excel ИНН/ОГРН иначе читаются как float
+IDENTIFIER_ATTRIBUTES = ('cos_id', 'inn', 'ogrn', 'ogrnip')
+IDENTIFIER_COLUMNS = tuple(column for attr, column, _ in FIELDS if attr in IDENTIFIER_ATTRIBUTES)
+
+# Цвет строки Excel по статусу разбора
+STATUS_COLORS = {
+    '✓ Успешно': 'C6EFCE',  # Светло-зеленый
+    '⚠ Только ФИО': 'FFEB9C',  # Светло-желтый
+    '⚠ Только ИНН': 'FFEB9C',
+    '✗ Данных нет': 'FFC7CE',  # Светло-красный
+}
+
+# Флаги проверки полей (колонка -> флаг): есть только в итоговой таблице
+# после validate.validate_frame, в записях и базе их нет
+VALIDITY_COLUMNS = {
+    'cosId': 'Проверка cosId',
+    'ФИО': 'Проверка ФИО',
+    'Полное наименование контролируемого лица': 'Проверка наименования',
+    'ИНН': 'Проверка ИНН',
+    'ОГРН': 'Проверка ОГРН',
+    'ОГРНИП': 'Проверка ОГРНИП',
+}
+
+# Поля с небольшим набором повторяющихся значений - интернируем строки
+CATEGORY_ATTRIBUTES = ('risk_category', 'control_kind', 'object_kind', 'object_subkind', 'status')
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def timestamp():
+    """Время сбора; вызывается один раз на страницу, а не на карточку."""
+    return datetime.datetime.now().strftime(TIME_FORMAT)
+
+
+class CardRecord:
+    """Компактная запись карточки (__slots__ вместо словаря на 15 ключей).
+
+    Доступ по атрибутам (record.inn) и, для совместимости со старым кодом
+    и выгрузками, по заголовку колонки (record['ИНН'], record.get('ИНН')).
+    """
+
+    __slots__ = ATTRIBUTES
+
+    def __init__(self, cos_id=None, page=None, collected_at=None, status='Собрано'):
+        for attr in ATTRIBUTES:
+            object.__setattr__(self, attr, None)
+        self.cos_id = cos_id
+        self.page = page
+        self.collected_at = collected_at
+        self.status = status
+
+    def to_row(self):
+        """Значения в порядке COLUMN_NAMES - для быстрой записи."""
+        return tuple(getattr(self, attr) for attr in ATTRIBUTES)
+
+    def to_dict(self):
+        return dict(zip(COLUMN_NAMES, self.to_row()))
+
+    @classmethod
+    def from_dict(cls, data):
+        record = cls()
+        record.update(data)
+        return record
+
+    def update(self, data):
+        """Заполняет поля из словаря с заголовками колонок (None пропускаем)."""
+        for column, value in data.items():
+            attr = COLUMN_TO_ATTR.get(column)
+            if attr and value is not None:
+                setattr(self, attr, value)
+
+    def intern_categories(self):
+        """Одинаковые значения категорий ссылаются на одну строку."""
+        for attr in CATEGORY_ATTRIBUTES:
+            value = getattr(self, attr)
+            if isinstance(value, str):
+                setattr(self, attr, sys.intern(value))
+
+    def __getitem__(self, column):
+        return getattr(self, COLUMN_TO_ATTR[column])
+
+    def __setitem__(self, column, value):
+        setattr(self, COLUMN_TO_ATTR[column], value)
+
+    def __contains__(self, column):
+        return column in COLUMN_TO_ATTR
+
+    def get(self, column, default=None):
+        attr = COLUMN_TO_ATTR.get(column)
+        if attr is None:
+            return default
+        return getattr(self, attr)
+
+    def __repr__(self):
+        return f"CardRecord(cos_id={self.cos_id!r}, page={self.page!r}, status={self.status!r})"
+
+
+def output_columns(columns):
+    """Колонки выгрузки: схема и флаги проверки, если они есть в таблице."""
+    present = set(columns)
+    return COLUMN_NAMES + [flag for flag in VALIDITY_COLUMNS.values() if flag in present]
+
+
+def to_row(record):
+    """Строка в порядке COLUMN_NAMES из CardRecord или словаря."""
+    if isinstance(record, CardRecord):
+        return record.to_row()
+    return tuple(record.get(column) for column in COLUMN_NAMES)
@@ -0,0 +1,192 @@
+"""Запись карточек в локальную базу SQLite с upsert по cosId.
+
+Каждая страница пишется одной транзакцией через executemany, база в
+режиме WAL. Таблица runs хранит время и количество записей каждого
+запуска, поэтому повторные загрузки дополняют базу, а не переписывают
+итоговый Excel целиком.
+
+У запуска с именем запроса (query, имя задания пакета) при завершении
+считаются новые (added) и измененные (changed) объекты - по ним
+планировщик schedule.py оценивает, как часто меняется выдача запроса.
+"""
+import datetime
+import sqlite3
+import time
+
+from .schema import ATTRIBUTES, to_row
+
+DEFAULT_PATH = 'ervk.sqlite'
+
+# Колонки таблицы objects называются как атрибуты CardRecord
+COS_ID_INDEX = ATTRIBUTES.index('cos_id')
+# Изменением объекта считается смена этих полей (не страницы и времени сбора)
+CONTENT_ATTRIBUTES = tuple(name for name in ATTRIBUTES if name not in ('cos_id', 'page', 'collected_at', 'status'))
+
+# Типы колонок objects по атрибутам CardRecord; не указанные здесь - TEXT
+COLUMN_TYPES = {'cos_id': 'TEXT PRIMARY KEY', 'page': 'INTEGER'}
+_OBJECT_COLUMNS = ''.join(f"    {name} {COLUMN_TYPES.get(name, 'TEXT')},\n"
+                          for name in ('cos_id',) + tuple(name for name in ATTRIBUTES if name != 'cos_id'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT,
+    note TEXT,
+    query TEXT,
+    pages INTEGER NOT NULL DEFAULT 0,
+    records INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    write_seconds REAL NOT NULL DEFAULT 0,
+    total_seconds REAL,
+    added INTEGER NOT NULL DEFAULT 0,
+    changed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS objects (
+""" + _OBJECT_COLUMNS + """    run_id INTEGER REFERENCES runs(id),
+    first_run_id INTEGER REFERENCES runs(id),
+    changed_run_id INTEGER REFERENCES runs(id)
+);
+CREATE INDEX IF NOT EXISTS objects_inn ON objects(inn);
+CREATE INDEX IF NOT EXISTS objects_ogrn ON objects(ogrn);
+CREATE INDEX IF NOT EXISTS objects_run_page ON objects(run_id, page);
+CREATE INDEX IF NOT EXISTS objects_first_run ON objects(first_run_id);
+"""
+
+# Колонки, добавленные после первой версии схемы: старые базы дополняются
+# (и новыми полями FIELDS из schema.py)
+MIGRATIONS = (
+    ('runs', 'query', 'TEXT'),
+    ('runs', 'added', 'INTEGER NOT NULL DEFAULT 0'),
+    ('runs', 'changed', 'INTEGER NOT NULL DEFAULT 0'),
+    ('objects', 'changed_run_id', 'INTEGER REFERENCES runs(id)'),
+) + tuple(('objects', name, COLUMN_TYPES.get(name, 'TEXT')) for name in ATTRIBUTES if name != 'cos_id')
+
+
+def _value(value):
+    """NaN из pandas и пустые строки пишем как NULL, идентификаторы - строками."""
+    if value is None or value != value or value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return value
+
+
+class SQLiteSink:
+    """Хранилище карточек: одна строка на cosId, последняя версия побеждает.
+
+    Пустые поля новой версии (карточка не раскрылась, ошибка разбора) не
+    затирают уже собранные значения - как в index.py.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        # timeout: в базу могут писать несколько процессов-воркеров
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.run_id = None
+        self.run_started = None
+
+        names = list(ATTRIBUTES)
+        updates = ', '.join(f"{name} = COALESCE(excluded.{name}, objects.{name})"
+                            for name in names if name not in ('cos_id', 'status'))
+        # Неудачный повторный разбор (ни одного поля содержимого) не затирает
+        # статус: данные объекта остаются прежними, и статус тоже
+        empty = ' AND '.join(f"excluded.{name} IS NULL" for name in CONTENT_ATTRIBUTES)
+        updates += (f", status = CASE WHEN {empty} THEN objects.status "
+                    f"ELSE COALESCE(excluded.status, objects.status) END")
+        updates += ", run_id = excluded.run_id"
+        # changed_run_id сдвигается, только если содержимое объекта другое
+        # (пустое поле изменением не считается - оно не записывается)
+        differs = ' OR '.join(f"(excluded.{name} IS NOT NULL AND objects.{name} IS NOT excluded.{name})"
+                              for name in CONTENT_ATTRIBUTES)
+        updates += (f", changed_run_id = CASE WHEN {differs} THEN excluded.run_id "
+                    f"ELSE objects.changed_run_id END")
+        self.upsert_sql = (
+            f"INSERT INTO objects ({', '.join(names)}, run_id, first_run_id, changed_run_id) "
+            f"VALUES ({', '.join('?' * (len(names) + 3))}) "
+            f"ON CONFLICT(cos_id) DO UPDATE SET {updates}"
+        )
+
+    def _migrate(self):
+        for table, column, declaration in MIGRATIONS:
+            columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                with self.conn:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS objects_changed_run ON objects(changed_run_id)")
+
+    def begin_run(self, note=None, query=None):
+        """Открывает запись о запуске и возвращает ее id; query - имя запроса для планировщика."""
+        self.run_started = time.perf_counter()
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, status, note, query) VALUES (?, 'running', ?, ?)",
+                (datetime.datetime.now().isoformat(timespec='seconds'), note, query),
+            )
+        self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def write_page(self, records, page_num=None):
+        """Upsert записей страницы одной транзакцией; возвращает число записанных."""
+        started = time.perf_counter()
+        rows = []
+        skipped = 0
+        for record in records:
+            row = [_value(value) for value in to_row(record)]
+            if not row[COS_ID_INDEX]:
+                skipped += 1
+                continue
+            rows.append(row + [self.run_id, self.run_id, self.run_id])
+        with self.conn:
+            self.conn.executemany(self.upsert_sql, rows)
+            if self.run_id is not None:
+                self.conn.execute(
+                    "UPDATE runs SET pages = pages + 1, records = records + ?, skipped = skipped + ?, "
+                    "write_seconds = write_seconds + ? WHERE id = ?",
+                    (len(rows), skipped, time.perf_counter() - started, self.run_id),
+                )
+        return len(rows)
+
+    def finish_run(self, status='finished'):
+        if self.run_id is None:
+            return
+        total = time.perf_counter() - self.run_started if self.run_started else None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = :finished, status = :status, total_seconds = :total, "
+                "added = (SELECT COUNT(*) FROM objects WHERE first_run_id = :run), "
+                "changed = (SELECT COUNT(*) FROM objects WHERE changed_run_id = :run AND first_run_id <> :run) "
+                "WHERE id = :run",
+                {'finished': datetime.datetime.now().isoformat(timespec='seconds'), 'status': status,
+                 'total': total, 'run': self.run_id},
+            )
+
+    def iter_rows(self, run_id=None):
+        """Строки objects в порядке COLUMN_NAMES; run_id - только обновленные этим запуском."""
+        sql = f"SELECT {', '.join(ATTRIBUTES)} FROM objects"
+        params = ()
+        if run_id is not None:
+            sql += " WHERE run_id = ?"
+            params = (run_id,)
+        yield from self.conn.execute(sql + " ORDER BY run_id, page, cos_id", params)
+
+    def stats(self, last_runs=10):
+        """Число объектов по категориям риска и статусам и последние запуски."""
+        return {
+            'objects': self.conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0],
+            'by_risk': self.conn.execute(
+                "SELECT COALESCE(risk_category, '-'), COUNT(*) FROM objects GROUP BY 1 ORDER BY 2 DESC").fetchall(),
+            'by_status': self.conn.execute(
+                "SELECT COALESCE(status, '-'), COUNT(*) FROM objects GROUP BY 1 ORDER BY 2 DESC").fetchall(),
+            'runs': self.conn.execute(
+                "SELECT id, started_at, status, pages, records, total_seconds FROM runs "
+                "ORDER BY id DESC LIMIT ?", (last_runs,)).fetchall(),
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,393 @@
+"""Локальный стенд ЕРВК с внедрением сбоев.
+
+Повторяет то, что парсер видит на ervk.gov.ru/objects: список карточек
+рисуется скриптом из JSON (/api/objects), карточка раскрывается по клику
+и догружает детали (/api/objects/<cosId>), внизу пагинатор MUI и строка
+"Найдено: N". Данные детерминированы (seed), поэтому бенчмарк знает,
+какие cosId должны быть на каждой странице.
+
+Сбои включаются долями запросов списка (FaultConfig):
+    slow      - ответ списка задерживается на slow_seconds
+    partial   - отдается только половина карточек страницы
+    stuck     - клик по пагинатору не сдвигает страницу
+    expired   - сессия истекает каждые expire_every запросов списка (401)
+    hang      - после отрисовки вкладка зависает (бесконечный цикл JS)
+Каждый сбой и каждый успешный ответ пишутся в events - по ним бенчмарк
+считает время восстановления.
+
+    python -m ervk_parser.standin --port 8765 --pages 30 --slow-rate 0.1 --hang-rate 0.02
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RISKS = ('значительный', 'низкий', 'средний', 'высокий')
+OBJECT_TYPES = ('Склад', 'Цех', 'Ферма', 'Магазин', 'Элеватор', 'Теплица')
+CONTROL_KINDS = ('Федеральный государственный ветеринарный контроль (надзор)',
+                 'Федеральный государственный карантинный фитосанитарный контроль (надзор)',
+                 'Федеральный государственный земельный контроль (надзор)')
+OBJECT_KINDS = ('Производственные объекты', 'Деятельность', 'Земельные участки')
+SUBKINDS = ('Здания и помещения', 'Транспортные средства', 'Оборудование')
+WORDS = ('Ромашка', 'Восход', 'Агро', 'Колос', 'Нива', 'Заря', 'Север', 'Урожай')
+SURNAMES = ('Иванов', 'Петров', 'Сидоров', 'Кузнецов', 'Смирнов', 'Попов')
+NAMES = ('Иван', 'Петр', 'Сергей', 'Алексей', 'Николай', 'Андрей')
+PATRONYMICS = ('Иванович', 'Петрович', 'Сергеевич', 'Алексеевич', 'Николаевич')
+CITIES = ('г. Москва', 'г. Тверь', 'г. Рязань', 'Московская обл., г. Клин', 'г. Калуга')
+
+
+def _digits(rnd, count):
+    return [rnd.randint(0, 9) for _ in range(count)]
+
+
+def _check(digits, weights):
+    return sum(d * w for d, w in zip(digits, weights)) % 11 % 10
+
+
+def fake_inn(rnd, length=10):
+    """ИНН с верными контрольными цифрами (10 - организация, 12 - ИП)."""
+    if length == 10:
+        digits = _digits(rnd, 9)
+        digits.append(_check(digits, (2, 4, 10, 3, 5, 9, 4, 6, 8)))
+    else:
+        digits = _digits(rnd, 10)
+        digits.append(_check(digits, (7, 2, 4, 10, 3, 5, 9, 4, 6, 8)))
+        digits.append(_check(digits, (3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8)))
+    return ''.join(map(str, digits))
+
+
+def fake_ogrn(rnd, length=13):
+    """ОГРН (13 цифр) или ОГРНИП (15) с верной контрольной цифрой."""
+    body = str(rnd.choice((1, 5)) if length == 13 else 3) + ''.join(map(str, _digits(rnd, length - 2)))
+    return body + str(int(body) % (11 if length == 13 else 13) % 10)
+
+
+def make_object(index, seed=1):
+    """Детерминированный объект контроля номер index."""
+    rnd = random.Random(seed * 1000003 + index)
+    legal = rnd.random() < 0.7
+    if legal:
+        person = {'fullName': f"ООО «{rnd.choice(WORDS)} {rnd.choice(WORDS)}»",
+                  'inn': fake_inn(rnd, 10), 'ogrn': fake_ogrn(rnd, 13)}
+    else:
+        person = {'fullName': f"{rnd.choice(SURNAMES)} {rnd.choice(NAMES)} {rnd.choice(PATRONYMICS)}",
+                  'inn': fake_inn(rnd, 12), 'ogrnip': fake_ogrn(rnd, 15)}
+    return {
+        'cosId': str(1000000 + index),
+        'name': rnd.choice(OBJECT_TYPES),
+        'riskCategory': rnd.choice(RISKS),
+        'controlKind': rnd.choice(CONTROL_KINDS),
+        'objectKind': rnd.choice(OBJECT_KINDS),
+        'objectSubKind': rnd.choice(SUBKINDS),
+        'address': f"{rnd.choice(CITIES)}, ул. {rnd.choice(WORDS)}, д. {rnd.randint(1, 120)}",
+        'controlledPersons': [person],
+    }
+
+
+class FaultConfig:
+    """Доли запросов списка со сбоями и их параметры."""
+
+    def __init__(self, slow_rate=0.0, slow_seconds=20.0, partial_rate=0.0, stuck_rate=0.0,
+                 expire_every=0, hang_rate=0.0, seed=7):
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.partial_rate = partial_rate
+        self.stuck_rate = stuck_rate
+        self.expire_every = expire_every
+        self.hang_rate = hang_rate
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+APP_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>ЕРВК - локальный стенд</title>
+<style>
+.css-s85nh6 {border: 1px solid #ccc; margin: 6px; padding: 8px; cursor: pointer}
+.details {margin-top: 6px; color: #333}
+button.Mui-selected {font-weight: bold}
+</style></head>
+<body>
+<div id="total"></div>
+<div id="list"></div>
+<nav id="pager"></nav>
+<script>
+var PAGE_SIZE = %(page_size)d;
+function currentPage() {
+    var p = new URLSearchParams(location.search).get('page');
+    return p ? parseInt(p, 10) : 1;
+}
+function esc(s) {
+    return String(s == null ? '' : s).replace(/[&<>]/g, function(c) {
+        return {'&': '&amp;', '<': '&lt;', '>': '&gt;'}[c];
+    });
+}
+function load(page, nav) {
+    fetch('/api/objects?page=' + page + '&size=' + PAGE_SIZE + (nav ? '&nav=1' : ''), {credentials: 'same-origin'})
+        .then(function(r) {
+            if (r.status === 401) {
+                document.getElementById('list').innerHTML = '<p>Сессия истекла. Обновите страницу.</p>';
+                document.getElementById('pager').innerHTML = '';
+                return null;
+            }
+            return r.json();
+        })
+        .then(function(data) {
+            if (!data || data.stuck) return;
+            var params = new URLSearchParams(location.search);
+            params.set('page', page);
+            if (nav) history.pushState({}, '', '?' + params.toString());
+            render(data);
+            if (data.hang) { setTimeout(function() { while (true) {} }, 50); }
+        });
+}
+function render(data) {
+    document.getElementById('total').innerText = 'Найдено: ' + data.totalElements + ' объектов';
+    var list = document.getElementById('list');
+    list.innerHTML = '';
+    data.content.forEach(function(obj) {
+        var card = document.createElement('div');
+        card.className = 'MuiPaper-root css-s85nh6';
+        card.innerHTML = '<div>№ ' + esc(obj.cosId) + ' ' + esc(obj.name) + '</div>' +
+                         '<div>' + esc(obj.riskCategory) + ' риск</div><img alt="">';
+        card.addEventListener('click', function() { expand(card, obj.cosId); });
+        list.appendChild(card);
+    });
+    renderPager(data.page, data.totalPages);
+}
+function expand(card, cosId) {
+    if (card.dataset.expanded) return;
+    card.dataset.expanded = '1';
+    fetch('/api/objects/' + cosId).then(function(r) { return r.json(); }).then(function(obj) {
+        var p = obj.controlledPersons[0];
+        var details = document.createElement('div');
+        details.className = 'details';
+        details.innerHTML =
+            '<div>Вид контроля: ' + esc(obj.controlKind) + '</div>' +
+            '<div>Вид объекта контроля: ' + esc(obj.objectKind) + '</div>' +
+            '<div>Подвид объекта контроля: ' + esc(obj.objectSubKind) + '</div>' +
+            '<div>Адрес объекта контроля: ' + esc(obj.address) + '</div>' +
+            '<div>Контролируемые лица</div>' +
+            '<p class="css-kific6-wordBreak">' + esc(p.fullName) + '</p>' +
+            '<div>ИНН: ' + esc(p.inn) + '</div>' +
+            (p.ogrn ? '<div>ОГРН: ' + esc(p.ogrn) + '</div>' : '') +
+            (p.ogrnip ? '<div>ОГРНИП: ' + esc(p.ogrnip) + '</div>' : '');
+        card.appendChild(details);
+    });
+}
+function pageButton(n, selected) {
+    var b = document.createElement('button');
+    b.className = 'MuiPaginationItem-root MuiPaginationItem-page' + (selected ? ' Mui-selected' : '');
+    b.innerText = String(n);
+    b.addEventListener('click', function() { load(n, true); });
+    return b;
+}
+function renderPager(page, totalPages) {
+    var pager = document.getElementById('pager');
+    pager.innerHTML = '';
+    var shown = {};
+    [1, page - 2, page - 1, page, page + 1, page + 2, totalPages].forEach(function(n) {
+        if (n >= 1 && n <= totalPages && !shown[n]) {
+            shown[n] = true;
+            pager.appendChild(pageButton(n, n === page));
+        }
+    });
+    var next = document.createElement('button');
+    next.setAttribute('aria-label', 'Перейти на следующую страницу');
+    next.className = 'MuiPaginationItem-root MuiPaginationItem-previousNext';
+    next.innerText = '›';
+    if (page >= totalPages) {
+        next.disabled = true;
+        next.className += ' Mui-disabled';
+    }
+    next.addEventListener('click', function() { load(page + 1, true); });
+    pager.appendChild(next);
+}
+window.addEventListener('popstate', function() { load(currentPage(), false); });
+load(currentPage(), false);
+</script>
+</body></html>
+"""
+
+
+class StandInServer:
+    """HTTP сервер стенда в фоновом потоке."""
+
+    def __init__(self, host='127.0.0.1', port=0, pages=30, page_size=20, faults=None, seed=1):
+        self.page_size = page_size
+        self.total = pages * page_size
+        self.faults = faults or FaultConfig()
+        self.seed = seed
+        self.rnd = random.Random(self.faults.seed)
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.events = []
+        self.started = time.time()
+        self.objects = [make_object(i, seed) for i in range(self.total)]
+        self.by_id = {obj['cosId']: obj for obj in self.objects}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/objects"
+
+    @property
+    def total_pages(self):
+        return max(1, -(-self.total // self.page_size))
+
+    def expected_pages(self):
+        """{номер страницы: [cosId]} - что должен собрать полный обход."""
+        return {page: [obj['cosId'] for obj in self.objects[(page - 1) * self.page_size:page * self.page_size]]
+                for page in range(1, self.total_pages + 1)}
+
+    def log(self, kind, page=None, session=None):
+        with self.lock:
+            self.events.append({'t': time.time() - self.started, 'kind': kind, 'page': page, 'session': session})
+
+    def _roll(self, rate):
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.rnd.random() < rate
+
+    def new_session(self):
+        session = uuid.uuid4().hex
+        with self.lock:
+            self.sessions[session] = {'requests': 0}
+        return session
+
+    def list_page(self, session_id, page, nav):
+        """(HTTP статус, JSON) ответа списка с учетом сбоев."""
+        with self.lock:
+            session = self.sessions.get(session_id)
+        if session is None:
+            self.log('expired', page, session_id)
+            return 401, {'error': 'session expired'}
+        session['requests'] += 1
+        if self.faults.expire_every and session['requests'] > self.faults.expire_every:
+            with self.lock:
+                self.sessions.pop(session_id, None)
+            self.log('expired', page, session_id)
+            return 401, {'error': 'session expired'}
+        if nav and self._roll(self.faults.stuck_rate):
+            self.log('stuck', page, session_id)
+            return 200, {'stuck': True}
+        if self._roll(self.faults.slow_rate):
+            self.log('slow', page, session_id)
+            time.sleep(self.faults.slow_seconds)
+
+        page = min(max(1, page), self.total_pages)
+        start = (page - 1) * self.page_size
+        content = [{key: obj[key] for key in ('cosId', 'name', 'riskCategory')}
+                   for obj in self.objects[start:start + self.page_size]]
+        data = {'content': content, 'page': page, 'size': self.page_size,
+                'totalElements': self.total, 'totalPages': self.total_pages}
+        if self._roll(self.faults.partial_rate):
+            self.log('partial', page, session_id)
+            data['content'] = content[:len(content) // 2]
+        elif self._roll(self.faults.hang_rate):
+            self.log('hang', page, session_id)
+            data['hang'] = True
+        else:
+            self.log('ok', page, session_id)
+        return 200, data
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type, headers=()):
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _json(self, status, data):
+                self._send(status, json.dumps(data, ensure_ascii=False), 'application/json; charset=utf-8')
+
+            def _session(self):
+                for part in self.headers.get('Cookie', '').split(';'):
+                    name, _, value = part.strip().partition('=')
+                    if name == 'ervk_session':
+                        return value
+                return None
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path in ('/', '/objects'):
+                    # Новая загрузка приложения - новая сессия
+                    session = server.new_session()
+                    self._send(200, APP_HTML % {'page_size': server.page_size}, 'text/html; charset=utf-8',
+                               [('Set-Cookie', f'ervk_session={session}; Path=/')])
+                elif url.path == '/api/objects':
+                    page = int(query.get('page', ['1'])[0])
+                    status, data = server.list_page(self._session(), page, 'nav' in query)
+                    self._json(status, data)
+                elif url.path.startswith('/api/objects/'):
+                    obj = server.by_id.get(url.path.rsplit('/', 1)[-1])
+                    if obj is None:
+                        self._json(404, {'error': 'not found'})
+                    else:
+                        self._json(200, obj)
+                else:
+                    self._send(404, 'not found', 'text/plain; charset=utf-8')
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='ervk-standin', daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Локальный стенд ЕРВК со сбоями")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=30)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-seconds', type=float, default=20.0)
+    parser.add_argument('--partial-rate', type=float, default=0.0)
+    parser.add_argument('--stuck-rate', type=float, default=0.0)
+    parser.add_argument('--expire-every', type=int, default=0)
+    parser.add_argument('--hang-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    faults = FaultConfig(args.slow_rate, args.slow_seconds, args.partial_rate, args.stuck_rate,
+                         args.expire_every, args.hang_rate)
+    server = StandInServer(args.host, args.port, args.pages, args.page_size, faults, args.seed)
+    print(f"Стенд ЕРВК: {server.url} ({server.total} объектов, {server.total_pages} страниц)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Трассировка обхода во вложенные интервалы и cProfile выбранной фазы.
+
+Таймеры metrics показывают суммы, но не то, куда ушло время одной
+медленной страницы. Tracer пишет интервалы страница -> фаза (find_cards,
+expand, parse, save, navigate) -> карточка -> команда WebDriver в формате
+Chrome trace events: файл открывается в https://ui.perfetto.dev или
+chrome://tracing.
+
+Страницы и фазы задает command_stats (begin_page/set_phase в driver_stats.py),
+поэтому отдельных вызовов в crawler для них не нужно; карточки и запись
+размечаются tracer.span(). Выключенный трейсер стоит одной проверки флага.
+
+profile_phase - имя фазы, которую на все время ее работы оборачивает
+cProfile; статистика сохраняется в .pstats (python -m pstats файл).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Tracer:
+    """Сборщик событий trace format для одного процесса."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.threads = {}
+        self.page = None
+        self.phase = None
+        self.profile_phase = None
+        self.profiler = None
+
+    def start(self, trace=True, profile_phase=None):
+        self.enabled = trace
+        self.events = []
+        self.threads = {}
+        self.origin = time.perf_counter()
+        self.page = None
+        self.phase = None
+        self.profile_phase = profile_phase
+        if profile_phase:
+            import cProfile
+            self.profiler = cProfile.Profile()
+
+    def _emit(self, event):
+        thread = threading.current_thread()
+        event['pid'] = self.pid
+        event['tid'] = thread.ident
+        with self.lock:
+            if thread.ident not in self.threads:
+                self.threads[thread.ident] = thread.name
+            self.events.append(event)
+
+    def _ts(self, perf_time):
+        return round((perf_time - self.origin) * 1e6, 1)
+
+    def complete(self, name, started, seconds, cat='crawl', **args):
+        """Готовый интервал: started - time.perf_counter() начала."""
+        if not self.enabled:
+            return
+        self._emit({'name': name, 'cat': cat, 'ph': 'X', 'ts': self._ts(started),
+                    'dur': round(seconds * 1e6, 1), 'args': args})
+
+    @contextmanager
+    def span(self, name, cat='crawl', **args):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, started, time.perf_counter() - started, cat, **args)
+
+    def _begin(self, name, cat, **args):
+        if self.enabled:
+            self._emit({'name': name, 'cat': cat, 'ph': 'B', 'ts': self._ts(time.perf_counter()), 'args': args})
+
+    def _end(self, name, cat):
+        if self.enabled:
+            self._emit({'name': name, 'cat': cat, 'ph': 'E', 'ts': self._ts(time.perf_counter())})
+
+    def begin_page(self, page_num):
+        """Закрывает интервал прошлой страницы и открывает новый."""
+        if page_num == self.page:
+            return
+        self._close_phase()
+        if self.page is not None:
+            self._end(f'page {self.page}', 'page')
+        self.page = page_num
+        if page_num is not None:
+            self._begin(f'page {page_num}', 'page', page=page_num)
+
+    def set_phase(self, name):
+        if name == self.phase:
+            return
+        self._close_phase()
+        self.phase = name
+        self._begin(name, 'phase')
+        if self.profiler and name == self.profile_phase:
+            self.profiler.enable()
+
+    def _close_phase(self):
+        if self.phase is None:
+            return
+        if self.profiler and self.phase == self.profile_phase:
+            self.profiler.disable()
+        self._end(self.phase, 'phase')
+        self.phase = None
+
+    def finish(self, trace_path=None, profile_path=None, top=15):
+        """Закрывает открытые интервалы, сохраняет трассу и статистику cProfile."""
+        self.begin_page(None)
+        if self.enabled and trace_path:
+            self.save(trace_path)
+            print(f"   🧭 Трасса: {trace_path} ({len(self.events)} событий, открыть в ui.perfetto.dev)")
+        if self.profiler and profile_path:
+            import pstats
+            self.profiler.dump_stats(profile_path)
+            print(f"   🧪 cProfile фазы {self.profile_phase}: {profile_path}")
+            pstats.Stats(self.profiler).sort_stats('cumulative').print_stats(top)
+        self.enabled = False
+        self.profiler = None
+
+    def save(self, path):
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+                    for tid, name in threads.items()]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+
+# Общий экземпляр на процесс
+tracer = Tracer()
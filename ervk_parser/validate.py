@@ -0,0 +1,231 @@
+"""Проверка и нормализация итоговой таблицы по колонкам (pandas/NumPy).
+
+Разбор карточки работает по одной записи, а здесь вся объединенная
+таблица обрабатывается целыми колонками - миллион строк за несколько
+проходов без цикла Python по строкам:
+
+    - ФИО и наименование: пробелы (включая неразрывные) схлопываются,
+      кавычки «»“”„ приводятся к ", полные организационно-правовые формы
+      в начале - к сокращениям (Общество с ограниченной ответственностью -> ООО),
+      сокращения с точками (О.О.О.) или в другом регистре перед кавычкой
+      (ооо "Ромашка") - к каноническому виду;
+    - ИНН, ОГРН, ОГРНИП: контрольные цифры считаются матрицей цифр NumPy
+      (веса ИНН - скалярным произведением, ОГРН/ОГРНИП - остатком числа);
+    - по каждому проверяемому полю колонка-флаг (VALIDITY_COLUMNS в
+      schema.py): True - верно, False - ошибка, пусто - поля нет.
+"""
+import importlib.util
+import re
+
+import numpy as np
+import pandas as pd
+
+from .parsing import INN10_WEIGHTS, INN11_WEIGHTS, INN12_WEIGHTS
+from .schema import VALIDITY_COLUMNS
+
+NAME_COLUMNS = ('ФИО', 'Полное наименование контролируемого лица')
+
+# Полные формы -> сокращения; только в начале наименования
+LEGAL_FORMS = {
+    'общество с ограниченной ответственностью': 'ООО',
+    'публичное акционерное общество': 'ПАО',
+    'непубличное акционерное общество': 'АО',
+    'закрытое акционерное общество': 'ЗАО',
+    'открытое акционерное общество': 'ОАО',
+    'акционерное общество': 'АО',
+    'индивидуальный предприниматель': 'ИП',
+    'федеральное государственное унитарное предприятие': 'ФГУП',
+    'государственное унитарное предприятие': 'ГУП',
+    'муниципальное унитарное предприятие': 'МУП',
+    'государственное бюджетное учреждение': 'ГБУ',
+    'муниципальное бюджетное учреждение': 'МБУ',
+    'крестьянское (фермерское) хозяйство': 'КФХ',
+}
+# Строки в Arrow, если есть pyarrow: регулярные выражения тогда выполняются
+# в C по всей колонке, без цикла Python по строкам
+STRING_DTYPE = 'string[pyarrow]' if importlib.util.find_spec('pyarrow') else 'string'
+
+# Шаблоны в общем синтаксисе re и RE2 (Arrow): без lookahead, флаги только
+# на группу (?i:...)
+_QUOTES = '[«»“”„‟″]'
+_SPACES = '[\\s\u00a0]+'
+# Есть что схлопывать: два пробельных подряд или не обычный пробел
+_SPACES_TO_FIX = '[\\s\u00a0]{2}|[\\t\\n\\r\\f\\v\u00a0]'
+_IDENTIFIER_JUNK = '[\\s\u00a0]+|\\.0$'
+_LETTERS = '[А-Яа-яЁёA-Za-z]{2}'
+
+
+def _legal_form_patterns():
+    """Шаблоны форм по сокращениям: [(первые буквы форм, шаблон, замена)].
+
+    Полные формы - в любом регистре; сокращение с точками - только
+    заглавными (О.О.О.), в другом регистре - только перед кавычкой
+    (ооо "Ромашка"): иначе "Пао Ли Хуа" стал бы "ПАО Ли Хуа". По первой
+    букве строка проверяется только подходящими шаблонами.
+    """
+    forms = {}
+    for form, abbreviation in LEGAL_FORMS.items():
+        forms.setdefault(abbreviation, []).append(form)
+    patterns = []
+    for abbreviation, alternatives in forms.items():
+        initials = sorted({form[0] for form in alternatives} | {abbreviation[0].lower()})
+        full = '|'.join(re.escape(form) for form in sorted(alternatives, key=len, reverse=True))
+        dotted = r'\.?'.join(abbreviation) + r'\.?'
+        patterns.append((initials, r'^(?i:' + full + r')(\s|"|$)', abbreviation + r'\1'))
+        patterns.append((initials, r'^' + dotted + r'(\s|"|$)', abbreviation + r'\1'))
+        patterns.append((initials, r'^(?i:' + dotted + r')(\s*")', abbreviation + r'\1'))
+    return patterns
+
+
+_LEGAL_FORM_PATTERNS = _legal_form_patterns()
+# Любая форма в начале и форма уже в каноническом виде (ее не трогаем)
+_ANY_LEGAL_FORM = '|'.join(re.sub(r'\((?=\\s)', '(?:', pattern) for _, pattern, _ in _LEGAL_FORM_PATTERNS)
+_CANONICAL_FORM = '^(?:' + '|'.join(sorted(set(LEGAL_FORMS.values()))) + ')(?:\\s|"|$)'
+
+
+def _replace_where(text, mask, pattern, replacement):
+    """Замена только в строках mask: проверка дешевле замены, а менять нужно немногие."""
+    mask = mask.fillna(False).to_numpy(dtype=bool)
+    if mask.any():
+        text = text.copy()
+        text[mask] = text[mask].str.replace(pattern, replacement, regex=True)
+    return text
+
+
+def normalize_names(series):
+    """Пробелы, кавычки и организационно-правовая форма в начале наименования.
+
+    Возвращает строковую колонку STRING_DTYPE; одинаковые наименования
+    (у лица много объектов) обрабатываются один раз.
+    """
+    codes, uniques = pd.factorize(series.astype(STRING_DTYPE))
+    names = pd.Series(uniques, dtype=STRING_DTYPE)
+    names = _replace_where(names, names.str.contains(_QUOTES, regex=True), _QUOTES, '"')
+    names = _replace_where(names, names.str.contains(_SPACES_TO_FIX, regex=True), _SPACES, ' ').str.strip()
+    legal = names.str.contains(_ANY_LEGAL_FORM, regex=True) & ~names.str.contains(_CANONICAL_FORM, regex=True)
+    if legal.any():
+        first = names.str.slice(0, 1).str.lower()
+        for initials, pattern, replacement in _LEGAL_FORM_PATTERNS:
+            names = _replace_where(names, legal & first.isin(initials), pattern, replacement)
+    # Обратно по кодам; код -1 (пусто) дает NA
+    return pd.Series(names.array.take(codes, allow_fill=True), index=series.index)
+
+
+def clean_identifiers(series):
+    """Идентификатор строкой без пробелов: 7701234567.0 из Excel -> '7701234567'."""
+    text = series.astype(STRING_DTYPE)
+    return _replace_where(text, text.str.contains(_IDENTIFIER_JUNK, regex=True), _IDENTIFIER_JUNK, '')
+
+
+def _to_object(text):
+    """Строковая колонка -> object с None вместо пустых (как в записях и Excel)."""
+    values = text.to_numpy(dtype=object, na_value=None)
+    values[(text.str.len() == 0).fillna(False).to_numpy(dtype=bool)] = None
+    return pd.Series(values, index=text.index, dtype=object)
+
+
+def _digit_matrix(values, width):
+    """Строки ровно из width ASCII-цифр -> матрица цифр (строк x width)."""
+    buffer = ''.join(values).encode('ascii')
+    return np.frombuffer(buffer, dtype=np.uint8).reshape(-1, width).astype(np.int64) - 48
+
+
+def _weighted(matrix, weights):
+    return matrix[:, :len(weights)] @ np.array(weights, dtype=np.int64) % 11 % 10
+
+
+def _number(matrix, width):
+    """Первые width цифр строки как целое (14 цифр помещаются в int64)."""
+    return matrix[:, :width] @ (10 ** np.arange(width - 1, -1, -1, dtype=np.int64))
+
+
+def _inn10(matrix):
+    return _weighted(matrix, INN10_WEIGHTS) == matrix[:, 9]
+
+
+def _inn12(matrix):
+    return (_weighted(matrix, INN11_WEIGHTS) == matrix[:, 10]) & (_weighted(matrix, INN12_WEIGHTS) == matrix[:, 11])
+
+
+def _ogrn13(matrix):
+    return _number(matrix, 12) % 11 % 10 == matrix[:, 12]
+
+
+def _ogrnip15(matrix):
+    return _number(matrix, 14) % 13 % 10 == matrix[:, 14]
+
+
+INN_CHECKS = {10: _inn10, 12: _inn12}
+# В колонке ОГРН бывает и ОГРНИП (разбор подставляет его, если ОГРН нет)
+OGRN_CHECKS = {13: _ogrn13, 15: _ogrnip15}
+OGRNIP_CHECKS = {15: _ogrnip15}
+
+
+def _flags(text, valid):
+    """True/False по valid, NA там, где поля нет."""
+    missing = (text.isna() | (text.str.len() == 0)).fillna(True).to_numpy(dtype=bool)
+    return pd.Series(pd.arrays.BooleanArray(valid, missing), index=text.index)
+
+
+def check_digits(text, checks):
+    """Флаги по контрольным цифрам: checks - {длина: проверка матрицы цифр}.
+
+    text - колонка после clean_identifiers. Значение другой длины или не из
+    цифр - False, пустое - NA.
+    """
+    lengths = text.str.len().fillna(0).to_numpy(dtype=np.int64)
+    digits_only = text.str.fullmatch('[0-9]+').fillna(False).to_numpy(dtype=bool)
+    valid = np.zeros(len(text), dtype=bool)
+    for width, check in checks.items():
+        rows = np.flatnonzero(digits_only & (lengths == width))
+        if len(rows):
+            valid[rows] = check(_digit_matrix(text.iloc[rows].tolist(), width))
+    return _flags(text, valid)
+
+
+def _all_digits(text):
+    return _flags(text, text.str.fullmatch('[0-9]+').fillna(False).to_numpy(dtype=bool))
+
+
+def _has_letters(text):
+    return _flags(text, text.str.contains(_LETTERS, regex=True).fillna(False).to_numpy(dtype=bool))
+
+
+FLAG_CHECKS = {
+    'cosId': _all_digits,
+    'ФИО': _has_letters,
+    'Полное наименование контролируемого лица': _has_letters,
+    'ИНН': lambda text: check_digits(text, INN_CHECKS),
+    'ОГРН': lambda text: check_digits(text, OGRN_CHECKS),
+    'ОГРНИП': lambda text: check_digits(text, OGRNIP_CHECKS),
+}
+
+
+def validate_frame(df):
+    """Нормализует наименования и идентификаторы и добавляет флаги проверки полей."""
+    df = df.copy()
+    # ФИО и наименование обычно совпадают: общий проход по обеим колонкам
+    name_columns = [column for column in NAME_COLUMNS if column in df.columns]
+    names = normalize_names(pd.concat([df[column] for column in name_columns], ignore_index=True)) \
+        if name_columns else None
+    for column, flag in VALIDITY_COLUMNS.items():
+        if column not in df.columns:
+            continue
+        if column in name_columns:
+            start = name_columns.index(column) * len(df)
+            text = names.iloc[start:start + len(df)].set_axis(df.index)
+        else:
+            text = clean_identifiers(df[column])
+        df[column] = _to_object(text)
+        df[flag] = FLAG_CHECKS[column](text)
+    return df
+
+
+def validity_counts(df):
+    """{флаг: (верно, ошибка, пусто)} по колонкам-флагам таблицы."""
+    counts = {}
+    for flag in VALIDITY_COLUMNS.values():
+        if flag in df.columns:
+            column = df[flag]
+            counts[flag] = (int(column.eq(True).sum()), int(column.eq(False).sum()), int(column.isna().sum()))
+    return counts
@@ -0,0 +1,168 @@
+"""Сторож страницы: жесткий срок на обработку одной страницы.
+
+WebDriverWait ограничивает только ожидания, а сама команда WebDriver
+(например card.text на зависшей вкладке) может блокироваться минутами.
+PageWatchdog взводит таймер на страницу; по истечении срока он из своего
+потока убивает chromedriver вместе с браузером. Команда, висящая в
+основном потоке, сразу падает с ошибкой соединения, а crawler поднимает
+новую сессию, заново открывает адрес с фильтрами и повторяет страницу.
+"""
+import os
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from .log import log
+from .metrics import metrics as default_metrics
+from .schema import timestamp
+
+
+class PageTimeout(RuntimeError):
+    """Страница не уложилась в срок, сессия браузера убита сторожем."""
+
+
+def kill_driver(driver):
+    """Убивает chromedriver и его браузер, не отправляя команд WebDriver.
+
+    driver.quit() на зависшей сессии сам может висеть, поэтому процессы
+    убиваются напрямую: сначала дочерние (Chrome и его процессы), затем
+    chromedriver. Иначе после каждого срабатывания сторожа оставался бы
+    осиротевший Chrome.
+    """
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is None:
+        return False
+    if os.name == 'nt':
+        # taskkill /T снимает все дерево процессов
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        for pid in _descendants(process.pid):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+    try:
+        process.kill()
+        process.wait(timeout=10)
+    except Exception:
+        pass
+    return True
+
+
+def _descendants(pid):
+    """pid всех потомков процесса: psutil, если установлен, иначе pgrep -P."""
+    try:
+        import psutil
+        return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+    except ImportError:
+        pass
+    except Exception:
+        return []
+    result = []
+    parents = [pid]
+    while parents:
+        try:
+            output = subprocess.run(['pgrep', '-P', ','.join(map(str, parents))],
+                                    capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            break
+        parents = [int(line) for line in output.split()]
+        result.extend(parents)
+    return result
+
+
+class PageWatchdog:
+    """Таймер на страницу: arm() перед работой, disarm() после.
+
+    on_expire() вызывается в потоке таймера, когда срок вышел; после этого
+    expired остается True до следующего arm(). deadline=None - сторож
+    выключен. extend() продлевает срок текущей страницы, limit - срок,
+    действующий сейчас.
+
+    Каждый новый таймер получает номер generation: отмененный таймер,
+    который уже начал срабатывать, видит чужой номер и ничего не делает.
+    """
+
+    def __init__(self, deadline, on_expire, metrics=None):
+        self.deadline = deadline
+        self.on_expire = on_expire
+        self.metrics = metrics or default_metrics
+        self.expired = False
+        self.incidents = []
+        self.lock = threading.Lock()
+        self.timer = None
+        self.generation = 0
+        self.page = None
+        self.phase = None
+        self.started = None
+        self.limit = deadline
+
+    def arm(self, page, phase='page'):
+        self.disarm()
+        self.expired = False
+        if not self.deadline:
+            return
+        self.page, self.phase, self.started = page, phase, time.time()
+        self.limit = self.deadline
+        with self.lock:
+            self._start_timer(self.deadline)
+
+    def disarm(self):
+        with self.lock:
+            self.generation += 1
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+
+    def extend(self, limit):
+        """Срок текущей страницы - limit секунд от arm(), если он больше прежнего."""
+        with self.lock:
+            if self.timer is None or limit <= self.limit:
+                return
+            self.timer.cancel()
+            self.limit = limit
+            self._start_timer(max(0, self.started + limit - time.time()))
+
+    def _start_timer(self, seconds):
+        """Новый таймер под self.lock; прежний перестает считаться действующим."""
+        self.generation += 1
+        self.timer = threading.Timer(seconds, self._fire, args=(self.generation,))
+        self.timer.daemon = True
+        self.timer.start()
+
+    @contextmanager
+    def guard(self, page, phase='page'):
+        self.arm(page, phase)
+        try:
+            yield self
+        finally:
+            self.disarm()
+
+    def _fire(self, generation):
+        with self.lock:
+            if self.timer is None or generation != self.generation:
+                return
+            self.timer = None
+            self.expired = True
+        incident = {'page': self.page, 'phase': self.phase, 'at': timestamp(),
+                    'seconds': round(time.time() - self.started, 1)}
+        self.incidents.append(incident)
+        self.metrics.incr('watchdog.expired')
+        self.metrics.incr(f'watchdog.expired.{self.phase}')
+        log.warning("\n   ⏰ Страница %s (%s) дольше %g с - перезапускаю браузер", self.page, self.phase, self.limit,
+                    extra={'event': 'watchdog', 'page': self.page, 'phase': self.phase})
+        try:
+            self.on_expire()
+        except Exception as e:
+            log.warning("   ⚠ Сторож не смог остановить браузер: %s", e)
+
+    def print_report(self):
+        if not self.incidents:
+            return
+        print(f"\n⏰ ЗАВИСАНИЯ ({len(self.incidents)}):")
+        for incident in self.incidents:
+            print(f"   {incident['at']} страница {incident['page']} ({incident['phase']}): "
+                  f"{incident['seconds']} с")
@@ -0,0 +1,320 @@
+"""Локальная очередь работ для нескольких процессов парсера.
+
+Работа - это (профиль фильтров, диапазон страниц). Очередь лежит в SQLite:
+любой процесс (и на других машинах, если общая файловая система честно
+поддерживает блокировки) забирает работу в аренду, продлевает аренду
+сердцебиением и сообщает результат. Просроченная аренда (процесс упал или
+завис) возвращает работу в очередь, упавшая работа повторяется до
+max_attempts раз. Добавить воркер - значит просто запустить еще процесс.
+
+Примеры:
+    python -m ervk_parser.work_queue add-profile msk "https://ervk.gov.ru/objects?region=77"
+    python -m ervk_parser.work_queue enqueue msk 1 400 --chunk 10
+    python -m ervk_parser.work_queue status
+"""
+import argparse
+import datetime
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+from .log import log
+
+DEFAULT_PATH = 'ervk_queue.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile TEXT NOT NULL REFERENCES profiles(name),
+    page_from INTEGER NOT NULL,
+    page_to INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    records INTEGER,
+    error TEXT,
+    UNIQUE (profile, page_from, page_to)
+);
+CREATE INDEX IF NOT EXISTS items_status ON items(status, id);
+"""
+
+
+def worker_name():
+    """Имя воркера: хост и pid - видно в status, кто держит аренду."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkItem:
+    """Полученная в аренду работа."""
+
+    __slots__ = ('id', 'profile', 'url', 'page_from', 'page_to', 'attempts')
+
+    def __init__(self, id, profile, url, page_from, page_to, attempts):
+        self.id = id
+        self.profile = profile
+        self.url = url
+        self.page_from = page_from
+        self.page_to = page_to
+        self.attempts = attempts
+
+    def pages(self):
+        return range(self.page_from, self.page_to + 1)
+
+    def __repr__(self):
+        return f"WorkItem({self.id}, {self.profile!r}, стр. {self.page_from}-{self.page_to})"
+
+
+class WorkQueue:
+    """Очередь работ с арендой, сердцебиением и истечением аренды."""
+
+    def __init__(self, path=DEFAULT_PATH, lease_seconds=600, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def _transaction(self, func, *args):
+        """BEGIN IMMEDIATE: только один процесс меняет очередь в каждый момент."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    def add_profile(self, name, url):
+        with self.lock:
+            self.conn.execute("INSERT INTO profiles (name, url) VALUES (?, ?) "
+                              "ON CONFLICT(name) DO UPDATE SET url = excluded.url", (name, url))
+
+    def enqueue(self, profile, page_from, page_to=None):
+        """Ставит диапазон в очередь; уже стоящий диапазон не дублируется."""
+        page_to = page_to or page_from
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO items (profile, page_from, page_to, enqueued_at) VALUES (?, ?, ?, ?)",
+                (profile, page_from, page_to, time.time()),
+            )
+        return cursor.rowcount
+
+    def enqueue_range(self, profile, first, last, chunk=10):
+        """Делит страницы first..last на работы по chunk страниц."""
+        added = 0
+        for start in range(first, last + 1, chunk):
+            added += self.enqueue(profile, start, min(start + chunk - 1, last))
+        return added
+
+    def requeue(self, profile, page_from, page_to=None):
+        """Возвращает диапазон в очередь, даже если он уже выполнен (перезагрузка)."""
+        page_to = page_to or page_from
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE items SET status = 'queued', attempts = 0, lease_owner = NULL, error = NULL "
+                "WHERE profile = ? AND page_from = ? AND page_to = ?", (profile, page_from, page_to))
+        if cursor.rowcount == 0:
+            return self.enqueue(profile, page_from, page_to)
+        return cursor.rowcount
+
+    def _reclaim_expired(self):
+        # Истекшая аренда - тоже неудачная попытка: работа, которая каждый раз
+        # роняет воркер, не должна возвращаться в очередь бесконечно
+        now = time.time()
+        return self.conn.execute(
+            "UPDATE items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "lease_owner = NULL, error = 'аренда истекла' WHERE status = 'leased' AND lease_expires < ?",
+            (self.max_attempts, now)
+        ).rowcount
+
+    def _claim(self, worker):
+        self._reclaim_expired()
+        row = self.conn.execute(
+            "SELECT i.id, i.profile, p.url, i.page_from, i.page_to, i.attempts FROM items i "
+            "JOIN profiles p ON p.name = i.profile WHERE i.status = 'queued' ORDER BY i.id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        self.conn.execute(
+            "UPDATE items SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+            "attempts = attempts + 1, started_at = ? WHERE id = ?",
+            (worker, now + self.lease_seconds, now, row[0]),
+        )
+        return WorkItem(*row[:5], row[5] + 1)
+
+    def claim(self, worker=None):
+        """Берет следующую работу в аренду или None, если очередь пуста."""
+        return self._transaction(self._claim, worker or worker_name())
+
+    def heartbeat(self, item, worker=None):
+        """Продлевает аренду; False - аренду уже потеряли (истекла и отдана другому)."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE items SET lease_expires = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time() + self.lease_seconds, item.id, worker or worker_name()),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, item, records=0, worker=None):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE items SET status = 'done', finished_at = ?, records = ?, lease_owner = NULL, error = NULL "
+                "WHERE id = ? AND lease_owner = ?", (time.time(), records, item.id, worker or worker_name()),
+            )
+
+    def fail(self, item, error, worker=None):
+        """Возвращает работу в очередь или помечает failed после max_attempts."""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "lease_owner = NULL, error = ? WHERE id = ? AND lease_owner = ?",
+                (self.max_attempts, str(error)[:500], item.id, worker or worker_name()),
+            )
+
+    def requeue_failed(self):
+        with self.lock:
+            return self.conn.execute(
+                "UPDATE items SET status = 'queued', attempts = 0 WHERE status = 'failed'").rowcount
+
+    def status(self, window=3600):
+        """Глубина очереди по статусам и пропускная способность за window секунд."""
+        with self.lock:
+            self._reclaim_expired()
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+            since = time.time() - window
+            done_items, done_pages, done_records = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(page_to - page_from + 1), 0), COALESCE(SUM(records), 0) "
+                "FROM items WHERE status = 'done' AND finished_at >= ?", (since,)
+            ).fetchone()
+            workers = self.conn.execute(
+                "SELECT lease_owner, COUNT(*), MAX(lease_expires) FROM items "
+                "WHERE status = 'leased' GROUP BY lease_owner"
+            ).fetchall()
+        hours = window / 3600
+        return {
+            'counts': counts,
+            'pages_per_hour': done_pages / hours,
+            'records_per_hour': done_records / hours,
+            'items_done_in_window': done_items,
+            'workers': [{'worker': w, 'items': n, 'lease_expires': expires} for w, n, expires in workers],
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+class _Heartbeat(threading.Thread):
+    """Фоновое продление аренды, пока работа выполняется."""
+
+    def __init__(self, queue, item, worker, interval):
+        super().__init__(daemon=True)
+        self.queue, self.item, self.worker, self.interval = queue, item, worker, interval
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if not self.queue.heartbeat(self.item, self.worker):
+                self.lost = True
+                return
+
+
+def run_worker(queue, process_item, worker=None, idle_exit=True, poll_interval=10, should_stop=None):
+    """Цикл воркера: берет работу, выполняет process_item(item) -> число записей.
+
+    Исключение в process_item возвращает работу в очередь. idle_exit=False -
+    ждать новых работ, а не завершаться на пустой очереди. should_stop() -
+    проверка перед каждой новой работой (например бюджет времени).
+    """
+    worker = worker or worker_name()
+    processed = 0
+    while True:
+        if should_stop and should_stop():
+            return processed
+        item = queue.claim(worker)
+        if item is None:
+            if idle_exit:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        heartbeat = _Heartbeat(queue, item, worker, max(queue.lease_seconds / 3, 1))
+        heartbeat.start()
+        try:
+            records = process_item(item)
+        except KeyboardInterrupt:
+            queue.fail(item, 'прервано пользователем', worker)
+            raise
+        except Exception as e:
+            log.warning("⚠ Работа %s не выполнена: %s", item, e, extra={'event': 'work_item'})
+            queue.fail(item, e, worker)
+        else:
+            if heartbeat.lost:
+                log.warning("⚠ Аренда %s истекла во время работы, результат не засчитан", item,
+                            extra={'event': 'work_item'})
+            else:
+                queue.complete(item, records or 0, worker)
+                processed += 1
+        finally:
+            heartbeat.stopped.set()
+
+
+def _print_status(status):
+    counts = status['counts']
+    print(f"В очереди: {counts.get('queued', 0)} | в работе: {counts.get('leased', 0)} | "
+          f"готово: {counts.get('done', 0)} | ошибки: {counts.get('failed', 0)}")
+    print(f"За последний час: {status['pages_per_hour']:.0f} стр./ч, {status['records_per_hour']:.0f} записей/ч")
+    for w in status['workers']:
+        expires = datetime.datetime.fromtimestamp(w['lease_expires']).strftime('%H:%M:%S')
+        print(f"   {w['worker']}: {w['items']} работ, аренда до {expires}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Очередь работ парсера ЕРВК")
+    parser.add_argument('--db', default=DEFAULT_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    profile = commands.add_parser('add-profile', help="профиль фильтров: имя и адрес списка с фильтрами")
+    profile.add_argument('name')
+    profile.add_argument('url')
+    enqueue = commands.add_parser('enqueue', help="поставить страницы профиля в очередь")
+    enqueue.add_argument('profile')
+    enqueue.add_argument('first', type=int)
+    enqueue.add_argument('last', type=int)
+    enqueue.add_argument('--chunk', type=int, default=10)
+    commands.add_parser('requeue-failed', help="вернуть упавшие работы в очередь")
+    status = commands.add_parser('status', help="глубина очереди и пропускная способность")
+    status.add_argument('--window', type=int, default=3600, help="окно для скорости, секунд")
+    args = parser.parse_args(argv)
+
+    queue = WorkQueue(args.db)
+    try:
+        if args.command == 'add-profile':
+            queue.add_profile(args.name, args.url)
+        elif args.command == 'enqueue':
+            print(f"Добавлено работ: {queue.enqueue_range(args.profile, args.first, args.last, args.chunk)}")
+        elif args.command == 'requeue-failed':
+            print(f"Возвращено: {queue.requeue_failed()}")
+        else:
+            _print_status(queue.status(args.window))
+    finally:
+        queue.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
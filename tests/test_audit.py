@@ -0,0 +1,29 @@
+from ervk_parser.audit import parse_total, same_total
+
+
+def test_total_on_one_line():
+    assert parse_total('Найдено объектов: 523') == 523
+    assert parse_total('Найдено: 1 234') == 1234
+    assert parse_total('Найдено: 1 234') == 1234
+
+
+def test_paginator_digits_on_next_lines_are_not_part_of_total():
+    assert parse_total('Найдено объектов: 523\n1\n2\n3') == 523
+    assert parse_total('Найдено: 1 234\n20') == 1234
+    assert parse_total('Всего записей: 87\n1\n2') == 87
+
+
+def test_total_from_range_text():
+    assert parse_total('1-20 из 4 500 объектов\n1\n2') == 4500
+
+
+def test_no_total():
+    assert parse_total('1\n2\n3') is None
+
+
+def test_same_total():
+    assert same_total(4500, 4500)
+    assert same_total(4500, 4510)
+    assert not same_total(4500, 120000)
+    assert not same_total(4500, None)
+    assert same_total(None, None)
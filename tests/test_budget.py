@@ -0,0 +1,64 @@
+import pytest
+
+from ervk_parser.budget import RunBudget, format_duration, load_checkpoint, parse_duration, save_checkpoint
+from ervk_parser.metrics import Metrics
+
+
+def test_parse_duration():
+    assert parse_duration('90') == 5400
+    assert parse_duration(90) == 5400
+    assert parse_duration('45m') == 2700
+    assert parse_duration('1h30m') == 5400
+    assert parse_duration('1h 30m') == 5400
+    assert parse_duration('2ч') == 7200
+    assert parse_duration('30с') == 30
+
+
+@pytest.mark.parametrize('text', ['', 'час', '1h30', '5d', '-10'])
+def test_parse_duration_rejects(text):
+    with pytest.raises(ValueError):
+        parse_duration(text)
+
+
+def test_format_duration():
+    assert format_duration(5400) == '1:30:00'
+    assert format_duration(61.9) == '0:01:01'
+    assert format_duration(-5) == '0:00:00'
+
+
+def test_page_limit():
+    budget = RunBudget(max_pages=2, metrics=Metrics())
+    assert budget.exhausted() is None
+    budget.record_page(1)
+    budget.record_page(1)
+    assert budget.exhausted() == 'pages'
+    assert budget.metrics.counters == {'budget.stop.pages': 1}
+    assert budget.describe() == 'страниц 2'
+
+
+def test_time_limit_counts_next_page():
+    budget = RunBudget(max_seconds=100, metrics=Metrics())
+    budget.started -= 60
+    budget.record_page(30)
+    # Среднее 60 с на страницу: следующая не успеет до 100 с
+    assert budget.exhausted() == 'time'
+
+
+def test_forecast_after_warmup():
+    budget = RunBudget(max_seconds=1000, metrics=Metrics())
+    budget.started -= 30
+    for _ in range(2):
+        budget.record_page(10)
+    assert budget.forecast(100) is None
+    budget.record_page(10)
+    forecast = budget.forecast(100)
+    assert not forecast['fits']
+    # Осталось ~970 с при ~10 с на страницу
+    assert 90 < forecast['pages_fit'] < 100
+
+
+def test_checkpoint_round_trip(tmp_path):
+    filename = save_checkpoint(str(tmp_path / 'checkpoint.json'), url='https://example.test/', next_page=12)
+    state = load_checkpoint(filename)
+    assert (state['url'], state['next_page']) == ('https://example.test/', 12)
+    assert 'saved_at' in state
@@ -0,0 +1,46 @@
+from ervk_parser.index import LookupIndex
+
+
+def _records():
+    return [
+        {'cosId': 101.0, 'Полное наименование контролируемого лица': 'ООО "Ромашка"', 'ИНН': 7707083893.0,
+         'ОГРН': '1027700132195', 'Адрес объекта контроля': 'г. Москва, ул. Ленина, д. 1'},
+        {'cosId': '102', 'Полное наименование контролируемого лица': 'ИП Иванов Иван Иванович',
+         'ИНН': '500100732259', 'ОГРНИП': '304500116000157', 'Адрес объекта контроля': 'г. Тверь'},
+        {'cosId': None, 'ИНН': '7701234567'},
+    ]
+
+
+def test_update_and_lookup(tmp_path):
+    index = LookupIndex(str(tmp_path / 'index.sqlite'))
+    assert index.update(_records(), 'r1') == 2
+    assert index.by_inn('7707083893')[0]['cos_id'] == '101'
+    assert index.by_ogrn(1027700132195)[0]['cos_id'] == '101'
+    assert index.by_ogrn('304500116000157')[0]['cos_id'] == '102'
+    assert index.by_cos_id(102)[0]['full_name'] == 'ИП Иванов Иван Иванович'
+    assert index.by_inn('7701234567') == []
+    assert index.stats() == {'objects': 2, 'inns': 2, 'runs': 1}
+    index.close()
+
+
+def test_update_keeps_known_fields(tmp_path):
+    index = LookupIndex(str(tmp_path / 'index.sqlite'))
+    index.update(_records(), 'r1')
+    index.update([{'cosId': '101', 'Адрес объекта контроля': 'г. Москва, ул. Тверская, д. 7'}], 'r2')
+    row = index.by_cos_id('101')[0]
+    assert (row['inn'], row['address'], row['last_run']) == ('7707083893', 'г. Москва, ул. Тверская, д. 7', 'r2')
+    index.close()
+
+
+def test_full_text_search(tmp_path):
+    index = LookupIndex(str(tmp_path / 'index.sqlite'))
+    index.update(_records(), 'r1')
+    assert [row['cos_id'] for row in index.search('ромашка москва')] == ['101']
+    assert [row['cos_id'] for row in index.search('иван')] == ['102']
+    assert index.search('ромашка тверь') == []
+    assert index.search('"') == []
+    # Поиск идет по новому адресу, старый из FTS удален
+    index.update([{'cosId': '101', 'Адрес объекта контроля': 'г. Казань'}], 'r2')
+    assert [row['cos_id'] for row in index.search('ромашка казань')] == ['101']
+    assert index.search('ромашка москва') == []
+    index.close()
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip('selenium')
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException  # noqa: E402
+from selenium.webdriver.common.by import By  # noqa: E402
+
+from ervk_parser.locators import LocatorRegistry  # noqa: E402
+from ervk_parser.metrics import Metrics  # noqa: E402
+
+STRATEGIES = {'name': [(By.XPATH, './/a'), (By.XPATH, './/b')]}
+
+
+class Context:
+    def __init__(self, found):
+        self.found = found
+
+    def find_elements(self, by, selector):
+        result = self.found.get(selector, [])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _registry():
+    return LocatorRegistry(STRATEGIES, metrics=Metrics())
+
+
+def test_winner_is_tried_first():
+    registry = _registry()
+    assert registry.find(Context({'.//b': ['Иванов Иван']}), 'name') == 'Иванов Иван'
+    assert registry.selectors('name') == ['.//b', './/a']
+    assert registry.find(Context({'.//b': ['Петров Петр']}), 'name') == 'Петров Петр'
+    assert registry.metrics.counters == {'locator.name.miss': 1, 'locator.name.hit': 1}
+
+
+def test_nothing_found_counts_none():
+    registry = _registry()
+    assert registry.find(Context({'.//a': NoSuchElementException()}), 'name') is None
+    assert registry.metrics.counters == {'locator.name.none': 1}
+
+
+def test_stale_element_is_raised():
+    registry = _registry()
+    with pytest.raises(StaleElementReferenceException):
+        registry.find(Context({'.//a': StaleElementReferenceException()}), 'name')
+
+    def extract(element):
+        raise StaleElementReferenceException()
+    with pytest.raises(StaleElementReferenceException):
+        registry.find(Context({'.//a': ['Иванов Иван']}), 'name', extract=extract)
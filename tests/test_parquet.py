@@ -0,0 +1,51 @@
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pytest.importorskip('pandas')
+
+from ervk_parser.parquet import RISK, read_dataset, write_dataset  # noqa: E402
+
+
+def _records():
+    return [
+        {'Номер страницы': 1, 'cosId': 101.0, 'Категория риска': 'низкий', 'ИНН': '7701234567',
+         'Вид контроля': 'Пожарный', 'Время сбора': '2026-01-01 10:00:00', 'Статус': 'Собрано'},
+        {'Номер страницы': 2, 'cosId': '102', 'Категория риска': None, 'ИНН': 7707083893.0,
+         'Время сбора': '', 'Статус': 'Ошибка'},
+    ]
+
+
+def test_write_read_round_trip(tmp_path):
+    assert write_dataset(_records(), str(tmp_path), run_date='2026-01-01', run_id='r1') == 2
+    df = read_dataset(str(tmp_path)).sort_values('cosId').reset_index(drop=True)
+    assert list(df['cosId']) == ['101', '102']
+    assert list(df['ИНН']) == ['7701234567', '7707083893']
+    assert df.loc[0, RISK] == 'низкий'
+    assert df.loc[1, RISK] != df.loc[1, RISK]
+    assert str(df[RISK].dtype) == 'category'
+    assert list(df['run_date']) == ['2026-01-01', '2026-01-01']
+    assert df.loc[0, 'Время сбора'].year == 2026
+
+
+def test_read_with_partition_filter(tmp_path):
+    import pyarrow.dataset as ds
+
+    write_dataset(_records(), str(tmp_path), run_date='2026-01-01', run_id='r1')
+    write_dataset(_records()[:1], str(tmp_path), run_date='2026-01-02', run_id='r2')
+    df = read_dataset(str(tmp_path), columns=['cosId', RISK], filter=ds.field(RISK) == 'низкий')
+    assert list(df['cosId']) == ['101', '101']
+
+
+def test_frame_to_table_is_typed():
+    import pandas as pd
+
+    from ervk_parser.parquet import SCHEMA, frame_to_table
+
+    df = pd.DataFrame({'cosId': [101.0, None], 'ИНН': [' 7701234567 ', ''], 'Номер страницы': ['3', None],
+                       'Статус': ['Собрано', 'Собрано'], 'Проверка ИНН': [True, None]})
+    table = frame_to_table(df, '2026-01-01', 'r1')
+    assert table.schema.equals(SCHEMA)
+    assert table.column('cosId').to_pylist() == ['101', None]
+    assert table.column('ИНН').to_pylist() == ['7701234567', None]
+    assert table.column('Номер страницы').to_pylist() == [3, None]
+    assert table.column('run_id').to_pylist() == ['r1', 'r1']
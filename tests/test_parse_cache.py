@@ -0,0 +1,59 @@
+from ervk_parser.metrics import Metrics
+from ervk_parser.parse_cache import ParseCache
+from ervk_parser.schema import CardRecord
+
+
+def _record(inn):
+    record = CardRecord(cos_id='101', page=4, collected_at='2026-01-01 10:00:00')
+    record.inn = inn
+    return record
+
+
+def _cache(path, version='1', **kwargs):
+    return ParseCache(str(path), version, metrics=Metrics(), **kwargs)
+
+
+def test_put_get_without_volatile_columns(tmp_path):
+    cache = _cache(tmp_path / 'cache.sqlite')
+    assert cache.get('ИНН 7707083893') is None
+    cache.put('ИНН 7707083893', _record('7707083893'))
+    assert cache.get('ИНН 7707083893')['ИНН'] == '7707083893'
+    cache.close()
+
+    cache = _cache(tmp_path / 'cache.sqlite')
+    fields = cache.get('ИНН 7707083893')
+    assert fields['ИНН'] == '7707083893'
+    assert 'Номер страницы' not in fields and 'Время сбора' not in fields
+    assert cache.metrics.counters == {'parse_cache.hit': 1}
+    cache.close()
+
+
+def test_new_version_purges_old_entries(tmp_path):
+    cache = _cache(tmp_path / 'cache.sqlite')
+    cache.put('ИНН 7707083893', _record('7707083893'))
+    cache.close()
+
+    old = _cache(tmp_path / 'cache.sqlite', version='2', purge=False)
+    assert list(old.iter_texts()) == ['ИНН 7707083893']
+    old.close()
+
+    cache = _cache(tmp_path / 'cache.sqlite', version='2')
+    assert cache.get('ИНН 7707083893') is None
+    assert list(cache.iter_texts()) == []
+    cache.close()
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = _cache(tmp_path / 'cache.sqlite', max_entries=10)
+    for n in range(10):
+        cache.put(f'карточка {n}', _record(str(n)))
+    cache.flush()
+    with cache.conn:
+        cache.conn.execute("UPDATE parse_cache SET last_used = 0 WHERE card_text IN ('карточка 0', 'карточка 1')")
+    cache.put('карточка 10', _record('10'))
+    cache.flush()
+    texts = set(cache.iter_texts())
+    assert len(texts) == 9
+    assert 'карточка 0' not in texts and 'карточка 1' not in texts and 'карточка 10' in texts
+    assert cache.metrics.counters['parse_cache.evicted'] == 2
+    cache.close()
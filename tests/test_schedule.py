@@ -0,0 +1,81 @@
+import datetime
+
+from ervk_parser.schedule import estimate, plan, query_history
+from ervk_parser.sqlite import SQLiteSink
+
+NOW = datetime.datetime(2026, 1, 11, 12, 0)
+
+
+def _history(*runs):
+    """runs: (день января, страниц, added, changed, секунд[, статус])."""
+    return [{'started_at': datetime.datetime(2026, 1, day, 12, 0), 'status': rest[0] if rest else 'finished',
+             'pages': pages, 'added': added, 'changed': changed, 'seconds': seconds}
+            for day, pages, added, changed, seconds, *rest in runs]
+
+
+def _sink(tmp_path, runs):
+    sink = SQLiteSink(str(tmp_path / 'ervk.sqlite'))
+    with sink.conn:
+        sink.conn.executemany(
+            "INSERT INTO runs (started_at, status, query, pages, added, changed, total_seconds) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(started_at.isoformat(), status, query, pages, added, changed, seconds)
+             for query, started_at, status, pages, added, changed, seconds in runs])
+    return sink
+
+
+def test_estimate_without_history():
+    assert estimate([], NOW) == {'runs': 0, 'last_run': None, 'days_since': None, 'rate': None,
+                                 'page_seconds': None, 'full_pages': None}
+
+
+def test_estimate_rate_and_cost():
+    result = estimate(_history((1, 10, 100, 0, 300), (3, 10, 6, 4, 200), (5, 10, 2, 8, 100)), NOW)
+    assert result['runs'] == 3
+    assert result['days_since'] == 6
+    assert result['page_seconds'] == 20
+    assert result['full_pages'] == 10
+    # Первый запуск не считается: 20 изменений за 4 дня
+    assert result['rate'] == 5
+
+
+def test_estimate_scales_partial_run():
+    result = estimate(_history((1, 10, 0, 0, 300), (3, 5, 2, 3, 150, 'budget')), NOW)
+    assert result['full_pages'] == 10
+    assert result['rate'] == 5
+
+
+def test_query_history_skips_failed_runs(tmp_path):
+    sink = _sink(tmp_path, [('msk', datetime.datetime(2026, 1, 1), 'finished', 10, 5, 0, 300),
+                            ('msk', datetime.datetime(2026, 1, 2), 'failed', 1, 0, 0, 30),
+                            ('spb', datetime.datetime(2026, 1, 3), 'finished', 10, 5, 0, 300)])
+    history = query_history(sink.conn, 'msk')
+    assert [run['started_at'].day for run in history] == [1]
+    sink.close()
+
+
+def test_plan_fits_budget(tmp_path):
+    day = datetime.timedelta(days=1)
+    sink = _sink(tmp_path, [
+        # Быстро меняется
+        ('msk', NOW - 3 * day, 'finished', 10, 0, 0, 600),
+        ('msk', NOW - 2 * day, 'finished', 10, 50, 50, 600),
+        # Почти не меняется
+        ('spb', NOW - 3 * day, 'finished', 10, 0, 0, 600),
+        ('spb', NOW - 2 * day, 'finished', 10, 1, 0, 600),
+    ])
+    jobs = [{'name': 'spb'}, {'name': 'msk'}, {'name': 'kzn', 'max_pages': 10}]
+    entries = plan(jobs, sink.conn, budget_seconds=1200, now=NOW)
+    assert [(entry['job']['name'], entry['reason'], entry['chosen']) for entry in entries] == [
+        ('kzn', 'нет истории', True), ('msk', 'изменения', True), ('spb', 'изменения', False)]
+    # Без истории - средняя скорость известных запросов
+    assert entries[0]['cost'] == 600
+    sink.close()
+
+
+def test_plan_forces_stale_query(tmp_path):
+    sink = _sink(tmp_path, [('msk', NOW - datetime.timedelta(days=30), 'finished', 10, 0, 0, 600),
+                            ('msk', NOW - datetime.timedelta(days=20), 'finished', 10, 1, 0, 600)])
+    entries = plan([{'name': 'msk'}], sink.conn, budget_seconds=3600, max_age_days=14, now=NOW)
+    assert (entries[0]['reason'], entries[0]['priority'], entries[0]['chosen']) == ('давно', None, True)
+    sink.close()
@@ -0,0 +1,55 @@
+from ervk_parser.schema import CardRecord
+from ervk_parser.sqlite import SQLiteSink
+
+
+def _record(cos_id, status='Собрано', **fields):
+    record = CardRecord(cos_id=cos_id, page=1, collected_at='2026-01-01 10:00:00', status=status)
+    for attr, value in fields.items():
+        setattr(record, attr, value)
+    return record
+
+
+def _object(sink, cos_id):
+    return sink.conn.execute("SELECT inn, full_name, status, run_id, first_run_id, changed_run_id "
+                             "FROM objects WHERE cos_id = ?", (cos_id,)).fetchone()
+
+
+def _run(sink, records):
+    run_id = sink.begin_run()
+    sink.write_page(records, 1)
+    sink.finish_run()
+    return run_id
+
+
+def test_upsert_keeps_fields_missing_in_new_record(tmp_path):
+    sink = SQLiteSink(str(tmp_path / 'ervk.sqlite'))
+    first = _run(sink, [_record('101', inn='7707083893', full_name='ПАО "Сбербанк"')])
+    second = _run(sink, [_record('101', full_name='ПАО "Сбербанк России"')])
+    assert _object(sink, '101') == ('7707083893', 'ПАО "Сбербанк России"', 'Собрано', second, first, second)
+    sink.close()
+
+
+def test_failed_reparse_keeps_status(tmp_path):
+    sink = SQLiteSink(str(tmp_path / 'ervk.sqlite'))
+    first = _run(sink, [_record('101', inn='7707083893')])
+    second = _run(sink, [_record('101', status='✗ Данных нет')])
+    assert _object(sink, '101') == ('7707083893', None, 'Собрано', second, first, first)
+    sink.close()
+
+
+def test_status_follows_new_content(tmp_path):
+    sink = SQLiteSink(str(tmp_path / 'ervk.sqlite'))
+    _run(sink, [_record('101', inn='7707083893')])
+    _run(sink, [_record('101', status='⚠ Частично', full_name='ООО "Ромашка"')])
+    assert _object(sink, '101')[2] == '⚠ Частично'
+    sink.close()
+
+
+def test_added_and_changed_counts(tmp_path):
+    sink = SQLiteSink(str(tmp_path / 'ervk.sqlite'))
+    _run(sink, [_record('101', inn='7707083893'), _record('102', inn='500100732259')])
+    run_id = _run(sink, [_record('101', inn='7707083893'), _record('102', inn='7701234567'),
+                         _record('103', inn='1027700132195'), _record(None, inn='7707083893')])
+    assert sink.conn.execute("SELECT records, skipped, added, changed FROM runs WHERE id = ?",
+                             (run_id,)).fetchone() == (3, 1, 1, 1)
+    sink.close()
@@ -0,0 +1,36 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from ervk_parser.validate import check_digits, clean_identifiers, INN_CHECKS, normalize_names, OGRN_CHECKS, validate_frame  # noqa: E402
+
+
+def test_full_legal_forms_are_abbreviated():
+    names = pd.Series(['Общество с ограниченной ответственностью «Ромашка»',
+                       'акционерное общество "Сибирь"',
+                       'Индивидуальный предприниматель  Иванов Иван'])
+    assert normalize_names(names).tolist() == ['ООО "Ромашка"', 'АО "Сибирь"', 'ИП Иванов Иван']
+
+
+def test_abbreviations_with_dots_or_before_quote():
+    names = pd.Series(['О.О.О. Ромашка', 'ооо "Ромашка"', 'ПАО Сбербанк'])
+    assert normalize_names(names).tolist() == ['ООО Ромашка', 'ООО "Ромашка"', 'ПАО Сбербанк']
+
+
+def test_person_names_are_not_taken_for_legal_forms():
+    names = pd.Series(['Пао Ли Хуа', 'Ао Минь', 'Ип Ман'])
+    assert normalize_names(names).tolist() == ['Пао Ли Хуа', 'Ао Минь', 'Ип Ман']
+
+
+def test_identifiers_and_check_digits():
+    inn = clean_identifiers(pd.Series(['7707083893', 7707083893.0, '7707083894', ' 500100732259 ', None]))
+    assert inn.tolist()[:2] == ['7707083893', '7707083893']
+    assert check_digits(inn, INN_CHECKS).tolist() == [True, True, False, True, pd.NA]
+    ogrn = clean_identifiers(pd.Series(['1027700132195', '1027700132196', '304500116000157']))
+    assert check_digits(ogrn, OGRN_CHECKS).tolist() == [True, False, True]
+
+
+def test_validate_frame_adds_flags():
+    df = validate_frame(pd.DataFrame({'cosId': ['1', 'x'], 'ИНН': ['7707083893', '123']}))
+    assert df['Проверка cosId'].tolist() == [True, False]
+    assert df['Проверка ИНН'].tolist() == [True, False]
@@ -0,0 +1,41 @@
+import time
+
+from ervk_parser.metrics import Metrics
+from ervk_parser.watchdog import PageWatchdog
+
+
+def _watchdog(deadline, fired):
+    return PageWatchdog(deadline, on_expire=lambda: fired.append(True), metrics=Metrics())
+
+
+def test_expires():
+    fired = []
+    watchdog = _watchdog(0.05, fired)
+    watchdog.arm(3)
+    time.sleep(0.3)
+    assert fired == [True]
+    assert watchdog.expired
+    assert watchdog.incidents[0]['page'] == 3
+
+
+def test_disarm_before_deadline():
+    fired = []
+    with _watchdog(0.2, fired).guard(3) as watchdog:
+        pass
+    time.sleep(0.3)
+    assert fired == []
+    assert not watchdog.expired
+
+
+def test_replaced_timer_does_not_fire():
+    fired = []
+    watchdog = _watchdog(60, fired)
+    watchdog.arm(3)
+    stale = watchdog.generation
+    watchdog.extend(120)
+    # Старый таймер, успевший начать срабатывание до cancel(), ничего не делает
+    watchdog._fire(stale)
+    assert fired == []
+    assert not watchdog.expired
+    assert watchdog.timer is not None
+    watchdog.disarm()
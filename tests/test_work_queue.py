@@ -0,0 +1,61 @@
+from ervk_parser.work_queue import WorkQueue
+
+
+def _queue(tmp_path, **kwargs):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), **kwargs)
+    queue.add_profile('msk', 'https://example.test/?region=77')
+    return queue
+
+
+def _statuses(queue):
+    return dict(queue.conn.execute("SELECT page_from, status FROM items").fetchall())
+
+
+def test_enqueue_range_splits_and_skips_duplicates(tmp_path):
+    queue = _queue(tmp_path)
+    assert queue.enqueue_range('msk', 1, 25, chunk=10) == 3
+    assert queue.enqueue_range('msk', 1, 25, chunk=10) == 0
+    assert [item for item in queue.conn.execute("SELECT page_from, page_to FROM items ORDER BY id")] == \
+        [(1, 10), (11, 20), (21, 25)]
+    queue.close()
+
+
+def test_claim_and_complete(tmp_path):
+    queue = _queue(tmp_path)
+    queue.enqueue('msk', 1, 2)
+    item = queue.claim('w1')
+    assert (item.url, list(item.pages()), item.attempts) == ('https://example.test/?region=77', [1, 2], 1)
+    assert queue.claim('w2') is None
+    assert queue.heartbeat(item, 'w1')
+    assert not queue.heartbeat(item, 'w2')
+    queue.complete(item, records=40, worker='w1')
+    assert _statuses(queue) == {1: 'done'}
+    queue.close()
+
+
+def test_fail_until_max_attempts(tmp_path):
+    queue = _queue(tmp_path, max_attempts=2)
+    queue.enqueue('msk', 1)
+    queue.fail(queue.claim('w1'), 'таймаут', worker='w1')
+    assert _statuses(queue) == {1: 'queued'}
+    queue.fail(queue.claim('w1'), 'таймаут', worker='w1')
+    assert _statuses(queue) == {1: 'failed'}
+    assert queue.claim('w1') is None
+    assert queue.requeue_failed() == 1
+    assert queue.claim('w1').attempts == 1
+    queue.close()
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = _queue(tmp_path, lease_seconds=-1, max_attempts=2)
+    queue.enqueue('msk', 1)
+    first = queue.claim('w1')
+    second = queue.claim('w2')
+    assert second.id == first.id and second.attempts == 2
+    # Аренда w1 истекла и отдана w2 - поздний complete от w1 ничего не меняет
+    queue.complete(first, worker='w1')
+    assert _statuses(queue) == {1: 'leased'}
+    # Вторая истекшая аренда исчерпывает попытки
+    assert queue.claim('w3') is None
+    assert _statuses(queue) == {1: 'failed'}
+    queue.close()